@@ -12,6 +12,12 @@ for f in os.listdir('tools'):
     if f.endswith('.py'):
         tools_datas.append((os.path.join('tools', f), 'tools'))
 
+# Coletar todos os arquivos da pasta engine
+engine_datas = []
+for f in os.listdir('engine'):
+    if f.endswith('.py'):
+        engine_datas.append((os.path.join('engine', f), 'engine'))
+
 # Coletar arquivos de imagem
 img_datas = []
 if os.path.exists('img'):
@@ -25,6 +31,7 @@ a = Analysis(
     datas=[
         ('i18n.py', '.'),
         *tools_datas,
+        *engine_datas,
         *img_datas,
     ],
     hiddenimports=[
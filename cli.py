@@ -11,16 +11,28 @@ import os
 import pandas as pd
 import chardet
 import json
+import multiprocessing
 from pathlib import Path
 from datetime import datetime
 
 # Internationalization
 from i18n import t, get_language, set_language
 
+# Processing engine / Motor de processamento
+from engine import (
+    stream_merge, iter_csv_files, scan_headers, union_columns, schema_drift,
+    can_byte_concat, byte_concat_merge, ExternalDeduplicator, DEFAULT_CHUNKSIZE,
+    DEFAULT_DEDUP_MEMORY, incremental_merge, sorted_merge, add_source_column, split_rows,
+    split_bytes, split_by_column, split_by_hash, DEFAULT_MAX_OPEN_FILES, open_output,
+    compressed_path, strip_compression, open_input, expand_inputs, resolve_input, source_path,
+    read_csv_file, split_member, stream_rewrite, Checkpoint, checkpoint_path, job_fingerprint, CleaningPlan,
+    ChunkCleaner, load_replace_table, HashDeduplicator, dedup_rewrite
+)
+
 
 def detect_encoding(filepath):
-    """Detecta encoding de um arquivo"""
-    with open(filepath, 'rb') as f:
+    """Detecta encoding de um arquivo (entradas compactadas são lidas descompactadas)"""
+    with open_input(filepath) as f:
         result = chardet.detect(f.read(10000))
         return result['encoding'] or 'utf-8'
 
@@ -39,6 +51,41 @@ def get_separator(sep_name):
     return separators.get(sep_name, sep_name)
 
 
+def parse_size(value):
+    """Converte tamanho como '100M' ou '1.5GB' para bytes"""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = value.strip().upper().rstrip('B')
+    try:
+        if text and text[-1] in units:
+            return int(float(text[:-1]) * units[text[-1]])
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(t("cli_invalid_size").format(value))
+
+
+def derived_output(filepath, suffix):
+    """Nome de saída padrão ao lado da entrada (dados.csv -> dados_clean.csv)"""
+    archive, member = split_member(filepath)
+    if member is not None:
+        return str(Path(archive).parent / f"{Path(strip_compression(member)).stem}{suffix}.csv")
+    return filepath.replace('.csv', f'{suffix}.csv')
+
+
+def open_checkpoint(args, output, inputs):
+    """Checkpoint periódico do job; com --resume carrega o último ponto salvo"""
+    settings = {key: value for key, value in vars(args).items() if key != 'resume'}
+    checkpoint = Checkpoint(checkpoint_path(output), job_fingerprint(args.command, settings, inputs))
+    
+    if not args.resume:
+        # Checkpoint antigo não vale para uma execução recomeçada do zero
+        checkpoint.clear()
+    elif checkpoint.load() is None:
+        print(t("cli_resume_none"))
+    else:
+        print(t("cli_resuming").format(checkpoint.path))
+    return checkpoint
+
+
 def get_user_data_dir():
     """Retorna o diretório de dados do usuário"""
     documents = Path(os.path.expanduser("~")) / "OneDrive - Claro SA" / "Documentos"
@@ -71,32 +118,151 @@ def load_history():
 # ============================================================
 # MERGE - Merge multiple CSVs / Consolidar múltiplos CSVs
 # ============================================================
+def print_schema_drift(files, schemas):
+    """Print the column drift report / Mostra o relatório de divergência de colunas"""
+    columns = union_columns(schemas)
+    report = schema_drift(files, schemas, columns)
+    
+    print(t("cli_schema_columns").format(len(columns)))
+    if not report:
+        return
+    
+    print(t("cli_schema_drift").format(len(report)))
+    for entry in report:
+        print(f"    • {Path(entry['file']).name}")
+        if entry["missing"]:
+            print(t("cli_schema_missing").format(", ".join(map(str, entry["missing"]))))
+        if entry["added"]:
+            print(t("cli_schema_added").format(", ".join(map(str, entry["added"]))))
+        if entry["reordered"]:
+            print(t("cli_schema_reordered"))
+
+
 def cmd_merge(args):
     """Merge multiple CSV files into one / Consolida múltiplos arquivos CSV em um único"""
+    # Arquivos .zip entram como um arquivo por membro CSV
+    args.files = expand_inputs(args.files)
     print(t("cli_merging").format(len(args.files)))
     
     sep = get_separator(args.separator)
     enc = args.encoding
+    args.output = compressed_path(args.output, args.compress)
     
-    dfs = []
-    for filepath in args.files:
-        if enc == 'auto':
-            file_enc = detect_encoding(filepath)
+    # Incremental: só arquivos novos ou que cresceram desde a última execução
+    if args.incremental:
+        if args.drop_duplicates:
+            print(t("cli_incremental_no_dedup"))
+            return
+        if args.resume:
+            print(t("cli_resume_unsupported"))
+        
+        summary = incremental_merge(
+            args.files, args.output, sep=sep, encoding=enc, chunksize=args.chunksize,
+            source_column=args.add_source_column, compress_workers=args.compress_workers,
+            on_file=lambda i, filepath: print(t("cli_reading").format(filepath))
+        )
+        if summary["mode"] == "rebuild":
+            print(t("cli_incremental_rebuild"))
         else:
-            file_enc = enc
+            print(t("cli_incremental_append").format(summary["new"], summary["grown"], summary["unchanged"]))
+        print(t("cli_saved").format(args.output, summary["rows"]))
+        return
+    
+    # Entradas já ordenadas: merge k-way em uma única passada
+    if args.sorted_by:
+        if args.resume:
+            print(t("cli_resume_unsupported"))
+        print(t("cli_sorted_merge").format(args.sorted_by))
+        schemas = scan_headers(args.files, sep, enc)
+        print_schema_drift(args.files, schemas)
+        
+        with ExternalDeduplicator(memory_budget=args.dedup_memory * 1024 * 1024) as dedup:
+            total = sorted_merge(
+                args.files, args.output, args.sorted_by, sep=sep, encoding=enc,
+                chunksize=args.chunksize, numeric=args.sort_numeric, schemas=schemas,
+                dedup=dedup if args.drop_duplicates else None,
+                source_column=args.add_source_column, compress_workers=args.compress_workers
+            )
+        
+        if args.drop_duplicates:
+            print(t("cli_removed_duplicates").format(dedup.dropped))
+        print(t("cli_saved").format(args.output, total))
+        return
+    
+    # Mesmo cabeçalho, separador e encoding: cópia direta dos bytes, sem parsing
+    if (not args.drop_duplicates and not args.no_byte_copy and not args.add_source_column
+            and can_byte_concat(args.files, enc)):
+        print(t("cli_byte_copy"))
+        checkpoint = open_checkpoint(args, args.output, args.files)
+        written = byte_concat_merge(
+            args.files, args.output, compress_workers=args.compress_workers, checkpoint=checkpoint,
+            on_file=lambda i, filepath: print(t("cli_reading").format(filepath))
+        )
+        checkpoint.clear()
+        print(t("cli_saved_bytes").format(args.output, written / (1024 * 1024)))
+        return
+    
+    if args.stream:
+        print(t("cli_streaming").format(args.chunksize))
+        
+        # Pré-leitura dos cabeçalhos para montar o schema final
+        schemas = scan_headers(args.files, sep, enc)
+        print_schema_drift(args.files, schemas)
+        
+        # A deduplicação guarda estado em memória: sem checkpoint nesse caso
+        checkpoint = None
+        if args.drop_duplicates:
+            if args.resume:
+                print(t("cli_resume_unsupported"))
+        else:
+            checkpoint = open_checkpoint(args, args.output, args.files)
+        
+        with ExternalDeduplicator(memory_budget=args.dedup_memory * 1024 * 1024) as dedup:
+            total = stream_merge(
+                args.files, args.output, sep=sep, encoding=enc, chunksize=args.chunksize,
+                workers=args.workers, schemas=schemas,
+                dedup=dedup if args.drop_duplicates else None,
+                source_column=args.add_source_column, compress_workers=args.compress_workers,
+                checkpoint=checkpoint,
+                on_file=lambda i, filepath: print(t("cli_reading").format(filepath))
+            )
         
+        if checkpoint:
+            checkpoint.clear()
+        if args.drop_duplicates:
+            print(t("cli_removed_duplicates").format(dedup.dropped))
+        print(t("cli_saved").format(args.output, total))
+        return
+    
+    if args.resume:
+        print(t("cli_resume_unsupported"))
+    if args.workers > 1:
+        print(t("cli_workers").format(args.workers))
+    
+    # Origem das linhas como categoria compartilhada: um código inteiro por linha
+    sources = list(dict.fromkeys(args.files))
+    
+    dfs = []
+    for i, filepath, df in iter_csv_files(args.files, sep, enc, workers=args.workers):
         print(t("cli_reading").format(filepath))
-        df = pd.read_csv(filepath, sep=sep, encoding=file_enc, low_memory=False)
+        if args.add_source_column:
+            df = add_source_column(df, args.add_source_column, filepath, sources)
         dfs.append(df)
     
     result = pd.concat(dfs, ignore_index=True)
+    if args.add_source_column:
+        # Com colunas divergentes o concat intercala as novas: origem sempre por último
+        name = args.add_source_column
+        result = result[[col for col in result.columns if col != name] + [name]]
     
     if args.drop_duplicates:
         before = len(result)
-        result = result.drop_duplicates()
+        subset = [col for col in result.columns if col != args.add_source_column]
+        result = result.drop_duplicates(subset=subset)
         print(t("cli_removed_duplicates").format(before - len(result)))
     
-    result.to_csv(args.output, sep=sep, index=False, encoding='utf-8')
+    with open_output(args.output, 'w', 'utf-8', workers=args.compress_workers) as out:
+        result.to_csv(out, sep=sep, index=False)
     print(t("cli_saved").format(args.output, len(result)))
 
 
@@ -105,30 +271,100 @@ def cmd_merge(args):
 # ============================================================
 def cmd_split(args):
     """Split a large CSV into smaller parts / Divide um CSV grande em partes menores"""
+    args.file = resolve_input(args.file)
     print(t("cli_splitting").format(args.file))
     
     sep = get_separator(args.separator)
     enc = args.encoding if args.encoding != 'auto' else detect_encoding(args.file)
     
-    df = pd.read_csv(args.file, sep=sep, encoding=enc, low_memory=False)
-    total_rows = len(df)
+    base_name = Path(strip_compression(split_member(args.file)[1] or args.file)).stem
+    output_dir = Path(args.output_dir or Path(source_path(args.file)).parent)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    ext = compressed_path('.csv', args.compress)
+    checkpoint = open_checkpoint(args, output_dir / base_name, [args.file])
+    
+    def on_part(n, path, rows):
+        print(f"  → {Path(path).name}: {rows} {t('lines')}")
+    
+    # Divisão por valor de coluna: um arquivo por valor distinto
+    if args.by:
+        print(t("cli_split_by").format(args.by, args.max_open))
+        parts = split_by_column(
+            args.file,
+            args.by,
+            lambda name: output_dir / f"{base_name}_{name}{ext}",
+            sep=sep,
+            encoding=enc,
+            chunksize=args.chunksize,
+            max_open=args.max_open,
+            on_part=on_part,
+            checkpoint=checkpoint
+        )
+        checkpoint.clear()
+        total_rows = sum(rows for _, rows in parts)
+        print(t("cli_split_bytes_info").format(total_rows, len(parts)))
+        print(t("cli_files_created").format(len(parts), output_dir))
+        return
     
-    num_files = (total_rows // args.rows) + (1 if total_rows % args.rows else 0)
-    print(t("cli_split_info").format(total_rows, args.rows, num_files))
+    # Divisão por hash da chave em N buckets
+    if args.hash_key:
+        print(t("cli_split_hash").format(args.hash_key, args.buckets))
+        parts = split_by_hash(
+            args.file,
+            args.hash_key,
+            args.buckets,
+            lambda bucket: output_dir / f"{base_name}_bucket{bucket:03d}{ext}",
+            sep=sep,
+            encoding=enc,
+            chunksize=args.chunksize,
+            max_open=args.max_open,
+            on_part=on_part,
+            checkpoint=checkpoint
+        )
+        checkpoint.clear()
+        total_rows = sum(rows for _, rows in parts)
+        print(t("cli_split_bytes_info").format(total_rows, len(parts)))
+        print(t("cli_files_created").format(len(parts), output_dir))
+        return
     
-    base_name = Path(args.file).stem
-    output_dir = Path(args.output_dir or Path(args.file).parent)
-    output_dir.mkdir(parents=True, exist_ok=True)
+    # Divisão por tamanho: varre os bytes brutos, sem DataFrame
+    if args.max_bytes:
+        print(t("cli_split_bytes").format(args.max_bytes / (1024 * 1024)))
+        parts = split_bytes(
+            args.file,
+            args.max_bytes,
+            lambda n: output_dir / f"{base_name}_part{n:03d}{ext}",
+            on_part=on_part,
+            compress_workers=args.compress_workers,
+            checkpoint=checkpoint
+        )
+        checkpoint.clear()
+        total_rows = sum(rows for _, rows in parts)
+        print(t("cli_split_bytes_info").format(total_rows, len(parts)))
+        print(t("cli_files_created").format(len(parts), output_dir))
+        return
     
-    for i in range(num_files):
-        start = i * args.rows
-        end = min((i + 1) * args.rows, total_rows)
-        chunk = df.iloc[start:end]
-        
-        output_file = output_dir / f"{base_name}_part{i+1:03d}.csv"
-        chunk.to_csv(output_file, sep=sep, index=False, encoding='utf-8')
-        print(f"  → {output_file.name}: {len(chunk)} {t('lines')}")
+    print(t("cli_streaming").format(min(args.rows, args.chunksize)))
+    if args.workers > 1:
+        print(t("cli_split_workers").format(args.workers))
+    
+    parts = split_rows(
+        args.file,
+        args.rows,
+        lambda n: output_dir / f"{base_name}_part{n:03d}{ext}",
+        sep=sep,
+        encoding=enc,
+        chunksize=args.chunksize,
+        on_part=on_part,
+        workers=args.workers,
+        compress_workers=args.compress_workers,
+        checkpoint=checkpoint
+    )
+    checkpoint.clear()
+    num_files = len(parts)
+    total_rows = sum(rows for _, rows in parts)
     
+    print(t("cli_split_info").format(total_rows, args.rows, num_files))
     print(t("cli_files_created").format(num_files, output_dir))
 
 
@@ -137,29 +373,63 @@ def cmd_split(args):
 # ============================================================
 def cmd_clean(args):
     """Clean CSV data / Limpa dados de um CSV"""
+    args.file = resolve_input(args.file)
     print(t("cli_cleaning").format(args.file))
     
     sep = get_separator(args.separator)
     enc = args.encoding if args.encoding != 'auto' else detect_encoding(args.file)
+    output = args.output or derived_output(args.file, '_clean')
+    
+    steps = [step for step, enabled in
+             [('trim', args.trim), ('remove_quotes', args.remove_quotes), ('uppercase', args.uppercase)] if enabled]
+    # Tabela de substituições: todas as regras em uma única varredura por célula
+    replace_table = None
+    inputs = [args.file]
+    if args.replace_table:
+        replace_table = load_replace_table(args.replace_table, sep, 'auto')
+        inputs.append(args.replace_table)
+        print(t("cli_replace_table").format(len(replace_table), replace_table.regex_count))
+    
+    cleaner = ChunkCleaner(CleaningPlan(steps, replace_table), drop_empty=args.drop_empty)
+    if args.workers > 1:
+        print(t("cli_clean_workers").format(args.workers))
+    
+    # Duplicatas: conjunto de hashes de 64 bits das linhas já limpas, em streaming
+    dedup_keys = [key.strip() for key in args.dedup_keys.split(',')] if args.dedup_keys else None
+    if dedup_keys or args.keep or args.verify_duplicates:
+        args.drop_duplicates = True
     
-    df = pd.read_csv(args.file, sep=sep, encoding=enc, low_memory=False, dtype=str)
-    
-    for col in df.columns:
-        if args.trim:
-            df[col] = df[col].str.strip()
-        if args.remove_quotes:
-            df[col] = df[col].str.replace('"', '').str.replace("'", '')
-        if args.uppercase:
-            df[col] = df[col].str.upper()
+    if args.drop_duplicates:
+        # A deduplicação guarda estado em memória: sem checkpoint nesse caso
+        if args.resume:
+            print(t("cli_resume_unsupported"))
+        print(t("cli_clean_dedup").format(', '.join(dedup_keys) if dedup_keys else t("cli_all_columns"),
+                                          args.keep or 'first'))
+        with HashDeduplicator(dedup_keys, args.keep or 'first', args.verify_duplicates,
+                              memory_budget=args.dedup_memory * 1024 * 1024) as dedup:
+            rows_read, rows_written = dedup_rewrite(
+                args.file, output, dedup, cleaner, sep=sep, encoding=enc, chunksize=args.chunksize,
+                workers=args.workers
+            )
+        removed_duplicates = dedup.dropped
+    else:
+        # Limpeza chunk a chunk (em paralelo com --workers), com checkpoint para --resume
+        checkpoint = open_checkpoint(args, output, inputs)
+        rows_read, rows_written = stream_rewrite(
+            args.file, output, cleaner, sep=sep, encoding=enc, chunksize=args.chunksize,
+            checkpoint=checkpoint, workers=args.workers
+        )
+        checkpoint.clear()
+        removed_duplicates = 0
     
     if args.drop_empty:
-        before = len(df)
-        df = df.dropna(how='all')
-        print(t("cli_removed_empty").format(before - len(df)))
-    
-    output = args.output or args.file.replace('.csv', '_clean.csv')
-    df.to_csv(output, sep=sep, index=False, encoding='utf-8')
-    print(t("cli_saved").format(output, len(df)))
+        print(t("cli_removed_empty").format(rows_read - rows_written - removed_duplicates))
+    if args.drop_duplicates:
+        print(t("cli_removed_duplicates").format(removed_duplicates))
+    memo = cleaner.memo
+    if memo.saved:
+        print(t("cli_memo_saved").format(memo.computed, memo.cells, 100 * memo.saved / memo.cells))
+    print(t("cli_saved").format(output, rows_written))
 
 
 # ============================================================
@@ -167,16 +437,36 @@ def cmd_clean(args):
 # ============================================================
 def cmd_convert(args):
     """Convert between formats (CSV, XLSX, JSON) / Converte entre formatos"""
+    args.file = resolve_input(args.file)
     print(t("cli_converting").format(args.file))
     
-    input_ext = Path(args.file).suffix.lower()
-    output_ext = Path(args.output).suffix.lower()
+    input_ext = Path(strip_compression(args.file)).suffix.lower()
+    output_ext = Path(strip_compression(args.output)).suffix.lower()
+    if output_ext in ('.csv', '.json'):
+        args.output = compressed_path(args.output, args.compress)
+    
+    # CSV para CSV: conversão em streaming, com checkpoint para --resume
+    if input_ext == '.csv' and output_ext == '.csv':
+        sep = get_separator(args.separator)
+        enc = args.encoding if args.encoding != 'auto' else detect_encoding(args.file)
+        checkpoint = open_checkpoint(args, args.output, [args.file])
+        _, rows = stream_rewrite(
+            args.file, args.output, sep=sep, encoding=enc, chunksize=args.chunksize,
+            output_sep=get_separator(args.output_separator or 'semicolon'),
+            compress_workers=args.compress_workers, checkpoint=checkpoint
+        )
+        checkpoint.clear()
+        print(t("cli_saved").format(args.output, rows))
+        return
+    
+    if args.resume:
+        print(t("cli_resume_unsupported"))
     
     # Read input file
     if input_ext == '.csv':
         sep = get_separator(args.separator)
         enc = args.encoding if args.encoding != 'auto' else detect_encoding(args.file)
-        df = pd.read_csv(args.file, sep=sep, encoding=enc, low_memory=False)
+        df = read_csv_file(args.file, sep, enc)
     elif input_ext in ['.xlsx', '.xls']:
         df = pd.read_excel(args.file, sheet_name=args.sheet or 0)
     elif input_ext == '.json':
@@ -188,7 +478,8 @@ def cmd_convert(args):
     # Save output file
     if output_ext == '.csv':
         sep = get_separator(args.output_separator or 'semicolon')
-        df.to_csv(args.output, sep=sep, index=False, encoding='utf-8')
+        with open_output(args.output, 'w', 'utf-8', workers=args.compress_workers) as out:
+            df.to_csv(out, sep=sep, index=False)
     elif output_ext == '.xlsx':
         df.to_excel(args.output, index=False, engine='openpyxl')
     elif output_ext == '.json':
@@ -205,16 +496,17 @@ def cmd_convert(args):
 # ============================================================
 def cmd_transform(args):
     """Apply lookup table to a column / Aplica tabela DE-PARA em uma coluna"""
+    args.file = resolve_input(args.file)
     print(t("cli_transforming").format(args.file))
     
     sep = get_separator(args.separator)
     enc = args.encoding if args.encoding != 'auto' else detect_encoding(args.file)
     
-    df = pd.read_csv(args.file, sep=sep, encoding=enc, low_memory=False)
+    df = read_csv_file(args.file, sep, enc)
     
     # Load lookup table
     depara_enc = detect_encoding(args.depara)
-    depara = pd.read_csv(args.depara, sep=sep, encoding=depara_enc)
+    depara = read_csv_file(args.depara, sep, depara_enc)
     
     if len(depara.columns) < 2:
         print(t("cli_depara_need_cols"))
@@ -235,7 +527,7 @@ def cmd_transform(args):
     
     print(t("cli_values_replaced").format(changed))
     
-    output = args.output or args.file.replace('.csv', '_transformed.csv')
+    output = args.output or derived_output(args.file, '_transformed')
     df.to_csv(output, sep=sep, index=False, encoding='utf-8')
     print(f"✅ {t('save')}: {output}")
 
@@ -245,6 +537,7 @@ def cmd_transform(args):
 # ============================================================
 def cmd_info(args):
     """Show CSV file information / Mostra informações sobre um arquivo CSV"""
+    args.file = resolve_input(args.file)
     print(t("cli_analyzing").format(args.file))
     
     sep = get_separator(args.separator)
@@ -252,7 +545,7 @@ def cmd_info(args):
     
     print(f"\n  {t('cli_encoding_detected').format(enc).strip()}")
     
-    df = pd.read_csv(args.file, sep=sep, encoding=enc, low_memory=False)
+    df = read_csv_file(args.file, sep, enc)
     
     print(t("cli_rows").format(len(df)))
     print(t("cli_columns").format(len(df.columns)))
@@ -371,8 +664,20 @@ def create_parser():
         epilog="""
 Examples / Exemplos:
   %(prog)s merge -o output.csv file1.csv file2.csv
+  %(prog)s merge --stream -o output.csv monthly_*.csv
+  %(prog)s merge --incremental -o output.csv drops/*.csv
+  %(prog)s merge --sorted-by TIMESTAMP -o output.csv sorted_*.csv
   %(prog)s split -r 10000 large_file.csv
+  %(prog)s split --max-bytes 100M large_file.csv
+  %(prog)s split --by STATE large_file.csv
+  %(prog)s split --hash-key CUSTOMER_ID --buckets 16 large_file.csv
+  %(prog)s split --compress gzip --compress-workers 8 large_file.csv
+  %(prog)s split -r 10000 --resume large_file.csv
   %(prog)s clean --trim --uppercase file.csv
+  %(prog)s clean --trim --workers 32 large_file.csv
+  %(prog)s clean --replace-table rules.csv file.csv
+  %(prog)s clean --remove-duplicates --remove-empty file.csv
+  %(prog)s clean --dedup-keys CUSTOMER_ID --keep last file.csv
   %(prog)s convert spreadsheet.xlsx -o data.csv
   %(prog)s transform data.csv -c STATE --depara states.csv
   %(prog)s info file.csv --sample 5
@@ -393,6 +698,19 @@ Examples / Exemplos:
     merge_parser.add_argument('-s', '--separator', default='semicolon', help=t('cli_arg_separator'))
     merge_parser.add_argument('-e', '--encoding', default='auto', help=t('cli_arg_encoding'))
     merge_parser.add_argument('--drop-duplicates', action='store_true', help=t('cli_arg_drop_duplicates'))
+    merge_parser.add_argument('--stream', action='store_true', help=t('cli_arg_stream'))
+    merge_parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help=t('cli_arg_chunksize'))
+    merge_parser.add_argument('--dedup-memory', type=int, default=DEFAULT_DEDUP_MEMORY // (1024 * 1024),
+                              help=t('cli_arg_dedup_memory'))
+    merge_parser.add_argument('--add-source-column', metavar='NAME', help=t('cli_arg_add_source_column'))
+    merge_parser.add_argument('--sorted-by', metavar='COL', help=t('cli_arg_sorted_by'))
+    merge_parser.add_argument('--sort-numeric', action='store_true', help=t('cli_arg_sort_numeric'))
+    merge_parser.add_argument('--incremental', action='store_true', help=t('cli_arg_incremental'))
+    merge_parser.add_argument('--no-byte-copy', action='store_true', help=t('cli_arg_no_byte_copy'))
+    merge_parser.add_argument('-w', '--workers', type=int, default=1, help=t('cli_arg_workers'))
+    merge_parser.add_argument('--compress', choices=['gzip', 'bz2', 'xz'], help=t('cli_arg_compress'))
+    merge_parser.add_argument('--compress-workers', type=int, default=1, help=t('cli_arg_compress_workers'))
+    merge_parser.add_argument('--resume', action='store_true', help=t('cli_arg_resume'))
     
     # --- SPLIT ---
     split_parser = subparsers.add_parser('split', help=t('cli_split_help'))
@@ -401,6 +719,16 @@ Examples / Exemplos:
     split_parser.add_argument('-o', '--output-dir', help=t('cli_arg_output_dir'))
     split_parser.add_argument('-s', '--separator', default='semicolon', help=t('cli_arg_separator'))
     split_parser.add_argument('-e', '--encoding', default='auto', help=t('cli_arg_encoding'))
+    split_parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help=t('cli_arg_chunksize'))
+    split_parser.add_argument('--max-bytes', type=parse_size, help=t('cli_arg_max_bytes'))
+    split_parser.add_argument('-w', '--workers', type=int, default=1, help=t('cli_arg_split_workers'))
+    split_parser.add_argument('--by', metavar='COLUMN', help=t('cli_arg_split_by'))
+    split_parser.add_argument('--hash-key', metavar='COLUMN', help=t('cli_arg_hash_key'))
+    split_parser.add_argument('--buckets', type=int, default=8, help=t('cli_arg_buckets'))
+    split_parser.add_argument('--max-open', type=int, default=DEFAULT_MAX_OPEN_FILES, help=t('cli_arg_max_open'))
+    split_parser.add_argument('--compress', choices=['gzip', 'bz2', 'xz'], help=t('cli_arg_compress'))
+    split_parser.add_argument('--compress-workers', type=int, default=1, help=t('cli_arg_compress_workers'))
+    split_parser.add_argument('--resume', action='store_true', help=t('cli_arg_resume'))
     
     # --- CLEAN ---
     clean_parser = subparsers.add_parser('clean', help=t('cli_clean_help'))
@@ -411,7 +739,18 @@ Examples / Exemplos:
     clean_parser.add_argument('--trim', action='store_true', help=t('cli_arg_trim'))
     clean_parser.add_argument('--remove-quotes', action='store_true', help=t('cli_arg_remove_quotes'))
     clean_parser.add_argument('--uppercase', action='store_true', help=t('cli_arg_uppercase'))
-    clean_parser.add_argument('--drop-empty', action='store_true', help=t('cli_arg_drop_empty'))
+    clean_parser.add_argument('--drop-empty', '--remove-empty', action='store_true', help=t('cli_arg_drop_empty'))
+    clean_parser.add_argument('--drop-duplicates', '--remove-duplicates', action='store_true',
+                              help=t('cli_arg_drop_duplicates'))
+    clean_parser.add_argument('--dedup-keys', metavar='COLS', help=t('cli_arg_dedup_keys'))
+    clean_parser.add_argument('--keep', choices=['first', 'last'], help=t('cli_arg_keep'))
+    clean_parser.add_argument('--verify-duplicates', action='store_true', help=t('cli_arg_verify_duplicates'))
+    clean_parser.add_argument('--dedup-memory', type=int, default=DEFAULT_DEDUP_MEMORY // (1024 * 1024),
+                              help=t('cli_arg_dedup_memory'))
+    clean_parser.add_argument('--replace-table', help=t('cli_arg_replace_table'))
+    clean_parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help=t('cli_arg_chunksize'))
+    clean_parser.add_argument('-w', '--workers', type=int, default=1, help=t('cli_arg_clean_workers'))
+    clean_parser.add_argument('--resume', action='store_true', help=t('cli_arg_resume'))
     
     # --- CONVERT ---
     convert_parser = subparsers.add_parser('convert', help=t('cli_convert_help'))
@@ -421,6 +760,10 @@ Examples / Exemplos:
     convert_parser.add_argument('--output-separator', help=t('cli_arg_output_separator'))
     convert_parser.add_argument('-e', '--encoding', default='auto', help=t('cli_arg_encoding'))
     convert_parser.add_argument('--sheet', help=t('cli_arg_sheet'))
+    convert_parser.add_argument('--compress', choices=['gzip', 'bz2', 'xz'], help=t('cli_arg_compress'))
+    convert_parser.add_argument('--compress-workers', type=int, default=1, help=t('cli_arg_compress_workers'))
+    convert_parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help=t('cli_arg_chunksize'))
+    convert_parser.add_argument('--resume', action='store_true', help=t('cli_arg_resume'))
     
     # --- TRANSFORM ---
     transform_parser = subparsers.add_parser('transform', help=t('cli_transform_help'))
@@ -484,4 +827,5 @@ def main():
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,80 @@
+# Engine package init - processing routines shared by the CLI and the GUI
+# Rotinas de processamento compartilhadas entre CLI e interface gráfica
+from .csv_io import (
+    detect_encoding, iter_csv_files, estimate_row_count, count_rows, read_csv_file, stream_rewrite,
+    DEFAULT_CHUNKSIZE
+)
+from .merge import (
+    stream_merge, scan_headers, union_columns, schema_drift,
+    can_byte_concat, byte_concat_merge, sorted_merge, add_source_column
+)
+from .dedup import ExternalDeduplicator, HashDeduplicator, HashSet64, dedup_rewrite, DEFAULT_DEDUP_MEMORY
+from .incremental import incremental_merge, load_manifest, classify_inputs
+from .formats import DataFormatConverter
+from .compression import (
+    open_output, compressed_path, output_compression, strip_compression,
+    open_input, input_compression, expand_inputs, resolve_input, source_path, split_member, input_size
+)
+from .split import split_rows, split_bytes, split_by_column, split_by_hash, DEFAULT_MAX_OPEN_FILES
+from .checkpoint import Checkpoint, checkpoint_path, job_fingerprint, CHECKPOINT_INTERVAL
+from .cleaning import (
+    CleaningPlan, UniqueValueMemo, ChunkCleaner, ReplaceTable, load_replace_table, accent_table, fold_accents,
+    fold_accents_series, CLEANING_STEPS, MEMO_MAX_RATIO
+)
+
+__all__ = [
+    'detect_encoding',
+    'iter_csv_files',
+    'estimate_row_count',
+    'count_rows',
+    'read_csv_file',
+    'stream_rewrite',
+    'DEFAULT_CHUNKSIZE',
+    'stream_merge',
+    'scan_headers',
+    'union_columns',
+    'schema_drift',
+    'can_byte_concat',
+    'byte_concat_merge',
+    'sorted_merge',
+    'add_source_column',
+    'ExternalDeduplicator',
+    'HashDeduplicator',
+    'HashSet64',
+    'dedup_rewrite',
+    'DEFAULT_DEDUP_MEMORY',
+    'incremental_merge',
+    'load_manifest',
+    'classify_inputs',
+    'split_rows',
+    'split_bytes',
+    'split_by_column',
+    'split_by_hash',
+    'DataFormatConverter',
+    'open_output',
+    'compressed_path',
+    'output_compression',
+    'strip_compression',
+    'open_input',
+    'input_compression',
+    'expand_inputs',
+    'resolve_input',
+    'source_path',
+    'split_member',
+    'input_size',
+    'DEFAULT_MAX_OPEN_FILES',
+    'Checkpoint',
+    'checkpoint_path',
+    'job_fingerprint',
+    'CHECKPOINT_INTERVAL',
+    'CleaningPlan',
+    'UniqueValueMemo',
+    'ChunkCleaner',
+    'ReplaceTable',
+    'load_replace_table',
+    'accent_table',
+    'fold_accents',
+    'fold_accents_series',
+    'CLEANING_STEPS',
+    'MEMO_MAX_RATIO'
+]
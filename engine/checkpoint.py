@@ -0,0 +1,132 @@
+# Checkpoint - Pontos de retomada para jobs longos
+
+import hashlib
+import io
+import json
+import os
+import time
+from datetime import datetime
+
+from .compression import open_output, output_compression, source_path
+
+
+CHECKPOINT_VERSION = 1
+
+# Intervalo mínimo entre dois checkpoints (segundos)
+CHECKPOINT_INTERVAL = 30
+
+
+def checkpoint_path(output):
+    """Checkpoint file kept next to the output / Checkpoint ao lado da saída"""
+    return f"{output}.checkpoint.json"
+
+
+def job_fingerprint(job, settings, inputs):
+    """
+    Fingerprint of a job's settings and inputs / Impressão digital das configurações e entradas.
+    
+    Covers the command, its settings and the path, size and mtime of every
+    input, so a checkpoint is only reused for the very same job.
+    """
+    digest = hashlib.sha1(json.dumps({"job": job, "settings": settings}, sort_keys=True, default=str).encode())
+    for filepath in inputs:
+        stat = os.stat(source_path(filepath))
+        digest.update(f"{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime}".encode())
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """
+    Periodic, resumable progress of a long job / Progresso periódico e retomável de um job.
+    
+    Engine functions that accept a checkpoint call due() as they go and,
+    when it is time, make their outputs durable (commit_output) and save()
+    a JSON-serializable state: the input position (chunk index or byte
+    offset), the outputs already completed and the committed size of every
+    output. Writes are atomic, so a crash mid-save keeps the previous one.
+    
+    load() returns the saved state only if it was written by a job with the
+    same fingerprint; engine functions resume from `state` when it is set.
+    """
+    
+    def __init__(self, path, fingerprint, interval=CHECKPOINT_INTERVAL):
+        self.path = str(path)
+        self.fingerprint = fingerprint
+        self.interval = interval
+        self.state = None
+        self.saves = 0
+        self._last = time.monotonic()
+    
+    def load(self):
+        """Load the saved state of this job, or None / Carrega o estado salvo, se compatível"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != CHECKPOINT_VERSION or data.get("fingerprint") != self.fingerprint:
+            return None
+        self.state = data["state"]
+        return self.state
+    
+    def due(self):
+        """Whether the interval since the last save has elapsed"""
+        return time.monotonic() - self._last >= self.interval
+    
+    def save(self, state):
+        """Atomically replace the checkpoint with `state`"""
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "fingerprint": self.fingerprint,
+            "updated_at": datetime.now().isoformat(),
+            "state": state
+        }
+        temp = f"{self.path}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+        self.state = state
+        self.saves += 1
+        self._last = time.monotonic()
+    
+    def clear(self):
+        """Remove the checkpoint once the job finished"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.state = None
+
+
+def commit_output(out, path, encoding='utf-8', workers=1):
+    """
+    Make everything written to an output durable / Persiste o que já foi escrito na saída.
+    
+    Plain files are flushed and fsynced. A compressed stream can only be
+    cut at the end of a member, so it is closed and reopened in append
+    mode, which starts a new member. Returns (handle, size on disk); keep
+    using the returned handle.
+    """
+    if output_compression(path):
+        binary = not isinstance(out, io.TextIOBase)
+        out.close()
+        out = open_output(path, 'ab' if binary else 'a', encoding, workers=workers)
+    else:
+        out.flush()
+        os.fsync(out.fileno())
+    return out, os.path.getsize(path)
+
+
+def restore_outputs(sizes):
+    """
+    Cut outputs back to their checkpointed sizes / Trunca as saídas no tamanho do checkpoint.
+    
+    Whatever was written after the last checkpoint is discarded. Raises
+    ValueError if an output is missing or shorter than recorded, since
+    the job cannot then continue from that point.
+    """
+    for path, size in sizes.items():
+        if not os.path.exists(path) or os.path.getsize(path) < size:
+            raise ValueError(f"Cannot resume: '{path}' is missing or shorter than its checkpoint")
+    for path, size in sizes.items():
+        os.truncate(path, size)
@@ -0,0 +1,530 @@
+# Cleaning - Plano de limpeza de texto compilado uma única vez
+
+import json
+import os
+import re
+import sys
+import tempfile
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .csv_io import read_csv_file
+
+
+# Etapas de limpeza disponíveis, na ordem padrão da ferramenta de limpeza
+CLEANING_STEPS = ['remove_quotes', 'remove_spaces', 'remove_linebreaks', 'remove_special', 'trim', 'uppercase']
+
+# Caracteres mantidos por remove_special: letras, dígitos, espaços e pontuação comum
+SPECIAL_CHARS = re.compile(r'[^\w\s\-.,;:@/\\]')
+
+# Fração máxima de valores distintos por linha para limpar só os valores únicos
+MEMO_MAX_RATIO = 0.5
+
+# Valores amostrados do início da coluna para estimar a cardinalidade
+MEMO_SAMPLE = 10000
+
+# Substituições caractere a caractere de cada etapa (str.replace encadeado é mais
+# rápido que str.translate para tão poucos caracteres)
+_REPLACEMENTS = {
+    'remove_quotes': [('"', ''), ("'", '')],
+    'remove_linebreaks': [('\n', ' '), ('\r', '')]
+}
+
+
+def _replace_all(pairs):
+    def replace(text):
+        for old, new in pairs:
+            text = text.replace(old, new)
+        return text
+    return replace
+
+
+def _collapse_spaces(text):
+    return ' '.join(text.split())
+
+
+def _remove_special(text, _sub=SPECIAL_CHARS.sub):
+    return _sub('', text)
+
+
+# Valores da coluna "regex" da tabela de substituição que marcam a regra como regex
+REGEX_FLAGS = {'1', 'true', 'yes', 'y', 'sim', 's', 'x', 'regex'}
+
+
+def _trie_pattern(words):
+    """
+    Regex for a set of literals, factored as a prefix trie.
+    
+    At every position the engine follows one branch per character instead
+    of trying each literal in turn; optional suffixes are greedy, so the
+    longest literal matching at a position wins.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node):
+        alternatives = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        body = alternatives[0] if len(alternatives) == 1 else f"(?:{'|'.join(alternatives)})"
+        if '' in node:
+            return f"(?:{body})?"
+        return body
+    
+    return build(trie)
+
+
+class ReplaceTable:
+    """
+    Find/replace rules compiled into one matcher / Tabela de substituições compilada em um único regex.
+    
+    `rules` are (find, replace, regex) tuples. All literal finds go into a
+    single prefix-trie alternation (longest match first) and each regex
+    rule into its own named group of the same pattern, so a cell is
+    scanned once whatever the number of rules. Replacements are
+    simultaneous: scanning goes left to right, the text a rule inserts is
+    never matched again, and at a given position literals are tried before
+    regex rules, which are tried in table order. Regex replacements accept
+    group references (\\1, \\g<name>); numbered backreferences inside a
+    pattern are not supported, use named groups instead.
+    """
+    
+    def __init__(self, rules):
+        self.rules = [(str(find), str(replace), bool(regex)) for find, replace, regex in rules]
+        if any(not find for find, _, _ in self.rules):
+            raise ValueError("Replace table rules need a non-empty find value")
+        
+        self.literals = {}
+        for find, replace, regex in self.rules:
+            if not regex:
+                self.literals.setdefault(find, replace)
+        self.patterns = {}
+        
+        groups = []
+        if self.literals:
+            groups.append(f"(?P<lit>{_trie_pattern(self.literals)})")
+        for i, (find, replace, regex) in enumerate(self.rules):
+            if regex:
+                # Cada regra compilada sozinha expande as referências da própria substituição
+                self.patterns[f"r{i}"] = (re.compile(find), replace, '\\' in replace)
+                groups.append(f"(?P<r{i}>{find})")
+        self.matcher = re.compile('|'.join(groups)) if groups else None
+    
+    def __len__(self):
+        return len(self.rules)
+    
+    def __getstate__(self):
+        return {"rules": self.rules}
+    
+    def __setstate__(self, state):
+        self.__init__(state["rules"])
+    
+    @property
+    def regex_count(self):
+        return len(self.patterns)
+    
+    def _replacement(self, match):
+        name = match.lastgroup
+        if name == 'lit':
+            return self.literals[match.group()]
+        pattern, replace, template = self.patterns[name]
+        if not template:
+            return replace
+        return pattern.match(match.string, match.start()).expand(replace)
+    
+    def replace_text(self, text):
+        """Apply every rule to one str in a single scan"""
+        if self.matcher is None:
+            return text
+        return self.matcher.sub(self._replacement, text)
+
+
+def _is_regex_flag(value):
+    return str(value).strip().lower() in REGEX_FLAGS
+
+
+def load_replace_table(path, sep=';', encoding='auto'):
+    """
+    Load find/replace rules from a CSV or JSON file / Carrega a tabela de substituições.
+    
+    CSV: a header row, then find and replace in the first two columns and
+    an optional third column flagging regex rules (1, true, sim, x...).
+    JSON: an object of literal {find: replace} pairs, or a list of
+    {"find", "replace", "regex"} objects or [find, replace, regex] lists.
+    """
+    if Path(path).suffix.lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            rules = [(find, replace, False) for find, replace in data.items()]
+        else:
+            rules = []
+            for item in data:
+                if isinstance(item, dict):
+                    rules.append((item["find"], item.get("replace", ""), item.get("regex", False)))
+                else:
+                    rules.append((item[0], item[1], item[2] if len(item) > 2 else False))
+        return ReplaceTable(rules)
+    
+    df = read_csv_file(path, sep, encoding, dtype=str, keep_default_na=False)
+    if len(df.columns) < 2:
+        raise ValueError("Replace table needs at least two columns: find and replace")
+    flags = df.iloc[:, 2].map(_is_regex_flag) if len(df.columns) > 2 else [False] * len(df)
+    return ReplaceTable(zip(df.iloc[:, 0], df.iloc[:, 1], flags))
+
+
+# Versão do formato do cache em disco da tabela de acentos
+ACCENT_CACHE_VERSION = 1
+
+# Marcador gravado no lugar dos caracteres que exigem NFD (e o próprio U+FFFF, se
+# aparecer no texto, também leva ao caminho NFD)
+NFD_FALLBACK = '\uffff'
+
+# Tabela de acentos carregada (uma vez por processo)
+_accent_table = None
+
+
+def _fold_nfd(text):
+    """Reference accent folding: NFD, then drop nonspacing marks (category Mn)"""
+    return ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
+
+
+def _build_accent_table():
+    """
+    Fold every code point once: (folded characters, unsafe code points).
+    
+    NFD only reorders combining characters (ccc != 0) among themselves and
+    never moves a starter. When a character folds to starters only (all
+    its marks are Mn and get dropped), folding a text is the same as
+    folding each character, so the result goes into the table. The few
+    characters that keep a non-Mn combining mark (some Mc marks) could be
+    reordered across characters; they are listed as unsafe instead.
+    """
+    table = {}
+    unsafe = []
+    for code in range(sys.maxunicode + 1):
+        char = chr(code)
+        decomposed = unicodedata.normalize('NFD', char)
+        if decomposed == char and not unicodedata.combining(char) and unicodedata.category(char) != 'Mn':
+            continue
+        kept = [c for c in decomposed if unicodedata.category(c) != 'Mn']
+        if any(unicodedata.combining(c) for c in kept):
+            unsafe.append(code)
+        elif ''.join(kept) != char:
+            table[code] = ''.join(kept)
+    return table, unsafe
+
+
+def accent_table(cache_dir=None):
+    """
+    Accent-folding translation table / Tabela de tradução para remover acentos.
+    
+    Returns a str.translate table (a list indexed by code point, which is
+    about twice as fast as a dict) mapping every accented or decomposable
+    character to its folded form and the rare unsafe characters to
+    NFD_FALLBACK. The folding is computed once from the Unicode database
+    of the running Python (under a second) and cached as JSON in
+    `cache_dir` (default: the temp directory), keyed by Unicode version;
+    each process then loads it once.
+    """
+    global _accent_table
+    if _accent_table is not None and cache_dir is None:
+        return _accent_table
+    
+    path = Path(cache_dir or tempfile.gettempdir()) / f"csvtoolbox_accents_{unicodedata.unidata_version}.json"
+    data = None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != ACCENT_CACHE_VERSION:
+            data = None
+    except (OSError, ValueError):
+        pass
+    
+    if data is None:
+        table, unsafe = _build_accent_table()
+        data = {"version": ACCENT_CACHE_VERSION, "table": table, "unsafe": unsafe}
+        try:
+            temp = f"{path}.{os.getpid()}.tmp"
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp, path)
+        except OSError:
+            pass
+    
+    # Código fora da lista não é traduzido (IndexError conta como "sem mapeamento")
+    folded = {int(code): value for code, value in data["table"].items()}
+    folded.update((code, NFD_FALLBACK) for code in data["unsafe"])
+    table = list(range(max(folded) + 1))
+    for code, value in folded.items():
+        table[code] = value
+    
+    if cache_dir is None:
+        _accent_table = table
+    return table
+
+
+def fold_accents(text):
+    """
+    Remove accents from one str / Remove acentos de um texto.
+    
+    Same result as NFD followed by dropping Mn characters, through the
+    translation table; texts with unsafe characters fall back to NFD.
+    """
+    if text.isascii():
+        return text
+    folded = text.translate(_accent_table or accent_table())
+    if NFD_FALLBACK in folded:
+        return _fold_nfd(text)
+    return folded
+
+
+def fold_accents_series(series):
+    """Remove accents from a column with Series.str.translate; returns a new Series"""
+    values = series.to_numpy(dtype=object, copy=True)
+    present = ~pd.isna(values)
+    texts = pd.Series(_as_texts(values[present]), dtype=object)
+    
+    folded = texts.str.translate(accent_table())
+    rare = folded.str.contains(NFD_FALLBACK, regex=False).to_numpy(dtype=bool)
+    if rare.any():
+        folded[rare] = texts[rare].map(_fold_nfd)
+    
+    values[present] = folded.to_numpy()
+    dtype = series.dtype if isinstance(series.dtype, pd.StringDtype) else object
+    return pd.Series(values, index=series.index, name=series.name, dtype=dtype)
+
+
+def _as_texts(values):
+    """Object array of str (values that are not str are converted with str())"""
+    if pd.api.types.infer_dtype(values, skipna=False) in ('string', 'empty'):
+        return values
+    return np.array([str(value) for value in values], dtype=object)
+
+
+class UniqueValueMemo:
+    """
+    Run a cleaning function on distinct values only / Limpa apenas os valores distintos.
+    
+    For every column apply() samples the first MEMO_SAMPLE values; when the
+    ratio of distinct values to rows is at most `max_ratio` the column is
+    factorized, `func` runs once per distinct value and the results are
+    mapped back with the integer codes (factorize -> func(uniques) -> take).
+    Otherwise `func` runs on every value. Missing values stay missing.
+    
+    The memo keeps counters across columns and chunks: `cells` cleaned,
+    `computed` function calls actually made and `memoized_columns`, so
+    `saved` is the number of calls avoided.
+    """
+    
+    def __init__(self, max_ratio=MEMO_MAX_RATIO, sample=MEMO_SAMPLE):
+        self.max_ratio = max_ratio
+        self.sample = sample
+        self.cells = 0
+        self.computed = 0
+        self.columns = 0
+        self.memoized_columns = 0
+    
+    @property
+    def saved(self):
+        """Function calls avoided so far"""
+        return self.cells - self.computed
+    
+    def merge(self, other):
+        """Add the counters of another memo (e.g. one used in a worker process)"""
+        self.cells += other.cells
+        self.computed += other.computed
+        self.columns += other.columns
+        self.memoized_columns += other.memoized_columns
+    
+    def low_cardinality(self, texts):
+        """Whether the sampled distinct/rows ratio is at most max_ratio"""
+        sample = texts[:self.sample]
+        return len(pd.unique(sample)) <= self.max_ratio * len(sample)
+    
+    def apply(self, series, func):
+        """
+        Clean a column with `func` (list of str -> list of str); returns a new Series.
+        """
+        values = series.to_numpy(dtype=object, copy=True)
+        present = ~pd.isna(values)
+        texts = _as_texts(values[present])
+        self.columns += 1
+        self.cells += len(texts)
+        
+        if len(texts) and self.low_cardinality(texts):
+            codes, uniques = pd.factorize(texts)
+            cleaned = np.empty(len(uniques), dtype=object)
+            cleaned[:] = func(list(uniques))
+            values[present] = cleaned.take(codes)
+            self.computed += len(uniques)
+            self.memoized_columns += 1
+        else:
+            values[present] = func(texts)
+            self.computed += len(texts)
+        
+        dtype = series.dtype if isinstance(series.dtype, pd.StringDtype) else object
+        return pd.Series(values, index=series.index, name=series.name, dtype=dtype)
+
+
+class CleaningPlan:
+    """
+    Text cleaning compiled once and run in a single pass / Limpeza de texto compilada uma única vez.
+    
+    `steps` are names from CLEANING_STEPS, applied in the given order:
+        
+        remove_quotes       drop " and '
+        remove_spaces       ' '.join(text.split()): collapse and strip whitespace
+        remove_linebreaks   \\n -> space, \\r removed
+        remove_special      drop characters other than word, space and -.,;:@/\\
+        trim                strip surrounding whitespace
+        uppercase           upper case
+    
+    The options are read once and compiled into a short list of string
+    functions: consecutive character replacements are merged, the regex is
+    precompiled and steps that cannot change anything after the previous
+    ones are dropped (line breaks or a trim right after remove_spaces).
+    Each column is then cleaned in one pass over its values, with no
+    per-cell option lookups, through a UniqueValueMemo: low-cardinality
+    columns are cleaned once per distinct value. Missing values stay
+    missing.
+    
+    A ReplaceTable, if given, runs last in the same pass.
+    
+    Plans are picklable (only the step names and replace rules travel), so
+    they can be sent to worker processes.
+    """
+    
+    def __init__(self, steps, replace_table=None):
+        unknown = [step for step in steps if step not in CLEANING_STEPS]
+        if unknown:
+            raise ValueError(f"Unknown cleaning steps: {', '.join(unknown)}")
+        self.steps = list(steps)
+        self.replace_table = replace_table if replace_table else None
+        self.funcs = self._compile(self.steps)
+        if self.replace_table:
+            self.funcs.append(self.replace_table.replace_text)
+    
+    def __getstate__(self):
+        return {"steps": self.steps, "replace_table": self.replace_table}
+    
+    def __setstate__(self, state):
+        self.__init__(state["steps"], state.get("replace_table"))
+    
+    @staticmethod
+    def _compile(steps):
+        funcs = []
+        pending = []
+        no_breaks = stripped = False
+        
+        for step in steps:
+            # Depois de remove_spaces não sobra quebra de linha; espaço nas pontas só volta
+            # se outra etapa remover caracteres
+            if (step == 'remove_linebreaks' and no_breaks) or (step == 'trim' and stripped):
+                continue
+            if step in ('remove_quotes', 'remove_special'):
+                stripped = False
+            
+            if step in _REPLACEMENTS:
+                pending.extend(_REPLACEMENTS[step])
+                continue
+            if pending:
+                funcs.append(_replace_all(pending))
+                pending = []
+            
+            if step == 'remove_spaces':
+                funcs.append(_collapse_spaces)
+                no_breaks = stripped = True
+            elif step == 'remove_special':
+                funcs.append(_remove_special)
+            elif step == 'trim':
+                funcs.append(str.strip)
+                stripped = True
+            else:
+                funcs.append(str.upper)
+        
+        if pending:
+            funcs.append(_replace_all(pending))
+        return funcs
+    
+    def clean_text(self, text):
+        """Clean a single value"""
+        if pd.isna(text):
+            return text
+        text = str(text)
+        for func in self.funcs:
+            text = func(text)
+        return text
+    
+    def clean_values(self, values):
+        """Clean a sequence of str values; returns a list"""
+        funcs = self.funcs
+        if len(funcs) == 1:
+            func = funcs[0]
+            return [func(text) for text in values]
+        
+        cleaned = []
+        for text in values:
+            for func in funcs:
+                text = func(text)
+            cleaned.append(text)
+        return cleaned
+    
+    def clean_series(self, series, memo=None):
+        """Clean one column; returns a new Series (memo: UniqueValueMemo collecting stats)"""
+        if not self.funcs or not len(series):
+            return series
+        return (memo or UniqueValueMemo()).apply(series, self.clean_values)
+    
+    def clean(self, df, on_column=None, memo=None):
+        """
+        Clean every column of df in place; returns df.
+        
+        `on_column(i, total)` is called after each column (progress). Pass
+        a UniqueValueMemo to read how much work memoization saved.
+        """
+        memo = memo or UniqueValueMemo()
+        total = len(df.columns)
+        for i, col in enumerate(df.columns):
+            df[col] = self.clean_series(df[col], memo)
+            if on_column:
+                on_column(i + 1, total)
+        return df
+
+
+class ChunkCleaner:
+    """
+    Picklable chunk transform built on a CleaningPlan / Transformação de chunk para limpeza.
+    
+    Calling it cleans a DataFrame with the plan, then optionally applies a
+    custom DataFrame.replace (`replace` = (find, replacement, regex)) and
+    drops rows that are entirely empty. Its UniqueValueMemo collects the
+    memoization counters; merge() adds those of a copy that ran in a worker
+    process (see stream_rewrite with workers > 1).
+    """
+    
+    def __init__(self, plan, drop_empty=False, replace=None):
+        self.plan = plan
+        self.drop_empty = drop_empty
+        self.replace = replace
+        self.memo = UniqueValueMemo()
+    
+    def __call__(self, df, on_column=None):
+        self.plan.clean(df, on_column, self.memo)
+        if self.replace:
+            find, replacement, regex = self.replace
+            df = df.replace(find, replacement, regex=regex)
+        if self.drop_empty:
+            df = df.dropna(how='all')
+        return df
+    
+    def merge(self, other):
+        """Add the counters of a copy used in a worker process"""
+        self.memo.merge(other.memo)
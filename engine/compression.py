@@ -0,0 +1,321 @@
+# Compression - Entrada e saída compactadas (.gz, .bz2, .xz, .zip) e gzip paralelo
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Extensão de arquivo -> compressão
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+
+# Compressão -> extensão (também aceita os nomes curtos do --compress)
+EXTENSION_FOR = {'gzip': '.gz', 'gz': '.gz', 'bz2': '.bz2', 'xz': '.xz'}
+
+# Buffer de leitura dos membros de .zip (1 MB)
+ZIP_BUFFER_SIZE = 1024 * 1024
+
+# Bloco comprimido de forma independente no gzip paralelo (1 MB)
+GZIP_BLOCK_SIZE = 1024 * 1024
+
+# Nível de compressão padrão do gzip paralelo (mesmo padrão do pigz)
+GZIP_LEVEL = 6
+
+
+def output_compression(path):
+    """Compression implied by the file extension, or None / Compressão pela extensão do arquivo"""
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(str(path))[1].lower())
+
+
+def compressed_path(path, compress=None):
+    """
+    Add the extension of `compress` to path unless it already has it / Acrescenta a extensão da compressão.
+    
+    Returns path unchanged when compress is None.
+    """
+    if not compress:
+        return path
+    extension = EXTENSION_FOR[compress]
+    if str(path).lower().endswith(extension):
+        return path
+    if isinstance(path, str):
+        return path + extension
+    return path.with_name(path.name + extension)
+
+
+def strip_compression(path):
+    """Path without its compression extension / Caminho sem a extensão de compressão"""
+    path = str(path)
+    if output_compression(path):
+        return os.path.splitext(path)[0]
+    return path
+
+
+class ParallelGzipWriter(io.RawIOBase):
+    """
+    Multi-member gzip writer that compresses blocks on several cores / Gzip paralelo em blocos.
+    
+    Written data is cut into GZIP_BLOCK_SIZE blocks and each block is
+    compressed as an independent gzip member in a thread pool (zlib
+    releases the GIL while compressing), pigz-style. Members are written
+    in order, so the file is a regular multi-member gzip readable by
+    gzip, zcat and pandas. At most two blocks per worker are pending.
+    """
+    
+    def __init__(self, path, mode='w', workers=None, block_size=GZIP_BLOCK_SIZE, level=GZIP_LEVEL):
+        super().__init__()
+        workers = workers or os.cpu_count() or 1
+        self.block_size = block_size
+        self.level = level
+        self._file = open(path, mode.replace('t', '').replace('b', '') + 'b')
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._window = workers * 2
+        self._pending = deque()
+        self._buffer = bytearray()
+        self._members = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            block = bytes(self._buffer[:self.block_size])
+            del self._buffer[:self.block_size]
+            self._submit(block)
+        return len(data)
+    
+    def _submit(self, block):
+        self._pending.append(self._pool.submit(gzip.compress, block, self.level))
+        if len(self._pending) >= self._window:
+            self._write_oldest()
+    
+    def _write_oldest(self):
+        self._file.write(self._pending.popleft().result())
+        self._members += 1
+    
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer or not self._members and not self._pending:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._write_oldest()
+        finally:
+            self._pool.shutdown()
+            self._file.close()
+            super().close()
+
+
+def open_output(path, mode='w', encoding='utf-8', newline='', workers=1):
+    """
+    Open an output file, compressed according to its extension / Abre a saída, compactada pela extensão.
+    
+    Plain paths behave like open(). For .gz, .bz2 and .xz the data goes
+    through the matching compressor; with workers > 1 gzip output uses
+    ParallelGzipWriter. Append mode adds a new member/stream, which every
+    reader concatenates. Binary modes return the raw binary stream.
+    """
+    compression = output_compression(path)
+    binary = 'b' in mode
+    base_mode = mode.replace('b', '').replace('t', '')
+    
+    if compression is None:
+        if binary:
+            return open(path, mode)
+        return open(path, base_mode, encoding=encoding, newline=newline)
+    
+    if compression == 'gzip' and workers > 1:
+        raw = ParallelGzipWriter(path, base_mode, workers)
+    elif compression == 'gzip':
+        raw = gzip.open(path, base_mode + 'b')
+    elif compression == 'bz2':
+        raw = bz2.open(path, base_mode + 'b')
+    else:
+        raw = lzma.open(path, base_mode + 'b')
+    
+    if binary:
+        return raw
+    return io.TextIOWrapper(raw, encoding=encoding, newline=newline)
+
+
+# ============================================================
+# Entradas compactadas / Compressed inputs
+# ============================================================
+
+# Assinaturas (magic bytes) dos formatos compactados
+MAGIC_BYTES = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip')
+]
+
+# Separa o arquivo .zip do membro: "dados.zip::2024/janeiro.csv"
+ZIP_MEMBER_SEP = '::'
+
+# Extensões de membros tratados como CSV dentro de um .zip
+ZIP_CSV_EXTENSIONS = ('.csv', '.txt', '.tsv')
+
+
+def split_member(path):
+    """Split 'archive.zip::member' into (archive, member); member is None for plain paths"""
+    path = str(path)
+    if ZIP_MEMBER_SEP in path:
+        archive, member = path.split(ZIP_MEMBER_SEP, 1)
+        return archive, member
+    return path, None
+
+
+def source_path(path):
+    """File on disk behind an input (the archive for zip members) / Arquivo em disco da entrada"""
+    return split_member(path)[0]
+
+
+def input_compression(path):
+    """
+    Compression of an input detected by magic bytes / Compressão detectada pelos magic bytes.
+    
+    Returns 'gzip', 'bz2', 'xz', 'zip', 'zip-member' or None. The
+    extension is not trusted: a renamed .csv.gz is still detected.
+    """
+    archive, member = split_member(path)
+    if member is not None:
+        return 'zip-member'
+    try:
+        with open(archive, 'rb') as f:
+            head = f.read(6)
+    except OSError:
+        return None
+    for magic, compression in MAGIC_BYTES:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def zip_members(path):
+    """CSV members of a zip archive, in archive order / Membros CSV de um .zip"""
+    with zipfile.ZipFile(path) as archive:
+        return [
+            info.filename for info in archive.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(ZIP_CSV_EXTENSIONS)
+        ]
+
+
+def expand_inputs(files):
+    """
+    Replace zip archives by one input per CSV member / Expande arquivos .zip em seus membros.
+    
+    Members are addressed as 'archive.zip::member.csv' and read straight
+    from the archive by open_input(), without extracting them to disk.
+    """
+    expanded = []
+    for filepath in files:
+        if input_compression(filepath) == 'zip':
+            expanded.extend(f"{filepath}{ZIP_MEMBER_SEP}{member}" for member in zip_members(filepath))
+        else:
+            expanded.append(filepath)
+    return expanded
+
+
+def resolve_input(path):
+    """
+    Single input for commands that read one file / Entrada única para comandos de um arquivo.
+    
+    A zip archive with exactly one CSV member resolves to that member;
+    archives with several members raise ValueError listing them.
+    """
+    if input_compression(path) != 'zip':
+        return path
+    members = zip_members(path)
+    if len(members) == 1:
+        return f"{path}{ZIP_MEMBER_SEP}{members[0]}"
+    raise ValueError(
+        f"'{path}' has {len(members)} CSV members; choose one with "
+        f"'{path}{ZIP_MEMBER_SEP}<member>': {', '.join(members)}"
+    )
+
+
+class _ZipMemberFile(io.BufferedReader):
+    """Zip member stream that also closes its archive"""
+    
+    def __init__(self, archive, member):
+        self._archive = zipfile.ZipFile(archive)
+        super().__init__(self._archive.open(member), buffer_size=ZIP_BUFFER_SIZE)
+        
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._archive.close()
+
+
+def open_input(path):
+    """
+    Open an input as a decompressed binary stream / Abre a entrada já descompactada.
+    
+    gzip, bz2 and xz are detected by magic bytes and decompressed while
+    reading; 'archive.zip::member' reads the member from the archive.
+    A zip archive path reads its only CSV member (see resolve_input).
+    Plain files are opened as they are.
+    """
+    compression = input_compression(path)
+    if compression == 'zip':
+        path = resolve_input(path)
+        compression = 'zip-member'
+    
+    if compression == 'zip-member':
+        return _ZipMemberFile(*split_member(path))
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'bz2':
+        return bz2.open(path, 'rb')
+    if compression == 'xz':
+        return lzma.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def input_size(path):
+    """
+    Uncompressed size of an input, or None if unknown / Tamanho descompactado da entrada.
+    
+    Exact for plain files and zip members; None for gzip, bz2 and xz
+    streams, whose size is only known after reading them.
+    """
+    compression = input_compression(path)
+    if compression is None:
+        return os.path.getsize(path)
+    if compression in ('zip', 'zip-member'):
+        archive, member = split_member(resolve_input(path))
+        with zipfile.ZipFile(archive) as zf:
+            return zf.getinfo(member).file_size
+    return None
+
+
+def sample_input(path, sample_size):
+    """
+    First decompressed bytes of an input and its estimated uncompressed size / Amostra da entrada.
+    
+    For gzip, bz2 and xz the uncompressed size is extrapolated from how
+    many compressed bytes were consumed to produce the sample.
+    """
+    compression = input_compression(path)
+    if compression not in ('gzip', 'bz2', 'xz'):
+        with open_input(path) as f:
+            return f.read(sample_size), input_size(path)
+    
+    opener = {'gzip': lambda raw: gzip.GzipFile(fileobj=raw), 'bz2': bz2.BZ2File, 'xz': lzma.LZMAFile}[compression]
+    with open(path, 'rb') as raw:
+        with opener(raw) as f:
+            sample = f.read(sample_size)
+            consumed = raw.tell()
+    
+    if len(sample) < sample_size:
+        return sample, len(sample)
+    return sample, int(len(sample) * os.path.getsize(path) / max(consumed, 1))
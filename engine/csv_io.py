@@ -0,0 +1,377 @@
+# CSV I/O helpers - Leitura e escrita de CSVs
+
+import io
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import chardet
+import numpy as np
+import pandas as pd
+
+from .compression import open_input, input_compression, sample_input, open_output
+from .checkpoint import commit_output, restore_outputs
+
+
+# Linhas por chunk nos modos streaming
+DEFAULT_CHUNKSIZE = 100000
+
+# Buffer das cópias binárias (1 MB)
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Amostra usada para estimar o número de linhas (64 KB por bloco)
+ESTIMATE_SAMPLE_SIZE = 64 * 1024
+
+# Blocos amostrados ao longo do arquivo para a estimativa
+ESTIMATE_SAMPLES = 4
+
+
+def detect_encoding(filepath, sample_size=10000):
+    """Detect file encoding / Detecta encoding de um arquivo (já descompactado)"""
+    with open_input(filepath) as f:
+        result = chardet.detect(f.read(sample_size))
+        return result['encoding'] or 'utf-8'
+
+
+def resolve_encoding(filepath, encoding):
+    """Resolve 'auto' into the detected encoding / Resolve 'auto' para o encoding detectado"""
+    if encoding in ('auto', 'auto-detect', None):
+        return detect_encoding(filepath)
+    return encoding
+
+
+def read_header_bytes(filepath):
+    """Return the raw first line, terminator included / Retorna a primeira linha em bytes"""
+    with open_input(filepath) as f:
+        return f.readline()
+
+
+def estimate_row_count(filepath, sample_size=ESTIMATE_SAMPLE_SIZE, samples=ESTIMATE_SAMPLES):
+    """
+    Estimate data rows from sampled blocks / Estima o número de linhas por blocos amostrados.
+
+    Exact for files smaller than the sample. Larger files are sampled at
+    `samples` evenly spaced offsets (start, middle, ..., end) and the
+    average line length of those blocks is extrapolated to the file size,
+    so the cost is a few small reads whatever the file size. Compressed
+    inputs are estimated from the first decompressed block.
+    """
+    if input_compression(filepath):
+        sample, size = sample_input(filepath, sample_size * samples)
+        lines = sample.count(b'\n')
+        if len(sample) >= size:
+            if sample and not sample.endswith(b'\n'):
+                lines += 1
+            return max(0, lines - 1)
+        return max(0, int(size * lines / len(sample)) - 1) if lines else 0
+    
+    size = os.path.getsize(filepath)
+    with open(filepath, 'rb') as f:
+        sample = f.read(sample_size)
+        if len(sample) == size:
+            lines = sample.count(b'\n')
+            if sample and not sample.endswith(b'\n'):
+                lines += 1
+            return max(0, lines - 1)
+        
+        lines = sample.count(b'\n')
+        sampled = len(sample)
+        for n in range(1, samples):
+            f.seek((size - sample_size) * n // (samples - 1))
+            block = f.read(sample_size)
+            lines += block.count(b'\n')
+            sampled += len(block)
+    
+    if not lines:
+        return 0
+    return max(0, int(size * lines / sampled) - 1)
+
+
+def record_ends(block, in_quote, quotechar=b'"'):
+    """
+    Record boundaries in a raw block / Fronteiras de registro em um bloco de bytes.
+
+    Returns (ends, in_quote): the offsets just after every newline that is
+    outside a quoted field, and the quote state at the end of the block.
+    Doubled quotes toggle the state twice, so escaped quotes need no
+    special case.
+    """
+    data = np.frombuffer(block, dtype=np.uint8)
+    quotes = np.flatnonzero(data == ord(quotechar))
+    newlines = np.flatnonzero(data == ord(b'\n'))
+    
+    if len(quotes) == 0:
+        ends = newlines + 1 if not in_quote else newlines[:0]
+        return ends, in_quote
+    
+    parity = (np.searchsorted(quotes, newlines) + int(in_quote)) % 2
+    ends = newlines[parity == 0] + 1
+    return ends, (len(quotes) + int(in_quote)) % 2 == 1
+
+
+def count_rows(filepath, block_size=COPY_BUFFER_SIZE, quote_aware=True):
+    """
+    Exact number of data rows / Conta as linhas de dados de um CSV.
+
+    Reads binary blocks and counts newlines with bytes.count, without
+    decoding. With quote_aware, blocks that contain quotes go through
+    record_ends() so line breaks inside quoted fields are not counted.
+    The header line is not counted. Compressed inputs are decompressed
+    while counting.
+    """
+    records = 0
+    in_quote = False
+    last = b''
+    
+    with open_input(filepath) as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            if not quote_aware or (not in_quote and b'"' not in block):
+                records += block.count(b'\n')
+            else:
+                ends, in_quote = record_ends(block, in_quote)
+                records += len(ends)
+            last = block
+    
+    # Último registro sem quebra de linha no final
+    if last and not last.endswith(b'\n'):
+        records += 1
+    return max(0, records - 1)
+
+
+def iter_csv_chunks(filepath, sep, encoding, chunksize=DEFAULT_CHUNKSIZE, skip=0):
+    """
+    Read a CSV in chunks of text columns / Lê um CSV em chunks com colunas texto.
+
+    The first `skip` chunks are parsed and dropped, which is how resumed
+    jobs get back to the chunk index of their checkpoint.
+    """
+    with open_input(filepath) as f:
+        reader = pd.read_csv(
+            f,
+            sep=sep,
+            encoding=encoding,
+            dtype=str,
+            chunksize=chunksize
+        )
+        for index, chunk in enumerate(reader):
+            if index >= skip:
+                yield chunk
+
+
+def read_csv_file(filepath, sep, encoding, dtype=None, **kwargs):
+    """Sniff the encoding and read a whole CSV / Detecta o encoding e lê um CSV inteiro"""
+    file_enc = resolve_encoding(filepath, encoding)
+    with open_input(filepath) as f:
+        return pd.read_csv(f, sep=sep, encoding=file_enc, dtype=dtype, low_memory=False, **kwargs)
+
+
+def iter_csv_files(files, sep, encoding, workers=1, dtype=None):
+    """
+    Yield (index, filepath, DataFrame) in input order / Gera os arquivos lidos na ordem de entrada.
+
+    With workers > 1 files are sniffed and parsed in a process pool. At most
+    two files per worker are in flight, so fast workers cannot pile up
+    parsed frames while an earlier, slower file is still being read.
+    """
+    if workers <= 1:
+        for i, filepath in enumerate(files):
+            yield i, filepath, read_csv_file(filepath, sep, encoding, dtype)
+        return
+    
+    window = workers * 2
+    pending = deque()
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, filepath in enumerate(files):
+            pending.append((i, filepath, pool.submit(read_csv_file, filepath, sep, encoding, dtype)))
+            if len(pending) >= window:
+                index, path, future = pending.popleft()
+                yield index, path, future.result()
+        
+        while pending:
+            index, path, future = pending.popleft()
+            yield index, path, future.result()
+
+
+def iter_record_chunks(f, chunksize, block_size=COPY_BUFFER_SIZE):
+    """
+    Cut a raw CSV stream into chunks of `chunksize` records / Corta o CSV bruto em chunks de registros.
+
+    Reads binary blocks from `f` (positioned at a record boundary, after
+    the header) and yields (data, offset): the bytes of up to `chunksize`
+    whole records, cut outside quoted fields with record_ends(), and the
+    stream offset just after them. Nothing is decoded or parsed.
+    """
+    offset = f.tell()
+    in_quote = False
+    pieces = []
+    rows = 0
+    
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        ends, in_quote = record_ends(block, in_quote)
+        
+        start = i = 0
+        while len(ends) - i >= chunksize - rows:
+            i += chunksize - rows
+            end = int(ends[i - 1])
+            pieces.append(block[start:end])
+            yield b''.join(pieces), offset + end
+            pieces = []
+            rows = 0
+            start = end
+        
+        rows += len(ends) - i
+        pieces.append(block[start:])
+        offset += len(block)
+    
+    # Último registro, com ou sem quebra de linha no final
+    data = b''.join(pieces)
+    if data.strip():
+        yield data, offset
+
+
+def _rewrite_chunk(transform_state, header, data, sep, encoding, output_sep, write_header, formatted=True):
+    """
+    Parse, transform and format one raw chunk (runs in a worker process).
+
+    Returns (rows_read, rows, chunk, transform), where chunk is the CSV text
+    of `rows` rows, or the transformed DataFrame if not `formatted`. The transform is unpickled
+    fresh for every chunk and sent back only if it can merge() counters
+    into the caller's copy.
+    """
+    transform = pickle.loads(transform_state)
+    chunk = pd.read_csv(io.BytesIO(header + data), sep=sep, encoding=encoding, dtype=str)
+    rows_read = len(chunk)
+    if transform:
+        chunk = transform(chunk)
+    rows = len(chunk)
+    if formatted:
+        chunk = chunk.to_csv(sep=output_sep, index=False, header=write_header)
+    return rows_read, rows, chunk, transform if hasattr(transform, 'merge') else None
+
+
+def stream_rewrite(filepath, output, transform=None, sep=';', encoding='auto', chunksize=DEFAULT_CHUNKSIZE,
+                   output_sep=None, output_encoding='utf-8', on_chunk=None, checkpoint=None,
+                   compress_workers=1, workers=1, row_filter=None):
+    """
+    Rewrite a CSV chunk by chunk / Reescreve um CSV chunk a chunk.
+
+    Every chunk of text columns goes through `transform(chunk)`, if given,
+    and is appended to the output, so memory is bounded by one chunk.
+    `on_chunk(rows_read)` is called after each chunk. `row_filter(chunk)`,
+    if given, runs after the transform in the main process, on every chunk
+    in input order, and returns the rows to write (e.g. deduplication).
+
+    With workers > 1 the main process only cuts the raw input into chunks
+    of `chunksize` records (iter_record_chunks) and writes results; worker
+    processes parse, transform and format each chunk. At most two chunks
+    per worker are in flight and results are written in input order while
+    later chunks are still being processed. `transform` must then be
+    picklable; if it has a merge(other) method, the copy used for each
+    chunk is merged back into it, so counters it keeps cover every chunk.
+    With a row_filter, workers send back transformed DataFrames and the
+    main process filters and formats them.
+
+    With a `checkpoint` (see engine.checkpoint) progress is saved as the
+    index of the next chunk (and, with workers, its input byte offset)
+    plus the committed output size; if the checkpoint holds a saved state
+    the output is truncated back to it and the job continues from there.
+
+    Returns (rows_read, rows_written).
+    """
+    file_enc = resolve_encoding(filepath, encoding)
+    output_sep = output_sep or sep
+    state = checkpoint.state if checkpoint else None
+    
+    if state:
+        restore_outputs(state["outputs"])
+        start = state["chunk"]
+        rows_read, rows_written = state["rows_read"], state["rows_written"]
+        out = open_output(output, 'a', output_encoding, workers=compress_workers)
+    else:
+        start = rows_read = rows_written = 0
+        out = open_output(output, 'w', output_encoding, workers=compress_workers)
+    
+    def save(chunk, **position):
+        nonlocal out
+        out, size = commit_output(out, output, output_encoding, compress_workers)
+        checkpoint.save({
+            "chunk": chunk,
+            **position,
+            "rows_read": rows_read,
+            "rows_written": rows_written,
+            "outputs": {str(output): size}
+        })
+    
+    try:
+        if workers > 1:
+            window = workers * 2
+            pending = deque()
+            transform_state = pickle.dumps(transform)
+            
+            def write_oldest():
+                nonlocal rows_read, rows_written
+                index, offset, future = pending.popleft()
+                chunk_read, chunk_written, chunk, worker_transform = future.result()
+                if row_filter:
+                    chunk = row_filter(chunk)
+                    chunk_written = len(chunk)
+                    chunk.to_csv(out, sep=output_sep, index=False, header=index == 0)
+                else:
+                    out.write(chunk)
+                rows_read += chunk_read
+                rows_written += chunk_written
+                if worker_transform is not None:
+                    transform.merge(worker_transform)
+                
+                if on_chunk:
+                    on_chunk(rows_read)
+                if checkpoint and checkpoint.due():
+                    save(index + 1, offset=offset)
+            
+            with open_input(filepath) as f, ProcessPoolExecutor(max_workers=workers) as pool:
+                header = f.readline()
+                if state:
+                    f.seek(state["offset"])
+                
+                for index, (data, offset) in enumerate(iter_record_chunks(f, chunksize), start):
+                    pending.append((index, offset, pool.submit(
+                        _rewrite_chunk, transform_state, header, data, sep, file_enc, output_sep, index == 0,
+                        row_filter is None
+                    )))
+                    if len(pending) >= window:
+                        write_oldest()
+                
+                while pending:
+                    write_oldest()
+        else:
+            for index, chunk in enumerate(iter_csv_chunks(filepath, sep, file_enc, chunksize, skip=start), start):
+                rows_read += len(chunk)
+                if transform:
+                    chunk = transform(chunk)
+                if row_filter:
+                    chunk = row_filter(chunk)
+                chunk.to_csv(out, sep=output_sep, index=False, header=index == 0)
+                rows_written += len(chunk)
+                
+                if on_chunk:
+                    on_chunk(rows_read)
+                if checkpoint and checkpoint.due():
+                    save(index + 1)
+        
+        # Arquivo só com cabeçalho: nenhum chunk foi lido
+        if rows_read == 0 and not state:
+            with open_input(filepath) as f:
+                columns = pd.read_csv(f, sep=sep, encoding=file_enc, nrows=0).columns
+            pd.DataFrame(columns=columns).to_csv(out, sep=output_sep, index=False)
+    finally:
+        out.close()
+    
+    return rows_read, rows_written
@@ -0,0 +1,524 @@
+# Dedup engine - Remoção de duplicatas em streaming com spill para disco
+
+import mmap
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .csv_io import DEFAULT_CHUNKSIZE, stream_rewrite, iter_record_chunks, record_ends
+from .compression import open_output
+
+
+# Memória padrão para o conjunto de linhas já vistas (512 MB)
+DEFAULT_DEDUP_MEMORY = 512 * 1024 * 1024
+
+# Número de partições por hash nos arquivos temporários
+DEFAULT_PARTITIONS = 64
+
+# Runs em disco mapeados ao mesmo tempo (um descritor cada)
+DEFAULT_OPEN_RUNS = 128
+
+# Custo aproximado, em bytes, de cada entrada do dicionário em memória
+_ENTRY_OVERHEAD = 120
+
+
+def row_hashes(df):
+    """64-bit hash of every row / Hash de 64 bits de cada linha"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+
+
+def row_keys(df):
+    """Exact byte key of every row, used to verify hash hits / Chave exata de cada linha"""
+    return [repr(row).encode('utf-8') for row in df.itertuples(index=False, name=None)]
+
+
+# Chaves por bloco ao fundir dois runs em disco
+MERGE_BLOCK = 64 * 1024
+
+
+def _byte_spans(starts, lengths):
+    """Byte positions of the spans starts[i]..starts[i]+lengths[i], concatenated"""
+    total = int(lengths.sum())
+    return np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(total)
+
+
+class _SpillRun:
+    """
+    One sorted run of spilled hashes and row keys for a partition.
+    
+    A single file holds the sorted hashes (uint64), the key offsets (int64,
+    one more than hashes) and the concatenated keys. open() maps it, so an
+    open run costs one file descriptor.
+    """
+    
+    def __init__(self, path, hashes, keys):
+        order = np.argsort(hashes, kind='stable')
+        lengths = np.fromiter((len(keys[idx]) for idx in order), dtype=np.int64, count=len(keys))
+        
+        with self._create(path, hashes[order], lengths) as f:
+            f.write(b''.join([keys[idx] for idx in order]))
+    
+    @classmethod
+    def merge(cls, path, older, newer):
+        """Merge two runs into a new one; ties keep older first"""
+        run = cls.__new__(cls)
+        older.open()
+        newer.open()
+        
+        hashes = np.concatenate([older.hashes, newer.hashes])
+        merged = np.argsort(hashes, kind='stable')
+        lengths = np.concatenate([np.diff(older.offsets), np.diff(newer.offsets)])[merged]
+        
+        with run._create(path, hashes[merged], lengths) as f:
+            # Blocos de MERGE_BLOCK chaves montados por indexação vetorizada dos bytes
+            for block in range(0, len(merged), MERGE_BLOCK):
+                sources = merged[block:block + MERGE_BLOCK]
+                block_lengths = lengths[block:block + MERGE_BLOCK]
+                targets = np.cumsum(block_lengths) - block_lengths
+                data = np.empty(int(block_lengths.sum()), dtype=np.uint8)
+                
+                from_older = sources < older.count
+                for source, take, positions in ((older, from_older, sources[from_older]),
+                                                (newer, ~from_older, sources[~from_older] - older.count)):
+                    if len(positions):
+                        spans = block_lengths[take]
+                        stored = source.keys[_byte_spans(source.offsets[positions], spans)]
+                        data[_byte_spans(targets[take], spans)] = stored
+                f.write(data)
+        return run
+    
+    def _create(self, path, hashes, lengths):
+        """Write the index of a new run; returns its file, positioned for the keys"""
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        
+        self.path = path
+        self.count = len(hashes)
+        self._map = self.hashes = self.offsets = self.keys = None
+        
+        f = open(path, 'wb')
+        f.write(hashes.astype(np.uint64).tobytes())
+        f.write(offsets.tobytes())
+        return f
+    
+    def __len__(self):
+        return self.count
+    
+    def open(self):
+        """Map the run file (no-op if already open)"""
+        if self._map is None:
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.hashes = np.frombuffer(self._map, dtype=np.uint64, count=self.count)
+            self.offsets = np.frombuffer(self._map, dtype=np.int64, count=self.count + 1, offset=8 * self.count)
+            self._rows_start = 8 * (2 * self.count + 1)
+            self.keys = np.frombuffer(self._map, dtype=np.uint8, offset=self._rows_start)
+    
+    def find(self, hashes):
+        """Positions of hashes present in this run (-1 if absent)"""
+        pos = np.searchsorted(self.hashes, hashes)
+        pos[pos >= len(self.hashes)] = 0
+        hit = self.hashes[pos] == hashes
+        return np.where(hit, pos, -1)
+    
+    def contains_key(self, position, hash_value, key):
+        """Compare key with every stored row sharing hash_value, starting at position"""
+        while position < self.count and self.hashes[position] == hash_value:
+            start = self._rows_start + int(self.offsets[position])
+            end = self._rows_start + int(self.offsets[position + 1])
+            if self._map[start:end] == key:
+                return True
+            position += 1
+        return False
+    
+    def close(self):
+        # As views numpy apontam para o mmap: soltá-las antes de fechar
+        self.hashes = self.offsets = self.keys = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+    
+    def remove(self):
+        """Close the run and delete its file"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class ExternalDeduplicator:
+    """
+    Streaming row deduplication with disk spill / Deduplicação em streaming com spill para disco.
+    
+    Rows are identified by a 64-bit hash (pd.util.hash_pandas_object). Every
+    hash hit is verified against the exact row, so collisions never drop a
+    distinct row. When the in-memory seen-set passes `memory_budget` bytes it
+    is written to hash-partitioned sorted runs in a temporary directory and
+    looked up from there with memory-mapped binary search. Runs of each
+    partition are merged like a binary counter (see HashSet64), so every
+    spilled row is rewritten about log2(spills) times and a lookup checks
+    about log2(spills) runs per partition. At most `open_runs` runs keep
+    their files open, least recently used first out.
+    
+    Use as a context manager so temporary files are removed:
+        
+        with ExternalDeduplicator() as dedup:
+            for chunk in chunks:
+                write(dedup.filter(chunk))
+        print(dedup.dropped)
+    """
+    
+    def __init__(self, memory_budget=DEFAULT_DEDUP_MEMORY, partitions=DEFAULT_PARTITIONS, temp_dir=None,
+                 open_runs=DEFAULT_OPEN_RUNS):
+        self.memory_budget = memory_budget
+        self.partitions = partitions
+        self.temp_dir = temp_dir
+        self.open_runs = open_runs
+        self.dropped = 0
+        self.spills = 0
+        
+        self._seen = {}
+        self._memory = 0
+        self._workdir = None
+        self._runs = [[] for _ in range(partitions)]
+        self._open = OrderedDict()
+        self._run_id = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def filter(self, chunk):
+        """Return chunk without rows seen before (keeps first occurrence)"""
+        if chunk.empty:
+            return chunk
+        return chunk[self.mask(chunk)]
+    
+    def mask(self, chunk):
+        """Boolean mask of the rows of chunk not seen before; records them as seen"""
+        if chunk.empty:
+            return np.ones(0, dtype=bool)
+        
+        # Duplicatas dentro do próprio chunk: comparação exata do pandas
+        keep = ~chunk.duplicated(keep='first').to_numpy()
+        hashes = row_hashes(chunk)
+        keys = row_keys(chunk)
+        keep &= ~self._spilled_mask(hashes, keys, keep)
+        
+        for i in np.flatnonzero(keep):
+            hash_value = int(hashes[i])
+            key = keys[i]
+            
+            bucket = self._seen.get(hash_value)
+            if bucket is not None and key in bucket:
+                keep[i] = False
+                continue
+            
+            if bucket is None:
+                self._seen[hash_value] = [key]
+            else:
+                bucket.append(key)
+            self._memory += len(key) + _ENTRY_OVERHEAD
+        
+        self.dropped += int(len(keep) - keep.sum())
+        
+        if self._memory > self.memory_budget:
+            self._spill()
+        
+        return keep
+    
+    def _use(self, run):
+        """Open a run for lookup, closing the least recently used beyond open_runs"""
+        if run in self._open:
+            self._open.move_to_end(run)
+            return run
+        run.open()
+        self._open[run] = None
+        while len(self._open) > self.open_runs:
+            self._open.popitem(last=False)[0].close()
+        return run
+    
+    def _spilled_mask(self, hashes, keys, keep):
+        """Mask of the rows in keep whose exact key is already in a spilled run"""
+        found = np.zeros(len(hashes), dtype=bool)
+        if not self.spills:
+            return found
+        
+        # Um run por vez: cada arquivo é aberto no máximo uma vez por chunk
+        partition_of = hashes % np.uint64(self.partitions)
+        for partition, runs in enumerate(self._runs):
+            rows = np.flatnonzero(keep & (partition_of == partition))
+            for run in runs:
+                rows = rows[~found[rows]]
+                if not len(rows):
+                    break
+                positions = self._use(run).find(hashes[rows])
+                for row, position in zip(rows[positions >= 0], positions[positions >= 0]):
+                    if run.contains_key(int(position), int(hashes[row]), keys[row]):
+                        found[row] = True
+        
+        return found
+    
+    def _remove_run(self, run):
+        """Forget a merged run and delete its file"""
+        self._open.pop(run, None)
+        run.remove()
+    
+    def _spill(self):
+        """Write the in-memory seen-set to hash-partitioned sorted runs"""
+        if self._workdir is None:
+            self._workdir = tempfile.mkdtemp(prefix='csvtoolbox_dedup_', dir=self.temp_dir)
+        
+        by_partition = [([], []) for _ in range(self.partitions)]
+        for hash_value, bucket in self._seen.items():
+            hashes, keys = by_partition[hash_value % self.partitions]
+            for key in bucket:
+                hashes.append(hash_value)
+                keys.append(key)
+        
+        for partition, (hashes, keys) in enumerate(by_partition):
+            if not hashes:
+                continue
+            runs = self._runs[partition]
+            run = _SpillRun(self._run_path(partition), np.array(hashes, dtype=np.uint64), keys)
+            # Contador binário: funde com o run anterior enquanto ele não for maior
+            while runs and len(runs[-1]) <= len(run):
+                older = runs.pop()
+                merged = _SpillRun.merge(self._run_path(partition), older, run)
+                self._remove_run(older)
+                self._remove_run(run)
+                run = merged
+            runs.append(run)
+        
+        self._seen = {}
+        self._memory = 0
+        self.spills += 1
+    
+    def _run_path(self, partition):
+        """Fresh file path for a new run of partition"""
+        self._run_id += 1
+        return os.path.join(self._workdir, f"p{partition:03d}_r{self._run_id:06d}")
+    
+    def close(self):
+        """Release spilled runs and remove temporary files"""
+        for runs in self._runs:
+            for run in runs:
+                run.close()
+        self._runs = [[] for _ in range(self.partitions)]
+        self._open = OrderedDict()
+        self._seen = {}
+        
+        if self._workdir is not None:
+            shutil.rmtree(self._workdir, ignore_errors=True)
+            self._workdir = None
+
+
+# Hashes por bloco na passada reversa do keep='last'
+HASH_BLOCK = 1024 * 1024
+
+
+class HashSet64:
+    """
+    Compact set of 64-bit hashes / Conjunto compacto de hashes de 64 bits.
+    
+    Hashes live in sorted numpy runs merged like a binary counter (a run is
+    merged into the previous one while it is at least as large), so there
+    are at most log2(n) runs and each distinct hash costs 8 bytes. Lookups
+    are vectorized binary searches in every run.
+    """
+        
+    def __init__(self):
+        self._runs = []
+        self.count = 0
+        
+    def __len__(self):
+        return self.count
+        
+    @property
+    def nbytes(self):
+        return sum(run.nbytes for run in self._runs)
+        
+    def contains(self, hashes):
+        """Boolean mask of the hashes already in the set"""
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            pos = np.searchsorted(run, hashes)
+            pos[pos >= len(run)] = len(run) - 1
+            found |= run[pos] == hashes
+        return found
+        
+    def add(self, hashes):
+        """Add hashes that are not in the set yet"""
+        run = np.unique(hashes)
+        if not len(run):
+            return
+        self.count += len(run)
+        while self._runs and len(self._runs[-1]) <= len(run):
+            run = np.concatenate([self._runs.pop(), run])
+            run.sort()
+        self._runs.append(run)
+
+
+class HashDeduplicator:
+    """
+    Streaming deduplication on 64-bit row hashes / Deduplicação em streaming por hash de 64 bits.
+    
+    Rows are compared on all columns or on `keys`, with missing values and
+    empty strings counting as equal (both are written as empty fields).
+    Only the hash of each distinct row is kept, in a HashSet64, so memory
+    is 8 bytes per distinct row and a file of any size is deduplicated in
+    one pass without loading it. Two different rows dropped as duplicates
+    would need a 64-bit hash collision; with `verify` every hash hit is
+    checked against the exact row instead (ExternalDeduplicator, bounded
+    by `memory_budget` and spilled to disk).
+    
+    keep='first': filter(chunk) returns each chunk without rows seen before.
+    keep='last' needs to know the future, so it takes two passes over the
+    rows: record(chunk) stores the hash of every row in a temporary file
+    and resolve() scans those hashes backwards, returning a mask of the
+    last occurrences for a second pass over the same rows in the same
+    order (see dedup_rewrite; exact verification is not available).
+    
+    Use as a context manager so temporary files are removed.
+    """
+        
+    def __init__(self, keys=None, keep='first', verify=False, memory_budget=DEFAULT_DEDUP_MEMORY, temp_dir=None):
+        if keep not in ('first', 'last'):
+            raise ValueError(f"keep must be 'first' or 'last', not {keep!r}")
+        if verify and keep == 'last':
+            raise ValueError("Exact verification is only available with keep='first'")
+        self.keys = list(keys) if keys else None
+        self.keep = keep
+        self.temp_dir = temp_dir
+        self.dropped = 0
+        self.seen = HashSet64()
+        self._exact = ExternalDeduplicator(memory_budget, temp_dir=temp_dir) if verify else None
+        self._hash_file = None
+        self._recorded = 0
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        
+    def _project(self, chunk):
+        if self.keys:
+            missing = [key for key in self.keys if key not in chunk.columns]
+            if missing:
+                raise ValueError(f"Dedup keys not found: {', '.join(missing)}")
+            chunk = chunk[self.keys]
+        return chunk.fillna('')
+        
+    def filter(self, chunk):
+        """Return chunk without rows seen before (keep='first')"""
+        if chunk.empty:
+            return chunk
+        
+        if self._exact is not None:
+            keep = self._exact.mask(self._project(chunk))
+        else:
+            hashes = row_hashes(self._project(chunk))
+            # Primeira ocorrência de cada hash dentro do chunk, depois as já vistas
+            _, first = np.unique(hashes, return_index=True)
+            first = first[~self.seen.contains(hashes[first])]
+            self.seen.add(hashes[first])
+            keep = np.zeros(len(chunk), dtype=bool)
+            keep[first] = True
+        
+        self.dropped += int(len(keep) - keep.sum())
+        return chunk[keep]
+        
+    def record(self, chunk):
+        """First pass of keep='last': store the row hashes; returns chunk unchanged"""
+        if self._hash_file is None:
+            self._hash_file = tempfile.NamedTemporaryFile(prefix='csvtoolbox_hashes_', dir=self.temp_dir, delete=False)
+        hashes = row_hashes(self._project(chunk))
+        self._hash_file.write(hashes.tobytes())
+        self._recorded += len(hashes)
+        return chunk
+        
+    def resolve(self):
+        """Boolean mask of the last occurrence of every recorded row (1 byte per row)"""
+        last = np.zeros(self._recorded, dtype=bool)
+        if self._hash_file is None:
+            return last
+        self._hash_file.flush()
+        
+        hashes = np.memmap(self._hash_file.name, dtype=np.uint64, mode='r', shape=(self._recorded,))
+        for end in range(self._recorded, 0, -HASH_BLOCK):
+            start = max(0, end - HASH_BLOCK)
+            block = np.array(hashes[start:end][::-1])
+            _, first = np.unique(block, return_index=True)
+            first = first[~self.seen.contains(block[first])]
+            self.seen.add(block[first])
+            last[end - 1 - first] = True
+        del hashes
+        
+        self.dropped = int(self._recorded - last.sum())
+        return last
+        
+    def close(self):
+        """Release the exact-verification store and remove temporary files"""
+        if self._exact is not None:
+            self._exact.close()
+        if self._hash_file is not None:
+            self._hash_file.close()
+            os.remove(self._hash_file.name)
+            self._hash_file = None
+
+
+def dedup_rewrite(filepath, output, dedup, transform=None, sep=';', encoding='auto', chunksize=DEFAULT_CHUNKSIZE,
+                  output_sep=None, output_encoding='utf-8', on_chunk=None, compress_workers=1, workers=1):
+    """
+    Rewrite a CSV without duplicate rows / Reescreve um CSV sem linhas duplicadas.
+    
+    Streams the input through stream_rewrite (with `transform` and
+    `workers`) and `dedup`, a HashDeduplicator, after the transform. With
+    keep='first' this is a single pass. With keep='last' the transformed
+    rows go to a temporary file next to the output while their hashes are
+    recorded, and a second pass copies the raw records of the last
+    occurrences from it, without parsing them again.
+    
+    Returns (rows_read, rows_written); dedup.dropped holds the duplicates.
+    """
+    output_sep = output_sep or sep
+    options = dict(chunksize=chunksize, output_sep=output_sep, on_chunk=on_chunk, workers=workers)
+    
+    if dedup.keep == 'first':
+        return stream_rewrite(
+            filepath, output, transform, sep=sep, encoding=encoding, output_encoding=output_encoding,
+            compress_workers=compress_workers, row_filter=dedup.filter, **options
+        )
+    
+    temp = f"{output}.dedup.tmp"
+    try:
+        rows_read, _ = stream_rewrite(
+            filepath, temp, transform, sep=sep, encoding=encoding, row_filter=dedup.record, **options
+        )
+        keep = dedup.resolve()
+        rows_written = int(keep.sum())
+        
+        # Cada linha gravada na primeira passada é exatamente um registro do temporário
+        with open(temp, 'rb') as f, open_output(output, 'w', output_encoding, workers=compress_workers) as out:
+            out.write(f.readline().decode('utf-8'))
+            position = 0
+            for data, _ in iter_record_chunks(f, chunksize):
+                ends, _ = record_ends(data, False)
+                if not len(ends) or ends[-1] != len(data):
+                    ends = np.append(ends, len(data))
+                starts = np.concatenate([[0], ends[:-1]])
+                selected = np.flatnonzero(keep[position:position + len(ends)])
+                position += len(ends)
+                out.write(b''.join(data[starts[i]:ends[i]] for i in selected).decode('utf-8'))
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+    return rows_read, rows_written
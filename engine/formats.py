@@ -0,0 +1,201 @@
+# Data formats - Conversão de datas e decimais entre padrões regionais
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# Formato de data e separador decimal de cada padrão de destino
+TARGET_FORMATS = {
+    "BR": {"date": "%d/%m/%Y", "decimal": ","},
+    "EUA": {"date": "%m/%d/%Y", "decimal": "."},
+    "EU": {"date": "%Y-%m-%d", "decimal": ","},
+    "UK": {"date": "%d-%m-%Y", "decimal": "."}
+}
+
+# Formatos de data testados na inferência, em ordem de preferência.
+# Mês antes do dia nos casos ambíguos, como o pd.to_datetime padrão.
+DATE_FORMATS = [
+    "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y/%m/%d",
+    "%m/%d/%Y", "%d/%m/%Y", "%m/%d/%Y %H:%M:%S", "%d/%m/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M", "%d/%m/%Y %H:%M", "%d-%m-%Y", "%m-%d-%Y", "%d.%m.%Y"
+]
+
+# Fração mínima da amostra que precisa ser uma data válida
+DATE_MATCH_RATIO = 0.9
+
+# Trechos de nome que indicam coluna de data
+DATE_NAME_HINTS = ['date', 'data', 'dt_', 'dat']
+
+# Números com ponto decimal (vírgula de milhar) e com vírgula decimal (ponto de milhar)
+_DOT_DECIMAL = re.compile(r'^[+-]?(\d{1,3}(,\d{3})+|\d+)(\.\d+)?$')
+_COMMA_DECIMAL = re.compile(r'^[+-]?(\d{1,3}(\.\d{3})+|\d+)(,\d+)?$')
+
+# Valores distintos amostrados por coluna na inferência
+INFERENCE_SAMPLE = 1000
+
+
+def map_unique(series, func):
+    """
+    Apply func to the distinct values only / Aplica func apenas aos valores distintos.
+    
+    factorize -> func(uniques) -> take(codes); missing values stay missing.
+    `func` receives and returns a Series aligned with the uniques.
+    """
+    codes, uniques = pd.factorize(series)
+    if not len(uniques):
+        return series
+    converted = func(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+    result = converted.take(codes)
+    result[codes < 0] = None
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def _sample_values(series):
+    values = series.dropna().astype(str).str.strip()
+    values = values[values != ''].unique()
+    return values[:INFERENCE_SAMPLE]
+
+
+def infer_date_format(values):
+    """
+    Date format that parses most sampled values, or None / Formato de data da amostra.
+    
+    At least DATE_MATCH_RATIO of the values must parse; ties go to the
+    format listed first in DATE_FORMATS.
+    """
+    values = pd.Series(values)
+    best, best_count = None, 0
+    for fmt in DATE_FORMATS:
+        count = int(pd.to_datetime(values, format=fmt, errors='coerce').notna().sum())
+        if count > best_count:
+            best, best_count = fmt, count
+    if best_count >= DATE_MATCH_RATIO * len(values):
+        return best
+    return None
+
+
+def infer_decimal_separator(values):
+    """
+    Decimal separator of a numeric column, or None if not numeric / Separador decimal da coluna.
+    
+    Returns '.' or ',' when a separator is in use, '' for integer-only
+    columns and None when any sampled value is not a number.
+    """
+    values = pd.Series(values)
+    dot = values.str.match(_DOT_DECIMAL.pattern).all()
+    comma = values.str.match(_COMMA_DECIMAL.pattern).all()
+    
+    if dot and not comma:
+        return '.'
+    if comma and not dot:
+        return ','
+    if not dot and not comma:
+        return None
+    
+    # Ambos servem: só inteiros ou valores como "1,234" / "1.234"
+    if values.str.contains(',', regex=False).any():
+        return ','
+    if values.str.contains('.', regex=False).any():
+        return '.'
+    return ''
+
+
+class DataFormatConverter:
+    """
+    Convert dates and decimals to a regional format / Converte datas e decimais para um padrão regional.
+    
+    Each column is inferred from a sample of its distinct values and the
+    plan is cached so later chunks of the same file reuse it:
+        
+        ('date', fmt)         date-named column whose sample parses with fmt
+        ('decimal', sep)      numeric column using sep as decimal separator
+        None                  anything else, left untouched
+    
+    A None plan is only cached once the sample proves it: a value that is
+    not a number in a column without a date name, or INFERENCE_SAMPLE
+    distinct values. Until then the distinct values of every chunk are
+    added to the column's sample and inference runs again, so a first
+    chunk with only integers or few valid dates does not decide the file.
+    
+    Conversion runs on distinct values only: dates go through
+    pd.to_datetime(format=fmt) and values that do not parse are kept as
+    they are.
+    """
+    
+    def __init__(self, target_format):
+        self.target = TARGET_FORMATS[target_format]
+        self.plans = {}
+        self.samples = {}
+    
+    def infer(self, name, series):
+        """Infer the plan of a column (None if there is no data yet)"""
+        values = _sample_values(series)
+        if not len(values):
+            return None
+        return self._plan(name, values)[0]
+    
+    def _plan(self, name, values):
+        """(plan, final) for a sample; final tells whether a None plan can be cached"""
+        date_name = any(hint in str(name).lower() for hint in DATE_NAME_HINTS)
+        if date_name:
+            fmt = infer_date_format(values)
+            if fmt:
+                return ('date', fmt), True
+        
+        separator = infer_decimal_separator(values)
+        if separator:
+            return ('decimal', separator), True
+        # Só inteiros ou datas abaixo da proporção mínima podem mudar com mais amostra
+        return None, len(values) >= INFERENCE_SAMPLE or (separator is None and not date_name)
+    
+    def _infer_pending(self, name, series):
+        """Infer a column with no cached plan, growing its sample across chunks"""
+        values = _sample_values(series)
+        if name in self.samples:
+            values = pd.unique(np.concatenate([self.samples[name], values]))[:INFERENCE_SAMPLE]
+        if not len(values):
+            return None
+        
+        plan, final = self._plan(name, values)
+        if final:
+            self.plans[name] = plan
+            self.samples.pop(name, None)
+        else:
+            self.samples[name] = values
+        return plan
+    
+    def convert(self, df):
+        """Convert every column with a plan; returns the same DataFrame"""
+        for col in df.columns:
+            if col in self.plans:
+                plan = self.plans[col]
+            else:
+                plan = self._infer_pending(col, df[col])
+            if plan is None:
+                continue
+            
+            kind, arg = plan
+            if kind == 'date':
+                df[col] = map_unique(df[col], lambda u: self._convert_dates(u, arg))
+            else:
+                df[col] = map_unique(df[col], lambda u: self._convert_decimals(u, arg))
+        
+        return df
+    
+    def _convert_dates(self, values, fmt):
+        parsed = pd.to_datetime(values.astype(str).str.strip(), format=fmt, errors='coerce')
+        return parsed.dt.strftime(self.target["date"]).where(parsed.notna(), values)
+    
+    def _convert_decimals(self, values, separator):
+        target = self.target["decimal"]
+        if separator == target:
+            return values
+        
+        text = values.astype(str).str.strip()
+        pattern = _DOT_DECIMAL if separator == '.' else _COMMA_DECIMAL
+        numeric = text.str.match(pattern.pattern)
+        thousands = ',' if separator == '.' else '.'
+        converted = text.str.replace(thousands, '', regex=False).str.replace(separator, target, regex=False)
+        return converted.where(numeric, values)
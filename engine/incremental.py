@@ -0,0 +1,215 @@
+# Incremental merge - Consolidação incremental com manifesto
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from .csv_io import DEFAULT_CHUNKSIZE, iter_csv_chunks
+from .compression import open_output, source_path, input_compression
+from .merge import stream_merge, scan_headers, union_columns, add_source_column
+
+
+MANIFEST_VERSION = 1
+
+# Bytes lidos do início e do fim de cada arquivo para a impressão digital
+FINGERPRINT_BLOCK = 64 * 1024
+
+
+def manifest_path(output):
+    """Manifest file kept next to the output / Manifesto ao lado do arquivo de saída"""
+    return f"{output}.manifest.json"
+
+
+def file_fingerprint(filepath, size=None):
+    """
+    Content fingerprint of the first `size` bytes / Impressão digital do conteúdo.
+    
+    Hashes the size plus the first and last 64 KB, so it costs two reads
+    per file no matter how large it is.
+    """
+    if size is None:
+        size = os.path.getsize(filepath)
+    
+    digest = hashlib.sha1(str(size).encode())
+    with open(filepath, 'rb') as f:
+        digest.update(f.read(min(size, FINGERPRINT_BLOCK)))
+        if size > FINGERPRINT_BLOCK:
+            f.seek(max(FINGERPRINT_BLOCK, size - FINGERPRINT_BLOCK))
+            digest.update(f.read(size - f.tell()))
+    return digest.hexdigest()
+
+
+def _file_entry(filepath, encoding):
+    # Membros de .zip são identificados pelo próprio arquivo .zip
+    stat = os.stat(source_path(filepath))
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "fingerprint": file_fingerprint(source_path(filepath), stat.st_size),
+        "encoding": encoding
+    }
+
+
+def load_manifest(output):
+    """Load the manifest of an output, or None / Carrega o manifesto, se existir"""
+    path = manifest_path(output)
+    if not os.path.exists(path) or not os.path.exists(output):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(output, manifest):
+    """Save the manifest next to the output / Salva o manifesto"""
+    manifest["version"] = MANIFEST_VERSION
+    manifest["output_size"] = os.path.getsize(output)
+    manifest["updated_at"] = datetime.now().isoformat()
+    with open(manifest_path(output), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+
+def _ends_with_newline(filepath, size):
+    with open(filepath, 'rb') as f:
+        f.seek(size - 1)
+        return f.read(1) == b'\n'
+
+
+def classify_inputs(files, manifest):
+    """
+    Compare inputs against the manifest / Compara os arquivos com o manifesto.
+    
+    Returns a list of (filepath, status, offset) where status is 'unchanged',
+    'new', 'grown' (rows appended after `offset`) or 'changed'. Only plain
+    files can be 'grown'; a compressed input that changed is 'changed'.
+    """
+    known = manifest.get("files", {}) if manifest else {}
+    result = []
+    
+    for filepath in files:
+        key = os.path.abspath(filepath)
+        entry = known.get(key)
+        if entry is None:
+            result.append((filepath, 'new', 0))
+            continue
+        
+        disk_path = source_path(filepath)
+        stat = os.stat(disk_path)
+        old_size = entry["size"]
+        if stat.st_size == old_size and stat.st_mtime == entry["mtime"]:
+            result.append((filepath, 'unchanged', 0))
+        elif stat.st_size == old_size and file_fingerprint(disk_path, old_size) == entry["fingerprint"]:
+            result.append((filepath, 'unchanged', 0))
+        elif (stat.st_size > old_size
+              and not input_compression(filepath)
+              and file_fingerprint(filepath, old_size) == entry["fingerprint"]
+              and _ends_with_newline(filepath, old_size)):
+            result.append((filepath, 'grown', old_size))
+        else:
+            result.append((filepath, 'changed', 0))
+    
+    return result
+
+
+def _iter_tail_chunks(filepath, offset, sep, encoding, columns, chunksize):
+    """Read the rows appended to a file after `offset`"""
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        for chunk in pd.read_csv(f, sep=sep, encoding=encoding, header=None, names=columns,
+                                 dtype=str, chunksize=chunksize):
+            yield chunk
+
+
+def incremental_merge(files, output, sep=';', encoding='auto', chunksize=DEFAULT_CHUNKSIZE,
+                      output_encoding='utf-8', source_column=None, on_file=None, compress_workers=1):
+    """
+    Merge only new or grown inputs into an existing output / Consolidação incremental.
+    
+    A manifest next to the output records each merged input's path, size,
+    mtime and content fingerprint. On a re-run new files are appended and
+    files that only grew have their new rows appended, so the cost is
+    proportional to the new data. The output is rebuilt from scratch when
+    there is no valid manifest, a merged input was rewritten, the output
+    was modified, the separator or source column changed or new inputs
+    bring new columns.
+    Inputs that disappeared keep their rows in the output. A compressed
+    output (.gz, .bz2, .xz) gets one new compressed member per append.
+    
+    Returns a dict with 'mode' ('append' or 'rebuild'), 'rows' written in
+    this run and the 'new', 'grown' and 'unchanged' file counts.
+    """
+    manifest = load_manifest(output)
+    statuses = classify_inputs(files, manifest)
+    counts = {status: sum(1 for _, s, _ in statuses if s == status)
+              for status in ('new', 'grown', 'unchanged', 'changed')}
+    
+    pending = [(filepath, status, offset) for filepath, status, offset in statuses
+               if status in ('new', 'grown')]
+    
+    rebuild = (
+        manifest is None
+        or counts['changed'] > 0
+        or manifest.get("separator") != sep
+        or manifest.get("source_column") != source_column
+        or manifest.get("output_size") != os.path.getsize(output)
+    )
+    
+    schemas = []
+    if not rebuild and pending:
+        schemas = scan_headers([filepath for filepath, _, _ in pending], sep, encoding)
+        rebuild = not set(union_columns(schemas)) <= set(manifest["columns"])
+    
+    if rebuild:
+        schemas = scan_headers(files, sep, encoding)
+        rows = stream_merge(files, output, sep=sep, encoding=encoding, chunksize=chunksize,
+                            output_encoding=output_encoding, schemas=schemas,
+                            source_column=source_column, on_file=on_file,
+                            compress_workers=compress_workers)
+        manifest = {
+            "separator": sep,
+            "source_column": source_column,
+            "columns": union_columns(schemas),
+            "rows": rows,
+            "files": {}
+        }
+        for filepath, (file_enc, _) in zip(files, schemas):
+            manifest["files"][os.path.abspath(filepath)] = _file_entry(filepath, file_enc)
+        save_manifest(output, manifest)
+        counts['new'] = len(files)
+        counts['grown'] = counts['unchanged'] = 0
+        return {"mode": "rebuild", "rows": rows, **counts}
+    
+    columns = manifest["columns"]
+    rows = 0
+    
+    with open_output(output, 'a', output_encoding, workers=compress_workers) as out:
+        for i, ((filepath, status, offset), (file_enc, file_columns)) in enumerate(zip(pending, schemas)):
+            if on_file:
+                on_file(i, filepath)
+            
+            if status == 'new':
+                chunks = iter_csv_chunks(filepath, sep, file_enc, chunksize)
+            else:
+                chunks = _iter_tail_chunks(filepath, offset, sep, file_enc, file_columns, chunksize)
+            
+            for chunk in chunks:
+                if list(chunk.columns) != columns:
+                    chunk = chunk.reindex(columns=columns)
+                if source_column:
+                    chunk = add_source_column(chunk, source_column, filepath)
+                chunk.to_csv(out, sep=sep, index=False, header=False)
+                rows += len(chunk)
+            
+            manifest["files"][os.path.abspath(filepath)] = _file_entry(filepath, file_enc)
+    
+    manifest["rows"] = manifest.get("rows", 0) + rows
+    save_manifest(output, manifest)
+    return {"mode": "append", "rows": rows, **counts}
@@ -0,0 +1,537 @@
+# Merge engine - Consolidação de CSVs em streaming
+
+import codecs
+import heapq
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .csv_io import (
+    DEFAULT_CHUNKSIZE, COPY_BUFFER_SIZE, resolve_encoding, read_header_bytes,
+    iter_csv_chunks, iter_record_chunks, _rewrite_chunk
+)
+from .compression import open_output, output_compression, open_input, input_compression
+from .checkpoint import commit_output, restore_outputs
+
+
+def scan_headers(files, sep, encoding='auto'):
+    """
+    Read only the header of each file / Lê apenas o cabeçalho de cada arquivo.
+
+    Returns a list of (encoding, columns) tuples, one per file.
+    """
+    schemas = []
+    for filepath in files:
+        file_enc = resolve_encoding(filepath, encoding)
+        with open_input(filepath) as f:
+            columns = pd.read_csv(f, sep=sep, encoding=file_enc, nrows=0).columns
+        schemas.append((file_enc, list(columns)))
+    return schemas
+
+
+def union_columns(schemas):
+    """Union of all columns in order of first appearance / União das colunas na ordem de aparição"""
+    columns = []
+    seen = set()
+    for _, file_columns in schemas:
+        for col in file_columns:
+            if col not in seen:
+                seen.add(col)
+                columns.append(col)
+    return columns
+
+
+def schema_drift(files, schemas, columns):
+    """
+    Describe how each file deviates from the merged schema / Relatório de divergência de colunas.
+
+    Returns one dict per drifted file with the columns it lacks ('missing'),
+    the columns absent from the first file ('added') and whether the shared
+    columns come in a different order ('reordered').
+    """
+    first = set(schemas[0][1]) if schemas else set()
+    report = []
+    
+    for filepath, (_, file_columns) in zip(files, schemas):
+        present = set(file_columns)
+        missing = [col for col in columns if col not in present]
+        added = [col for col in file_columns if col not in first]
+        reordered = file_columns != [col for col in columns if col in present]
+        
+        if missing or added or reordered:
+            report.append({
+                "file": filepath,
+                "missing": missing,
+                "added": added,
+                "reordered": reordered
+            })
+    
+    return report
+
+
+def add_source_column(df, name, source, categories=None):
+    """
+    Add a provenance column as a pandas Categorical / Adiciona a coluna de origem como categoria.
+
+    Every row holds one small integer code pointing at `source` in
+    `categories` (default: just `source`), instead of a Python string per
+    row. Sharing the same categories across files keeps the column
+    categorical after pd.concat.
+    """
+    if name in df.columns:
+        raise ValueError(f"Column '{name}' already exists in '{source}'")
+    categories = categories or [source]
+    codes = np.full(len(df), categories.index(source), dtype=np.min_scalar_type(len(categories)))
+    return df.assign(**{name: pd.Categorical.from_codes(codes, categories=categories)})
+
+
+def _iter_merge_chunks(files, schemas, sep, encoding, chunksize, workers, on_file, start=(0, 0)):
+    """Yield (index, chunk_index, chunk) for every input, in order, from position `start`"""
+    first_file, first_chunk = start
+    
+    if workers > 1:
+        # Chunks brutos de registros são analisados pelos processos; no máximo dois por processo em andamento
+        window = workers * 2
+        pending = deque()
+        transform_state = pickle.dumps(None)
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for i in range(first_file, len(files)):
+                if on_file:
+                    on_file(i, files[i])
+                
+                skip = first_chunk if i == first_file else 0
+                file_enc = schemas[i][0]
+                with open_input(files[i]) as f:
+                    header = f.readline()
+                    for k, (data, _) in enumerate(iter_record_chunks(f, chunksize)):
+                        if k < skip:
+                            continue
+                        pending.append((i, k, pool.submit(
+                            _rewrite_chunk, transform_state, header, data, sep, file_enc, sep, False, False
+                        )))
+                        if len(pending) >= window:
+                            i_done, k_done, future = pending.popleft()
+                            yield i_done, k_done, future.result()[2]
+            
+            while pending:
+                i_done, k_done, future = pending.popleft()
+                yield i_done, k_done, future.result()[2]
+        return
+    
+    for i in range(first_file, len(files)):
+        if on_file:
+            on_file(i, files[i])
+        
+        skip = first_chunk if i == first_file else 0
+        file_enc = schemas[i][0]
+        for k, chunk in enumerate(iter_csv_chunks(files[i], sep, file_enc, chunksize, skip=skip), skip):
+            yield i, k, chunk
+
+
+def stream_merge(files, output, sep=';', encoding='auto', chunksize=DEFAULT_CHUNKSIZE,
+                 output_encoding='utf-8', workers=1, schemas=None, dedup=None,
+                 source_column=None, on_file=None, compress_workers=1, checkpoint=None):
+    """
+    Merge CSV files chunk by chunk / Consolida CSVs chunk a chunk.
+
+    Each chunk is appended straight to the output, so peak memory is bounded
+    by `chunksize` rows regardless of the number or size of the inputs.
+    With workers > 1 the main process cuts each input into raw chunks of
+    `chunksize` records (iter_record_chunks) that a process pool parses,
+    so memory stays bounded by two chunks per worker.
+
+    The output schema is the union of all headers (see scan_headers), in
+    order of first appearance; chunks of drifted files are reindexed to it
+    and missing columns are left empty. If `dedup` (an ExternalDeduplicator)
+    is given, aligned chunks go through it before being written.
+    `source_column` appends a column with the input path of each row,
+    stored as a per-chunk categorical constant.
+    The output is compressed when its extension is .gz, .bz2 or .xz
+    (see open_output; compress_workers > 1 enables parallel gzip).
+
+    With a `checkpoint` (see engine.checkpoint) the position is saved as
+    (file index, chunk index) plus the committed output size, and a saved
+    state resumes from there after truncating the output. Deduplication
+    state is not saved, so `dedup` and `checkpoint` cannot be combined.
+    Returns the number of rows written.
+    """
+    if dedup is not None and checkpoint is not None:
+        raise ValueError("dedup and checkpoint cannot be combined")
+    if schemas is None:
+        schemas = scan_headers(files, sep, encoding)
+    columns = union_columns(schemas)
+    
+    # Reindexação pré-calculada: só arquivos com colunas divergentes são realinhados
+    needs_reindex = [file_columns != columns for _, file_columns in schemas]
+    header = columns + [source_column] if source_column else columns
+    state = checkpoint.state if checkpoint else None
+    
+    if state:
+        restore_outputs(state["outputs"])
+        start = (state["file"], state["chunk"])
+        total_rows = state["rows"]
+        out = open_output(output, 'a', output_encoding, workers=compress_workers)
+    else:
+        start = (0, 0)
+        total_rows = 0
+        out = open_output(output, 'w', output_encoding, workers=compress_workers)
+        pd.DataFrame(columns=header).to_csv(out, sep=sep, index=False)
+    
+    try:
+        chunks = _iter_merge_chunks(files, schemas, sep, encoding, chunksize, workers, on_file, start)
+        for i, k, chunk in chunks:
+            if needs_reindex[i]:
+                chunk = chunk.reindex(columns=columns)
+            if dedup is not None:
+                chunk = dedup.filter(chunk)
+            if source_column:
+                chunk = add_source_column(chunk, source_column, files[i])
+            
+            chunk.to_csv(out, sep=sep, index=False, header=False)
+            total_rows += len(chunk)
+            
+            if checkpoint and checkpoint.due():
+                out, size = commit_output(out, output, output_encoding, compress_workers)
+                checkpoint.save({
+                    "file": i,
+                    "chunk": k + 1,
+                    "rows": total_rows,
+                    "outputs": {str(output): size}
+                })
+    finally:
+        out.close()
+    
+    return total_rows
+
+
+def _decodes_as(filepath, encoding, block_size=COPY_BUFFER_SIZE):
+    """Check that every byte of a file decodes in `encoding`, block by block"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open_input(filepath) as f:
+        try:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                decoder.decode(block)
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
+def can_byte_concat(files, encoding='auto', output_encoding='utf-8'):
+    """
+    Check whether inputs can be merged by plain byte copy / Verifica se os
+    arquivos podem ser consolidados por cópia direta dos bytes.
+
+    Requires the same header bytes in every file, no BOM and an input
+    encoding whose bytes are already valid in the output encoding. With
+    encoding='auto' the detected encoding only covers the start of each
+    file, so the whole file is also decoded in blocks with the output
+    encoding; a file that fails falls back to the parsing merge.
+    """
+    if not files:
+        return False
+    
+    target = codecs.lookup(output_encoding).name
+    first_header = None
+    
+    for filepath in files:
+        header = read_header_bytes(filepath)
+        if not header.strip() or header.startswith(codecs.BOM_UTF8):
+            return False
+        
+        header = header.rstrip(b'\r\n')
+        if first_header is None:
+            first_header = header
+        elif header != first_header:
+            return False
+        
+        file_enc = codecs.lookup(resolve_encoding(filepath, encoding)).name
+        if file_enc not in (target, 'ascii'):
+            return False
+        # Detecção por amostra: acentos em cp1252 depois dos primeiros 10 KB passariam despercebidos
+        if encoding == 'auto' and not _decodes_as(filepath, target):
+            return False
+    
+    return True
+
+
+# Fatia copiada entre dois checkpoints na cópia direta (256 MB)
+CHECKPOINT_COPY_SLICE = 256 * 1024 * 1024
+
+
+def _write_all(fd, data):
+    """Write every byte of data to a file descriptor"""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _copy_range(src_fd, dst_fd, count):
+    """Copy count bytes between descriptors at their current offsets"""
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    
+    while count > 0:
+        if copy_file_range:
+            try:
+                copied = copy_file_range(src_fd, dst_fd, count)
+            except OSError:
+                # Sistema de arquivos sem suporte: segue com cópia em buffer
+                copy_file_range = None
+                continue
+        else:
+            buf = os.read(src_fd, min(count, COPY_BUFFER_SIZE))
+            copied = len(buf)
+            _write_all(dst_fd, buf)
+        
+        if copied == 0:
+            break
+        count -= copied
+
+
+def _copy_to_stream(src_fd, out, count):
+    """Copy count bytes from a descriptor into a (compressing) binary stream"""
+    while count > 0:
+        buf = os.read(src_fd, min(count, COPY_BUFFER_SIZE))
+        if not buf:
+            break
+        out.write(buf)
+        count -= len(buf)
+
+
+def _copy_decompressed(filepath, write):
+    """Copy the body of a compressed input through write(); returns bytes written"""
+    written = 0
+    last = b''
+    with open_input(filepath) as src:
+        src.readline()
+        while True:
+            buf = src.read(COPY_BUFFER_SIZE)
+            if not buf:
+                break
+            write(buf)
+            written += len(buf)
+            last = buf[-1:]
+    
+    if written and last != b'\n':
+        write(b'\n')
+        written += 1
+    return written
+
+
+def byte_concat_merge(files, output, on_file=None, compress_workers=1, checkpoint=None):
+    """
+    Merge files with identical headers without parsing / Consolida sem parsing.
+
+    The header line is written once and the body of every file is copied
+    with os.copy_file_range when available, or large buffered reads
+    otherwise. Compressed inputs and outputs (.gz, .bz2, .xz, zip members)
+    go through the (de)compressor in 1 MB blocks instead. Call
+    can_byte_concat first.
+
+    With a `checkpoint` (see engine.checkpoint) plain inputs are copied in
+    CHECKPOINT_COPY_SLICE steps and the position is saved as (file index,
+    byte offset in that file); compressed inputs are checkpointed between
+    files. A saved state resumes from there after truncating the output.
+    Returns the (uncompressed) bytes written.
+    """
+    header = read_header_bytes(files[0])
+    if not header.endswith(b'\n'):
+        header += b'\n'
+    
+    state = checkpoint.state if checkpoint else None
+    if state:
+        restore_outputs(state["outputs"])
+    compressed = output_compression(output)
+    
+    if compressed:
+        out = open_output(output, 'ab' if state else 'wb', workers=compress_workers)
+        write = lambda data: out.write(data)
+        copy = lambda src_fd, count: _copy_to_stream(src_fd, out, count)
+    else:
+        # r+b e não 'ab': copy_file_range não aceita destino em modo append
+        out = open(output, 'r+b' if state else 'wb', buffering=0)
+        out.seek(0, os.SEEK_END)
+        write = lambda data: _write_all(out.fileno(), data)
+        copy = lambda src_fd, count: _copy_range(src_fd, out.fileno(), count)
+    
+    def save(file_index, offset):
+        nonlocal out
+        out, size = commit_output(out, output, workers=compress_workers)
+        checkpoint.save({"file": file_index, "offset": offset, "written": written,
+                         "outputs": {str(output): size}})
+    
+    try:
+        if state:
+            first_file, first_offset, written = state["file"], state["offset"], state["written"]
+        else:
+            first_file, first_offset = 0, 0
+            write(header)
+            written = len(header)
+        
+        for i in range(first_file, len(files)):
+            filepath = files[i]
+            if on_file:
+                on_file(i, filepath)
+            
+            if input_compression(filepath):
+                written += _copy_decompressed(filepath, write)
+                if checkpoint and checkpoint.due():
+                    save(i + 1, 0)
+                continue
+            
+            body_start = len(read_header_bytes(filepath))
+            with open(filepath, 'rb', buffering=0) as src:
+                src_fd = src.fileno()
+                size = os.fstat(src_fd).st_size
+                if size <= body_start:
+                    continue
+                
+                # Garante quebra de linha entre arquivos sem newline final
+                os.lseek(src_fd, size - 1, os.SEEK_SET)
+                ends_with_newline = os.read(src_fd, 1) == b'\n'
+                
+                position = first_offset if i == first_file and first_offset else body_start
+                os.lseek(src_fd, position, os.SEEK_SET)
+                while position < size:
+                    count = size - position
+                    if checkpoint:
+                        count = min(count, CHECKPOINT_COPY_SLICE)
+                    copy(src_fd, count)
+                    written += count
+                    position += count
+                    if checkpoint and position < size and checkpoint.due():
+                        save(i, position)
+                
+                if not ends_with_newline:
+                    write(b'\n')
+                    written += 1
+            
+            if checkpoint and checkpoint.due():
+                save(i + 1, 0)
+    finally:
+        out.close()
+    
+    return written
+
+
+def _sort_key(value, numeric):
+    """Sort key for a key-column value; empty values go last"""
+    if not isinstance(value, str):
+        return (1, 0) if numeric else (1, '')
+    if numeric:
+        try:
+            return (0, float(value))
+        except ValueError:
+            return (1, 0)
+    return (0, value)
+
+
+def _iter_sorted_rows(index, filepath, file_enc, sep, key, columns, chunksize, numeric):
+    """Yield (sort_key, index, row) from one pre-sorted file, checking its order"""
+    key_pos = columns.index(key)
+    previous = None
+    
+    for chunk in iter_csv_chunks(filepath, sep, file_enc, chunksize):
+        if list(chunk.columns) != columns:
+            chunk = chunk.reindex(columns=columns)
+        
+        for row in chunk.itertuples(index=False, name=None):
+            sort_key = _sort_key(row[key_pos], numeric)
+            if previous is not None and sort_key < previous:
+                raise ValueError(f"'{filepath}' is not sorted by '{key}' (value {row[key_pos]!r})")
+            previous = sort_key
+            yield sort_key, index, row
+
+
+def sorted_merge(files, output, key, sep=';', encoding='auto', chunksize=DEFAULT_CHUNKSIZE,
+                 output_encoding='utf-8', numeric=False, schemas=None, dedup=None,
+                 source_column=None, compress_workers=1):
+    """
+    K-way merge of inputs pre-sorted by `key` / Merge ordenado de arquivos já ordenados.
+
+    All inputs are streamed at once through a heap (heapq.merge), so the
+    output is globally sorted in a single pass while memory holds one
+    chunk per input plus one output batch. Ties keep the input file order.
+    Inputs that are not sorted by `key` raise ValueError. The output is
+    written to a temporary file next to it and renamed only on success, so
+    a failed merge leaves no partial output. With numeric=True
+    the key is compared as a number instead of text. `source_column`
+    appends the input path of each row as a categorical column. Output
+    compression follows stream_merge.
+    Returns the number of rows written.
+    """
+    if schemas is None:
+        schemas = scan_headers(files, sep, encoding)
+    columns = union_columns(schemas)
+    
+    for filepath, (_, file_columns) in zip(files, schemas):
+        if key not in file_columns:
+            raise ValueError(f"Column '{key}' not found in '{filepath}'")
+    
+    # Chunks menores por arquivo: k leitores abertos ao mesmo tempo
+    read_chunksize = max(1000, chunksize // max(1, len(files)))
+    streams = [
+        _iter_sorted_rows(i, filepath, file_enc, sep, key, columns, read_chunksize, numeric)
+        for i, (filepath, (file_enc, _)) in enumerate(zip(files, schemas))
+    ]
+    
+    # Origem de cada linha: código inteiro do arquivo em uma categoria compartilhada
+    categories = list(dict.fromkeys(files))
+    file_codes = [categories.index(filepath) for filepath in files]
+    
+    total_rows = 0
+    batch = []
+    sources = []
+    
+    def flush(out):
+        frame = pd.DataFrame(batch, columns=columns)
+        keep = frame.index
+        if dedup is not None:
+            frame = dedup.filter(frame)
+            keep = frame.index
+        if source_column:
+            if source_column in frame.columns:
+                raise ValueError(f"Column '{source_column}' already exists")
+            codes = np.asarray(sources, dtype=np.min_scalar_type(len(categories)))[keep]
+            frame = frame.assign(**{source_column: pd.Categorical.from_codes(codes, categories=categories)})
+        frame.to_csv(out, sep=sep, index=False, header=False)
+        batch.clear()
+        sources.clear()
+        return len(frame)
+    
+    header = columns + [source_column] if source_column else columns
+    
+    # Saída temporária com a mesma extensão: entrada fora de ordem não deixa arquivo parcial
+    head, tail = os.path.split(output)
+    temp = os.path.join(head, f".{tail}.{os.getpid()}.tmp{os.path.splitext(tail)[1]}")
+    
+    try:
+        with open_output(temp, 'w', output_encoding, workers=compress_workers) as out:
+            pd.DataFrame(columns=header).to_csv(out, sep=sep, index=False)
+            
+            for _, i, row in heapq.merge(*streams, key=lambda item: item[0]):
+                batch.append(row)
+                sources.append(file_codes[i])
+                if len(batch) >= chunksize:
+                    total_rows += flush(out)
+            
+            if batch:
+                total_rows += flush(out)
+        os.replace(temp, output)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+    
+    return total_rows
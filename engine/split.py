@@ -0,0 +1,578 @@
+# Split engine - Divisão de CSVs em streaming
+
+import csv
+import os
+import re
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .csv_io import DEFAULT_CHUNKSIZE, COPY_BUFFER_SIZE, resolve_encoding, iter_csv_chunks, record_ends
+from .compression import open_output, open_input
+from .checkpoint import commit_output, restore_outputs
+
+
+def _write_part(df, path, sep, encoding, header, quoting):
+    """Format and write one part (runs in a worker process)"""
+    df.to_csv(path, sep=sep, encoding=encoding, index=False, header=header, quoting=quoting)
+    return len(df)
+
+
+def _iter_row_parts(filepath, max_rows, sep, encoding, chunksize, transform, position=(0, 0)):
+    """
+    Yield (part, next_position) for whole parts of `max_rows` rows.
+    
+    Positions are (chunk index, row in chunk) of the first row not yet
+    yielded, so reading can restart right after any part.
+    """
+    pieces = []
+    rows = 0
+    first_chunk, first_row = position
+    next_position = position
+    
+    for index, chunk in enumerate(iter_csv_chunks(filepath, sep, encoding, min(max_rows, chunksize),
+                                                  skip=first_chunk), first_chunk):
+        if transform:
+            chunk = transform(chunk)
+        
+        start = first_row if index == first_chunk else 0
+        while start < len(chunk):
+            take = min(max_rows - rows, len(chunk) - start)
+            pieces.append(chunk.iloc[start:start + take])
+            rows += take
+            start += take
+            
+            if rows == max_rows:
+                next_position = (index, start) if start < len(chunk) else (index + 1, 0)
+                yield pd.concat(pieces, ignore_index=True) if len(pieces) > 1 else pieces[0], next_position
+                pieces = []
+                rows = 0
+        next_position = (index + 1, 0)
+    
+    if pieces:
+        yield pd.concat(pieces, ignore_index=True) if len(pieces) > 1 else pieces[0], next_position
+
+
+def _split_rows_parallel(filepath, max_rows, part_path, sep, encoding, chunksize, output_sep,
+                         output_encoding, header, quoting, transform, on_part, workers, checkpoint):
+    """Format and write parts in a process pool, reporting them in order"""
+    window = workers * 2
+    pending = deque()
+    state = checkpoint.state if checkpoint else None
+    parts = [tuple(part) for part in state["parts"]] if state else []
+    position = (state["chunk"], state["row"]) if state else (0, 0)
+    
+    def finish_oldest():
+        path, next_position, future = pending.popleft()
+        rows = future.result()
+        parts.append((path, rows))
+        if on_part:
+            on_part(len(parts), path, rows)
+        
+        # Partes são arquivos inteiros: basta registrar as concluídas e a posição seguinte
+        if checkpoint and checkpoint.due():
+            checkpoint.save({
+                "chunk": next_position[0],
+                "row": next_position[1],
+                "parts": [[str(path), rows] for path, rows in parts],
+                "outputs": {}
+            })
+    
+    row_parts = _iter_row_parts(filepath, max_rows, sep, encoding, chunksize, transform, position)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for n, (df, next_position) in enumerate(row_parts, len(parts) + 1):
+            path = part_path(n)
+            pending.append((path, next_position, pool.submit(_write_part, df, path, output_sep,
+                                                             output_encoding, header, quoting)))
+            del df
+            if len(pending) >= window:
+                finish_oldest()
+        
+        while pending:
+            finish_oldest()
+    
+    return parts
+
+
+def split_rows(filepath, max_rows, part_path, sep=';', encoding='auto', chunksize=DEFAULT_CHUNKSIZE,
+               output_sep=None, output_encoding='utf-8', header=True, quoting=csv.QUOTE_MINIMAL,
+               transform=None, on_part=None, workers=1, compress_workers=1, checkpoint=None):
+    """
+    Split a CSV into parts of at most `max_rows` rows / Divide um CSV em partes de até `max_rows` linhas.
+    
+    The input is read in chunks of min(max_rows, chunksize) text rows and
+    written through a rolling writer: a part stays open across chunk
+    boundaries until it holds `max_rows` rows, so memory is bounded by one
+    chunk however large the file or the parts are.
+    
+    `part_path(n)` returns the path of part n (1-based). `transform(chunk)`,
+    if given, is applied to every chunk before writing (format conversion).
+    `on_part(n, path, rows)` is called after each part is closed.
+    
+    With workers > 1 whole parts are assembled and handed to a process pool
+    that formats and writes several of them at once. At most two parts per
+    worker are pending, which bounds memory, and on_part still reports
+    parts in order.
+
+    Parts whose path ends in .gz, .bz2 or .xz are compressed; with
+    compress_workers > 1 gzip parts are compressed in parallel blocks.
+    
+    With a `checkpoint` (see engine.checkpoint) the completed parts, the
+    next chunk index and the committed size of the open part are saved
+    (with workers > 1: the position after the last completed part). A
+    saved state resumes there, truncating the open part.
+    
+    Returns a list of (path, rows) for the parts written.
+    """
+    file_enc = resolve_encoding(filepath, encoding)
+    output_sep = output_sep or sep
+    
+    if workers > 1:
+        return _split_rows_parallel(filepath, max_rows, part_path, sep, file_enc, chunksize, output_sep,
+                                    output_encoding, header, quoting, transform, on_part, workers,
+                                    checkpoint)
+    
+    parts = []
+    out = None
+    path = None
+    part_rows = 0
+    start_chunk = 0
+    
+    state = checkpoint.state if checkpoint else None
+    if state:
+        restore_outputs(state["outputs"])
+        start_chunk = state["chunk"]
+        parts = [tuple(part) for part in state["parts"]]
+        if state["current"]:
+            path, part_rows = state["current"]
+            out = open_output(path, 'a', output_encoding, workers=compress_workers)
+    
+    def save(next_chunk):
+        nonlocal out
+        outputs = {}
+        if out is not None:
+            out, outputs[str(path)] = commit_output(out, path, output_encoding, compress_workers)
+        checkpoint.save({
+            "chunk": next_chunk,
+            "parts": [[str(part), rows] for part, rows in parts],
+            "current": [str(path), part_rows] if out is not None else None,
+            "outputs": outputs
+        })
+    
+    try:
+        chunks = iter_csv_chunks(filepath, sep, file_enc, min(max_rows, chunksize), skip=start_chunk)
+        for index, chunk in enumerate(chunks, start_chunk):
+            if transform:
+                chunk = transform(chunk)
+            
+            start = 0
+            while start < len(chunk):
+                if out is None:
+                    path = part_path(len(parts) + 1)
+                    out = open_output(path, 'w', output_encoding, workers=compress_workers)
+                    part_rows = 0
+                
+                take = min(max_rows - part_rows, len(chunk) - start)
+                chunk.iloc[start:start + take].to_csv(
+                    out, sep=output_sep, index=False, quoting=quoting,
+                    header=header and part_rows == 0
+                )
+                part_rows += take
+                start += take
+                
+                if part_rows == max_rows:
+                    out.close()
+                    out = None
+                    parts.append((path, part_rows))
+                    if on_part:
+                        on_part(len(parts), path, part_rows)
+            
+            if checkpoint and checkpoint.due():
+                save(index + 1)
+        
+        if out is not None:
+            out.close()
+            out = None
+            parts.append((path, part_rows))
+            if on_part:
+                on_part(len(parts), path, part_rows)
+    finally:
+        if out is not None:
+            out.close()
+    
+    return parts
+
+
+def split_bytes(filepath, max_bytes, part_path, block_size=COPY_BUFFER_SIZE, on_part=None,
+                compress_workers=1, checkpoint=None):
+    """
+    Split a CSV into parts of at most `max_bytes` bytes / Divide um CSV por tamanho em bytes.
+    
+    Works on the raw bytes without building a DataFrame: each block is
+    scanned for newlines outside quoted fields and parts are cut at the
+    last record boundary that fits, so quoted line breaks are never split.
+    The header line is written at the top of every part and counts towards
+    the limit. A single record larger than the limit gets a part of its own.
+    With compressed part paths the limit applies to the uncompressed data.
+    
+    `part_path(n)` and `on_part(n, path, rows)` work as in split_rows().
+    With a `checkpoint` the position is saved as the (uncompressed) input
+    byte offset of the next record, along with the completed parts and the
+    open part; a saved state seeks back there and truncates the open part.
+    Returns a list of (path, rows) for the parts written.
+    """
+    parts = []
+    out = None
+    path = None
+    part_rows = 0
+    part_size = 0
+    
+    state = checkpoint.state if checkpoint else None
+    if state:
+        restore_outputs(state["outputs"])
+        parts = [tuple(part) for part in state["parts"]]
+        if state["current"]:
+            path, part_rows, part_size = state["current"]
+            out = open_output(path, 'ab', workers=compress_workers)
+    
+    def save(offset):
+        nonlocal out
+        outputs = {}
+        if out is not None:
+            out, outputs[str(path)] = commit_output(out, path, workers=compress_workers)
+        checkpoint.save({
+            "offset": offset,
+            "parts": [[str(part), rows] for part, rows in parts],
+            "current": [str(path), part_rows, part_size] if out is not None else None,
+            "outputs": outputs
+        })
+    
+    def close_part():
+        nonlocal out
+        out.close()
+        out = None
+        parts.append((path, part_rows))
+        if on_part:
+            on_part(len(parts), path, part_rows)
+    
+    with open_input(filepath) as f:
+        header = f.readline()
+        read_pos = len(header)
+        if not header.endswith(b'\n'):
+            header += b'\n'
+        if len(header) >= max_bytes:
+            raise ValueError(f"max_bytes ({max_bytes}) must be larger than the header ({len(header)} bytes)")
+        
+        in_quote = False
+        pending = b''
+        
+        # Posição lida na entrada descompactada; pending começa sempre numa fronteira de registro
+        if state:
+            read_pos = state["offset"]
+            f.seek(read_pos)
+        
+        try:
+            while True:
+                block = f.read(block_size)
+                read_pos += len(block)
+                if not block:
+                    if pending:
+                        block, pending = pending, b''
+                        if not block.endswith(b'\n'):
+                            block += b'\n'
+                        ends = np.array([len(block)])
+                    else:
+                        break
+                else:
+                    ends, in_quote = record_ends(block, in_quote)
+                    if pending:
+                        ends = ends + len(pending)
+                        block = pending + block
+                        pending = b''
+                    last = int(ends[-1]) if len(ends) else 0
+                    block, pending = block[:last], block[last:]
+                    if not len(ends):
+                        pending = block + pending
+                        continue
+                
+                pos = 0
+                while pos < len(block):
+                    if out is None:
+                        path = part_path(len(parts) + 1)
+                        out = open_output(path, 'wb', workers=compress_workers)
+                        out.write(header)
+                        part_rows = 0
+                        part_size = len(header)
+                    
+                    # Última fronteira que cabe no espaço restante da parte
+                    first = np.searchsorted(ends, pos, side='right')
+                    fit = np.searchsorted(ends, pos + max_bytes - part_size, side='right')
+                    if fit == first and part_rows == 0:
+                        fit = first + 1
+                    
+                    if fit > first:
+                        end = int(ends[fit - 1])
+                        out.write(block[pos:end])
+                        part_rows += int(fit - first)
+                        part_size += end - pos
+                        pos = end
+                    
+                    if pos < len(block) or part_size >= max_bytes:
+                        close_part()
+                
+                if checkpoint and checkpoint.due():
+                    save(read_pos - len(pending))
+            
+            if out is not None:
+                close_part()
+        finally:
+            if out is not None:
+                out.close()
+    
+    return parts
+
+
+# Arquivos de saída mantidos abertos ao mesmo tempo no split por coluna
+DEFAULT_MAX_OPEN_FILES = 128
+
+# Caracteres inválidos em nomes de arquivo (Windows e POSIX)
+_INVALID_NAME_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+
+
+def partition_name(value):
+    """Safe file name fragment for a partition value / Nome de arquivo seguro para um valor"""
+    if pd.isna(value) or str(value).strip() == '':
+        return 'vazio'
+    name = _INVALID_NAME_CHARS.sub('_', str(value).strip()).rstrip('. ')
+    return name[:100] or '_'
+
+
+class _HandleCache:
+    """LRU of open output files; evicted files are reopened in append mode"""
+    
+    def __init__(self, max_open, encoding):
+        self.max_open = max(1, max_open)
+        self.encoding = encoding
+        self.handles = OrderedDict()
+        self.created = set()
+        self.reopened = 0
+        
+    def get(self, path):
+        """Return (handle, is_new_file) for path"""
+        path = str(path)
+        handle = self.handles.get(path)
+        if handle is not None:
+            self.handles.move_to_end(path)
+            return handle, False
+        
+        if len(self.handles) >= self.max_open:
+            _, oldest = self.handles.popitem(last=False)
+            oldest.close()
+        
+        is_new = path not in self.created
+        if not is_new:
+            self.reopened += 1
+        handle = open_output(path, 'w' if is_new else 'a', self.encoding)
+        self.created.add(path)
+        self.handles[path] = handle
+        return handle, is_new
+        
+    def commit(self):
+        """Make every file durable; returns {path: size} for all files created so far"""
+        for path, handle in self.handles.items():
+            self.handles[path], _ = commit_output(handle, path, self.encoding)
+        return {path: os.path.getsize(path) for path in self.created}
+        
+    def close(self):
+        for handle in self.handles.values():
+            handle.close()
+        self.handles.clear()
+
+
+def split_by_column(filepath, column, part_path, sep=';', encoding='auto', chunksize=DEFAULT_CHUNKSIZE,
+                    output_sep=None, output_encoding='utf-8', header=True, quoting=csv.QUOTE_MINIMAL,
+                    transform=None, max_open=DEFAULT_MAX_OPEN_FILES, on_chunk=None, on_part=None,
+                    checkpoint=None):
+    """
+    Write one file per distinct value of `column` / Gera um arquivo por valor distinto de `column`.
+    
+    The input is streamed once; each chunk is grouped by the column and
+    every group is appended to its value's file. Output files are kept in
+    an LRU of at most `max_open` open handles, so tens of thousands of
+    distinct values stay within the OS file descriptor limit: a file pushed
+    out of the cache is simply reopened in append mode when its value
+    shows up again.
+    
+    `part_path(name)` returns the path for a value, where name comes from
+    partition_name() (made unique if two values map to the same name).
+    `on_chunk(rows)` is called after each chunk with the rows read so far;
+    `on_part(n, path, rows)` is called for every file at the end.
+    
+    With a `checkpoint` the next chunk index, every value's file and row
+    count and the committed size of each file are saved; a saved state
+    truncates the files back and continues from that chunk.
+    
+    Returns a list of (path, rows) in order of first appearance.
+    """
+    file_enc = resolve_encoding(filepath, encoding)
+    output_sep = output_sep or sep
+    
+    paths = {}
+    names = {}
+    used_names = set()
+    rows_per_path = {}
+    rows_read = 0
+    start_chunk = 0
+    cache = _HandleCache(max_open, output_encoding)
+    
+    state = checkpoint.state if checkpoint else None
+    if state:
+        restore_outputs(state["outputs"])
+        start_chunk, rows_read = state["chunk"], state["rows_read"]
+        for key, name, path, rows in state["partitions"]:
+            paths[key] = path
+            names[path] = name
+            used_names.add(name.lower())
+            rows_per_path[path] = rows
+        cache.created.update(state["outputs"])
+    
+    try:
+        chunks = iter_csv_chunks(filepath, sep, file_enc, chunksize, skip=start_chunk)
+        for index, chunk in enumerate(chunks, start_chunk):
+            if column not in chunk.columns:
+                raise KeyError(f"Column '{column}' not found / Coluna '{column}' não encontrada")
+            if transform:
+                chunk = transform(chunk)
+            
+            for value, group in chunk.groupby(column, sort=False, dropna=False):
+                key = None if pd.isna(value) else value
+                path = paths.get(key)
+                if path is None:
+                    name = base = partition_name(value)
+                    suffix = 2
+                    while name.lower() in used_names:
+                        name = f"{base}_{suffix}"
+                        suffix += 1
+                    used_names.add(name.lower())
+                    path = paths[key] = str(part_path(name))
+                    names[path] = name
+                    rows_per_path[path] = 0
+                
+                out, is_new = cache.get(path)
+                group.to_csv(out, sep=output_sep, index=False, quoting=quoting, header=header and is_new)
+                rows_per_path[path] += len(group)
+            
+            rows_read += len(chunk)
+            if on_chunk:
+                on_chunk(rows_read)
+            
+            if checkpoint and checkpoint.due():
+                checkpoint.save({
+                    "chunk": index + 1,
+                    "rows_read": rows_read,
+                    "partitions": [[key, names[path], path, rows_per_path[path]] for key, path in paths.items()],
+                    "outputs": cache.commit()
+                })
+    finally:
+        cache.close()
+    
+    parts = list(rows_per_path.items())
+    if on_part:
+        for n, (path, rows) in enumerate(parts, 1):
+            on_part(n, path, rows)
+    return parts
+
+
+def hash_buckets(values, buckets):
+    """
+    Bucket of every value by a stable 64-bit hash / Bucket de cada valor por hash estável.
+    
+    Uses pd.util.hash_array with its fixed default key, so the same value
+    lands in the same bucket in every chunk, run and process.
+    """
+    hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+    return (hashes % np.uint64(buckets)).astype(np.int64)
+
+
+def split_by_hash(filepath, column, buckets, part_path, sep=';', encoding='auto', chunksize=DEFAULT_CHUNKSIZE,
+                  output_sep=None, output_encoding='utf-8', header=True, quoting=csv.QUOTE_MINIMAL,
+                  transform=None, max_open=DEFAULT_MAX_OPEN_FILES, on_chunk=None, on_part=None,
+                  checkpoint=None):
+    """
+    Hash-partition a CSV into `buckets` files by a key column / Divide em N buckets pelo hash da chave.
+    
+    Every chunk's key column is hashed in one vectorized call and each
+    bucket's rows are appended to its file, so all rows sharing a key end
+    up in the same file. Keys are compared as text. Output handles are
+    kept in the same LRU as split_by_column(); buckets that received no
+    rows still get a file with just the header.
+    
+    `part_path(bucket)` returns the path of a bucket (0-based); on_chunk,
+    on_part and checkpoint work as in split_by_column(). Returns a list of
+    (path, rows) ordered by bucket.
+    """
+    if buckets < 1:
+        raise ValueError("buckets must be at least 1")
+    
+    file_enc = resolve_encoding(filepath, encoding)
+    output_sep = output_sep or sep
+    
+    paths = [str(part_path(bucket)) for bucket in range(buckets)]
+    rows_per_bucket = [0] * buckets
+    columns = None
+    rows_read = 0
+    start_chunk = 0
+    cache = _HandleCache(max_open, output_encoding)
+    
+    state = checkpoint.state if checkpoint else None
+    if state:
+        restore_outputs(state["outputs"])
+        start_chunk, rows_read = state["chunk"], state["rows_read"]
+        rows_per_bucket, columns = state["rows"], state["columns"]
+        cache.created.update(state["outputs"])
+    
+    try:
+        chunks = iter_csv_chunks(filepath, sep, file_enc, chunksize, skip=start_chunk)
+        for index, chunk in enumerate(chunks, start_chunk):
+            if column not in chunk.columns:
+                raise KeyError(f"Column '{column}' not found / Coluna '{column}' não encontrada")
+            
+            codes = hash_buckets(chunk[column].to_numpy(), buckets)
+            if transform:
+                chunk = transform(chunk)
+            columns = list(chunk.columns)
+            
+            for bucket, group in chunk.groupby(codes, sort=False):
+                out, is_new = cache.get(paths[bucket])
+                group.to_csv(out, sep=output_sep, index=False, quoting=quoting, header=header and is_new)
+                rows_per_bucket[bucket] += len(group)
+            
+            rows_read += len(chunk)
+            if on_chunk:
+                on_chunk(rows_read)
+            
+            if checkpoint and checkpoint.due():
+                checkpoint.save({
+                    "chunk": index + 1,
+                    "rows_read": rows_read,
+                    "rows": rows_per_bucket,
+                    "columns": columns,
+                    "outputs": cache.commit()
+                })
+        
+        # Buckets sem linhas também geram arquivo (só o cabeçalho)
+        for bucket, path in enumerate(paths):
+            if path not in cache.created:
+                out, _ = cache.get(path)
+                if header and columns is not None:
+                    pd.DataFrame(columns=columns).to_csv(out, sep=output_sep, index=False, quoting=quoting)
+    finally:
+        cache.close()
+    
+    parts = list(zip(paths, rows_per_bucket))
+    if on_part:
+        for n, (path, rows) in enumerate(parts, 1):
+            on_part(n, path, rows)
+    return parts
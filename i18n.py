@@ -483,6 +483,58 @@ TRANSLATIONS = {
         "pt": "✅ Salvo: {} ({} linhas)",
         "en": "✅ Saved: {} ({} rows)"
     },
+    "cli_streaming": {
+        "pt": "  → Modo streaming ({} linhas por chunk)",
+        "en": "  → Streaming mode ({} rows per chunk)"
+    },
+    "cli_workers": {
+        "pt": "  → Lendo em paralelo com {} processos",
+        "en": "  → Reading in parallel with {} processes"
+    },
+    "cli_byte_copy": {
+        "pt": "  → Cabeçalhos idênticos: copiando bytes sem parsing",
+        "en": "  → Identical headers: copying bytes without parsing"
+    },
+    "cli_saved_bytes": {
+        "pt": "✅ Salvo: {} ({:.1f} MB)",
+        "en": "✅ Saved: {} ({:.1f} MB)"
+    },
+    "cli_schema_columns": {
+        "pt": "  → Schema consolidado: {} colunas",
+        "en": "  → Merged schema: {} columns"
+    },
+    "cli_schema_drift": {
+        "pt": "  ⚠️ {} arquivos com colunas divergentes:",
+        "en": "  ⚠️ {} files with column drift:"
+    },
+    "cli_schema_missing": {
+        "pt": "        faltando: {}",
+        "en": "        missing: {}"
+    },
+    "cli_schema_added": {
+        "pt": "        novas: {}",
+        "en": "        added: {}"
+    },
+    "cli_schema_reordered": {
+        "pt": "        colunas em outra ordem",
+        "en": "        columns in a different order"
+    },
+    "cli_incremental_rebuild": {
+        "pt": "  → Manifesto ausente ou entradas alteradas: saída reconstruída",
+        "en": "  → Missing manifest or changed inputs: output rebuilt"
+    },
+    "cli_incremental_append": {
+        "pt": "  → Incremental: {} novos, {} com novas linhas, {} sem alteração",
+        "en": "  → Incremental: {} new, {} grown, {} unchanged"
+    },
+    "cli_incremental_no_dedup": {
+        "pt": "❌ --incremental não pode ser usado com --drop-duplicates",
+        "en": "❌ --incremental cannot be combined with --drop-duplicates"
+    },
+    "cli_sorted_merge": {
+        "pt": "  → Merge ordenado pela coluna '{}' (entradas já ordenadas)",
+        "en": "  → Sorted merge by column '{}' (pre-sorted inputs)"
+    },
     "cli_splitting": {
         "pt": "✂️ Dividindo: {}",
         "en": "✂️ Splitting: {}"
@@ -491,6 +543,30 @@ TRANSLATIONS = {
         "pt": "  → {} linhas / {} por arquivo = {} arquivos",
         "en": "  → {} rows / {} per file = {} files"
     },
+    "cli_split_workers": {
+        "pt": "  → Gravando partes em paralelo com {} processos",
+        "en": "  → Writing parts in parallel with {} processes"
+    },
+    "cli_split_by": {
+        "pt": "  → Um arquivo por valor da coluna '{}' (até {} arquivos abertos)",
+        "en": "  → One file per value of column '{}' (up to {} open files)"
+    },
+    "cli_split_hash": {
+        "pt": "  → Buckets por hash da coluna '{}': {} arquivos",
+        "en": "  → Hash buckets by column '{}': {} files"
+    },
+    "cli_split_bytes": {
+        "pt": "  → Dividindo por tamanho: até {:.1f} MB por arquivo (cópia de bytes)",
+        "en": "  → Splitting by size: up to {:.1f} MB per file (byte copy)"
+    },
+    "cli_split_bytes_info": {
+        "pt": "  → {} linhas em {} arquivos",
+        "en": "  → {} rows in {} files"
+    },
+    "cli_invalid_size": {
+        "pt": "tamanho inválido: '{}' (use bytes ou sufixo K, M, G)",
+        "en": "invalid size: '{}' (use bytes or a K, M, G suffix)"
+    },
     "cli_files_created": {
         "pt": "✅ {} arquivos criados em: {}",
         "en": "✅ {} files created in: {}"
@@ -503,6 +579,26 @@ TRANSLATIONS = {
         "pt": "  → Removidas {} linhas vazias",
         "en": "  → Removed {} empty rows"
     },
+    "cli_replace_table": {
+        "pt": "  → Tabela de substituição: {} regras ({} regex)",
+        "en": "  → Replace table: {} rules ({} regex)"
+    },
+    "cli_clean_dedup": {
+        "pt": "  → Removendo duplicatas por {} (mantendo {})",
+        "en": "  → Removing duplicates by {} (keeping {})"
+    },
+    "cli_all_columns": {
+        "pt": "todas as colunas",
+        "en": "all columns"
+    },
+    "cli_clean_workers": {
+        "pt": "  → Limpando em paralelo com {} processos",
+        "en": "  → Cleaning in parallel with {} processes"
+    },
+    "cli_memo_saved": {
+        "pt": "  ♻ Valores únicos: {:,} limpezas para {:,} células ({:.0f}% evitado)",
+        "en": "  ♻ Unique values: {:,} cleanings for {:,} cells ({:.0f}% avoided)"
+    },
     "cli_converting": {
         "pt": "🔄 Convertendo: {}",
         "en": "🔄 Converting: {}"
@@ -673,6 +769,42 @@ TRANSLATIONS = {
         "pt": "Remover duplicatas",
         "en": "Remove duplicates"
     },
+    "cli_arg_stream": {
+        "pt": "Consolidar em streaming, com memória limitada ao tamanho do chunk",
+        "en": "Merge in streaming mode, memory bounded by the chunk size"
+    },
+    "cli_arg_chunksize": {
+        "pt": "Linhas por chunk no modo streaming (default: 100000)",
+        "en": "Rows per chunk in streaming mode (default: 100000)"
+    },
+    "cli_arg_workers": {
+        "pt": "Processos para leitura paralela dos arquivos (default: 1)",
+        "en": "Processes for parallel file parsing (default: 1)"
+    },
+    "cli_arg_dedup_memory": {
+        "pt": "Memória (MB) para duplicatas no modo streaming antes de usar disco (default: 512)",
+        "en": "Memory (MB) for duplicate tracking in streaming mode before spilling to disk (default: 512)"
+    },
+    "cli_arg_add_source_column": {
+        "pt": "Adicionar coluna NAME com o arquivo de origem de cada linha",
+        "en": "Add column NAME with the source file of each row"
+    },
+    "cli_arg_sorted_by": {
+        "pt": "Entradas já ordenadas por COL: gera saída ordenada em uma passada",
+        "en": "Inputs pre-sorted by COL: produce sorted output in one pass"
+    },
+    "cli_arg_sort_numeric": {
+        "pt": "Comparar a coluna de --sorted-by como número",
+        "en": "Compare the --sorted-by column as a number"
+    },
+    "cli_arg_incremental": {
+        "pt": "Acrescentar só arquivos novos ou alterados, usando um manifesto ao lado da saída",
+        "en": "Append only new or changed files, using a manifest next to the output"
+    },
+    "cli_arg_no_byte_copy": {
+        "pt": "Sempre fazer parsing, mesmo com cabeçalhos idênticos",
+        "en": "Always parse, even when headers are identical"
+    },
     "cli_arg_file_split": {
         "pt": "Arquivo CSV para dividir",
         "en": "CSV file to split"
@@ -681,6 +813,74 @@ TRANSLATIONS = {
         "pt": "Linhas por arquivo (default: 50000)",
         "en": "Rows per file (default: 50000)"
     },
+    "cli_arg_split_workers": {
+        "pt": "Processos para formatar e gravar partes em paralelo (default: 1)",
+        "en": "Processes that format and write parts in parallel (default: 1)"
+    },
+    "cli_arg_replace_table": {
+        "pt": "CSV ou JSON com regras localizar;substituir[;regex], aplicadas em uma única varredura",
+        "en": "CSV or JSON of find;replace[;regex] rules, applied in a single scan"
+    },
+    "cli_arg_dedup_keys": {
+        "pt": "Remove duplicatas comparando só estas colunas (separadas por vírgula)",
+        "en": "Remove duplicates comparing only these columns (comma separated)"
+    },
+    "cli_arg_keep": {
+        "pt": "Ocorrência mantida entre duplicatas: first (padrão) ou last",
+        "en": "Occurrence kept among duplicates: first (default) or last"
+    },
+    "cli_arg_verify_duplicates": {
+        "pt": "Confirma cada duplicata pela linha exata em vez do hash de 64 bits (só com keep first)",
+        "en": "Confirm every duplicate against the exact row instead of the 64-bit hash (keep first only)"
+    },
+    "cli_arg_clean_workers": {
+        "pt": "Processos para limpar chunks em paralelo (default: 1)",
+        "en": "Processes that clean chunks in parallel (default: 1)"
+    },
+    "cli_arg_split_by": {
+        "pt": "Gera um arquivo por valor distinto desta coluna",
+        "en": "Write one file per distinct value of this column"
+    },
+    "cli_arg_hash_key": {
+        "pt": "Divide em buckets pelo hash desta coluna (mesma chave, mesmo arquivo)",
+        "en": "Split into buckets by the hash of this column (same key, same file)"
+    },
+    "cli_arg_buckets": {
+        "pt": "Número de buckets com --hash-key (default: 8)",
+        "en": "Number of buckets with --hash-key (default: 8)"
+    },
+    "cli_arg_max_open": {
+        "pt": "Máximo de arquivos de saída abertos ao mesmo tempo com --by/--hash-key (default: 128)",
+        "en": "Maximum output files kept open at once with --by/--hash-key (default: 128)"
+    },
+    "cli_arg_compress": {
+        "pt": "Compacta a saída (também detectado pela extensão .gz, .bz2, .xz)",
+        "en": "Compress the output (also detected from a .gz, .bz2, .xz extension)"
+    },
+    "cli_arg_compress_workers": {
+        "pt": "Threads para compressão gzip paralela em blocos (default: 1)",
+        "en": "Threads for parallel block gzip compression (default: 1)"
+    },
+    "cli_arg_resume": {
+        "pt": "Retoma do último checkpoint, truncando a saída parcial",
+        "en": "Resume from the last checkpoint, truncating partial output"
+    },
+    "cli_resuming": {
+        "pt": "  ↻ Retomando do checkpoint: {}",
+        "en": "  ↻ Resuming from checkpoint: {}"
+    },
+    "cli_resume_none": {
+        "pt": "  ⚠️ Nenhum checkpoint compatível; começando do início",
+        "en": "  ⚠️ No matching checkpoint; starting from the beginning"
+    },
+    "cli_resume_unsupported": {
+        "pt": "  ⚠️ Este modo não grava checkpoints; --resume ignorado",
+        "en": "  ⚠️ This mode does not write checkpoints; --resume ignored"
+    },
+    "cli_arg_max_bytes": {
+        "pt": "Tamanho máximo por arquivo, ex. 100M (divide por bytes em vez de linhas)",
+        "en": "Maximum size per file, e.g. 100M (splits by bytes instead of rows)"
+    },
     "cli_arg_output_dir": {
         "pt": "Diretório de saída",
         "en": "Output directory"
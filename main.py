@@ -4,6 +4,7 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import json
+import multiprocessing
 import os
 import sys
 from pathlib import Path
@@ -748,4 +749,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Necessário para o pool de processos no executável (PyInstaller)
+    multiprocessing.freeze_support()
     main()
@@ -5,11 +5,12 @@ from tkinter import filedialog, messagebox
 import pandas as pd
 import os
 import re
-import unicodedata
 import chardet
 from pathlib import Path
 import threading
 
+from engine import open_input, read_csv_file, UniqueValueMemo, fold_accents
+
 
 class ColumnCleanerTool(ctk.CTkFrame):
     """Ferramenta para limpeza avançada de colunas com unidecode e normalização"""
@@ -319,11 +320,11 @@ class ColumnCleanerTool(ctk.CTkFrame):
             
             enc = self.enc_var.get()
             if enc == "auto":
-                with open(filepath, 'rb') as f:
+                with open_input(filepath) as f:
                     result = chardet.detect(f.read(10000))
                     enc = result['encoding']
             
-            self.df = pd.read_csv(filepath, sep=sep, encoding=enc, low_memory=False, dtype=str)
+            self.df = read_csv_file(filepath, sep, enc, dtype=str)
             self.columns = list(self.df.columns)
             
             self.update_column_checkboxes()
@@ -370,46 +371,61 @@ class ColumnCleanerTool(ctk.CTkFrame):
         file = filedialog.asksaveasfilename(
             title="Salvar como",
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"), ("CSV compactado", "*.csv.gz *.csv.bz2 *.csv.xz"), ("All files", "*.*")]
         )
         
         if file:
             self.output_entry.delete(0, "end")
             self.output_entry.insert(0, file)
     
-    def clean_value(self, value):
+    def get_clean_options(self):
+        """Lê as opções de limpeza uma única vez"""
+        return {
+            "fix_cedilla": self.fix_cedilla_var.get(),
+            "remove_accents": self.remove_accents_var.get(),
+            "uppercase": self.uppercase_var.get(),
+            "trim": self.trim_var.get(),
+            "collapse_spaces": self.collapse_spaces_var.get(),
+            "remove_special": self.remove_special_var.get()
+        }
+    
+    def clean_value(self, value, options=None):
         """Aplica todas as limpezas em um valor"""
         if pd.isna(value):
             return value
         
+        options = options or self.get_clean_options()
         text = str(value)
         
-        # Corrigir cedilha antes de remover acentos
-        if self.fix_cedilla_var.get():
+        # Corrigir cedilha (a remoção de acentos já converte Ç/ç)
+        if options["fix_cedilla"] and not options["remove_accents"]:
             text = text.replace("Ç", "C").replace("ç", "c")
         
-        # Remover acentos (unidecode style)
-        if self.remove_accents_var.get():
-            text = unicodedata.normalize('NFD', text)
-            text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+        # Remover acentos (tabela de tradução pré-calculada, igual a NFD sem as marcas Mn)
+        if options["remove_accents"]:
+            text = fold_accents(text)
         
         # Maiúsculas
-        if self.uppercase_var.get():
+        if options["uppercase"]:
             text = text.upper()
         
         # Trim
-        if self.trim_var.get():
+        if options["trim"]:
             text = text.strip()
         
         # Colapsar espaços
-        if self.collapse_spaces_var.get():
+        if options["collapse_spaces"]:
             text = re.sub(r'\s+', ' ', text)
         
         # Remover caracteres especiais
-        if self.remove_special_var.get():
+        if options["remove_special"]:
             text = re.sub(r'[^\w\s\-.,;:@/\\]', '', text)
         
         return text
+    
+    def clean_column(self, series, options, memo):
+        """Limpa uma coluna; colunas com poucos valores distintos são limpas uma vez por valor único"""
+        return memo.apply(series, lambda texts: [self.clean_value(text, options) for text in texts])
             
     def execute(self):
         """Executa a limpeza"""
@@ -441,6 +457,8 @@ class ColumnCleanerTool(ctk.CTkFrame):
             
             result_df = self.df.copy()
             total_cols = len(selected_cols)
+            options = self.get_clean_options()
+            memo = UniqueValueMemo()
             
             for i, col in enumerate(selected_cols):
                 self.status_label.configure(text=f"Limpando coluna: {col}")
@@ -448,7 +466,7 @@ class ColumnCleanerTool(ctk.CTkFrame):
                 
                 if self.dest_mode_var.get() == "replace":
                     # Sobrescrever
-                    result_df[col] = result_df[col].apply(self.clean_value)
+                    result_df[col] = self.clean_column(result_df[col], options, memo)
                 else:
                     # Nova coluna
                     if len(selected_cols) == 1:
@@ -456,7 +474,7 @@ class ColumnCleanerTool(ctk.CTkFrame):
                     else:
                         new_col_name = f"{col}_LIMPO"
                     
-                    result_df[new_col_name] = result_df[col].apply(self.clean_value)
+                    result_df[new_col_name] = self.clean_column(result_df[col], options, memo)
                 
                 progress = 0.1 + (0.7 * (i + 1) / total_cols)
                 self.progress_bar.set(progress)
@@ -476,11 +494,16 @@ class ColumnCleanerTool(ctk.CTkFrame):
             self.progress_bar.set(1.0)
             self.status_label.configure(text=f"Concluído! {len(result_df)} linhas, {total_cols} colunas limpas")
             
+            memo_info = ""
+            if memo.saved:
+                memo_info = f"Valores únicos: {memo.computed:,} limpezas para {memo.cells:,} células\n"
+            
             messagebox.showinfo(
                 "Sucesso",
                 f"Limpeza concluída!\n\n"
                 f"Linhas: {len(result_df)}\n"
                 f"Colunas limpas: {total_cols}\n"
+                f"{memo_info}"
                 f"Arquivo: {output_file}"
             )
             
@@ -2,11 +2,14 @@
 
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-import pandas as pd
 import os
 from pathlib import Path
 import chardet
-import re
+
+from engine import (
+    open_input, read_csv_file, stream_rewrite, estimate_row_count, CleaningPlan, ChunkCleaner,
+    load_replace_table
+)
 
 
 class CSVCleanerTool(ctk.CTkFrame):
@@ -106,6 +109,19 @@ class CSVCleanerTool(ctk.CTkFrame):
         )
         enc_menu.grid(row=1, column=3, padx=10, pady=10, sticky="w")
         
+        # Processos de limpeza paralela (chunks limpos em paralelo, gravados em ordem)
+        workers_label = ctk.CTkLabel(read_frame, text="Processos:", font=ctk.CTkFont(size=13))
+        workers_label.grid(row=2, column=0, padx=20, pady=10, sticky="w")
+        
+        self.workers_var = ctk.StringVar(value="1")
+        workers_menu = ctk.CTkOptionMenu(
+            read_frame,
+            values=["1", "2", "4", "8", str(os.cpu_count() or 1)],
+            variable=self.workers_var,
+            width=120
+        )
+        workers_menu.grid(row=2, column=1, padx=10, pady=10, sticky="w")
+        
         # === Frame de Opções de Limpeza ===
         clean_frame = ctk.CTkFrame(self.scroll_container)
         clean_frame.pack(fill="x", padx=20, pady=10)
@@ -203,6 +219,21 @@ class CSVCleanerTool(ctk.CTkFrame):
         )
         regex_check.grid(row=1, column=2, padx=20, pady=5, sticky="w")
         
+        # Tabela de substituições (CSV/JSON): todas as regras em uma única varredura
+        table_label = ctk.CTkLabel(custom_frame, text="Tabela de substituição:", font=ctk.CTkFont(size=13))
+        table_label.grid(row=3, column=0, padx=20, pady=5, sticky="w")
+        
+        self.replace_table_entry = ctk.CTkEntry(custom_frame, width=300)
+        self.replace_table_entry.grid(row=3, column=1, padx=10, pady=5, sticky="w")
+        
+        btn_browse_table = ctk.CTkButton(
+            custom_frame,
+            text="Procurar...",
+            command=self.browse_replace_table,
+            width=100
+        )
+        btn_browse_table.grid(row=3, column=2, padx=20, pady=5, sticky="w")
+        
         # === Frame de Saída ===
         output_frame = ctk.CTkFrame(self.scroll_container)
         output_frame.pack(fill="x", padx=20, pady=10)
@@ -273,16 +304,27 @@ class CSVCleanerTool(ctk.CTkFrame):
         file = filedialog.asksaveasfilename(
             title="Salvar como",
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"), ("CSV compactado", "*.csv.gz *.csv.bz2 *.csv.xz"), ("All files", "*.*")]
         )
         
         if file:
             self.output_entry.delete(0, "end")
             self.output_entry.insert(0, file)
             
+    def browse_replace_table(self):
+        """Seleciona a tabela de substituições (localizar;substituir[;regex])"""
+        file = filedialog.askopenfilename(
+            title="Selecionar tabela de substituição",
+            filetypes=[("CSV files", "*.csv"), ("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        
+        if file:
+            self.replace_table_entry.delete(0, "end")
+            self.replace_table_entry.insert(0, file)
+            
     def detect_encoding(self, filepath):
         """Detecta o encoding de um arquivo"""
-        with open(filepath, 'rb') as f:
+        with open_input(filepath) as f:
             raw = f.read(10000)
             result = chardet.detect(raw)
             return result['encoding']
@@ -294,34 +336,33 @@ class CSVCleanerTool(ctk.CTkFrame):
             return "\t"
         return sep
     
-    def clean_text(self, text):
-        """Aplica as limpezas em um texto"""
-        if pd.isna(text):
-            return text
-        
-        text = str(text)
-        
-        # Remover aspas
-        if self.remove_quotes_var.get():
-            text = text.replace('"', '').replace("'", '')
-        
-        # Remover espaços extras
-        if self.remove_spaces_var.get():
-            text = ' '.join(text.split())
-        
-        # Remover quebras de linha
-        if self.remove_linebreaks_var.get():
-            text = text.replace('\n', ' ').replace('\r', '')
-        
-        # Remover caracteres especiais
-        if self.remove_special_var.get():
-            text = re.sub(r'[^\w\s\-.,;:@/\\]', '', text)
-        
-        # Trim
-        if self.trim_columns_var.get():
-            text = text.strip()
-        
-        return text
+    def get_cleaning_plan(self):
+        """Compila as opções marcadas em um plano de limpeza vetorizado (lido uma única vez)"""
+        options = [
+            ('remove_quotes', self.remove_quotes_var),
+            ('remove_spaces', self.remove_spaces_var),
+            ('remove_linebreaks', self.remove_linebreaks_var),
+            ('remove_special', self.remove_special_var),
+            ('trim', self.trim_columns_var)
+        ]
+        replace_table = None
+        if self.replace_table_entry.get():
+            replace_table = load_replace_table(self.replace_table_entry.get(), self.get_separator())
+        return CleaningPlan([step for step, var in options if var.get()], replace_table)
+    
+    def get_chunk_cleaner(self):
+        """Limpeza completa (plano, substituição customizada e linhas vazias) aplicável por chunk"""
+        replace = None
+        if self.custom_replace_var.get() and self.find_entry.get():
+            replace = (self.find_entry.get(), self.replace_entry.get(), self.regex_var.get())
+        return ChunkCleaner(self.get_cleaning_plan(), self.remove_empty_rows_var.get(), replace)
+    
+    def get_workers(self):
+        """Retorna o número de processos de limpeza"""
+        try:
+            return max(1, int(self.workers_var.get()))
+        except ValueError:
+            return 1
         
     def execute(self):
         """Executa a limpeza do CSV"""
@@ -350,64 +391,66 @@ class CSVCleanerTool(ctk.CTkFrame):
             else:
                 encoding = self.enc_var.get()
             
-            # Ler arquivo
-            df = pd.read_csv(
-                input_file,
-                sep=sep,
-                encoding=encoding,
-                low_memory=False,
-                dtype=str  # Manter tudo como string para limpeza
-            )
-            
-            self.status_label.configure(text="Aplicando limpeza...")
-            self.progress_bar.set(0.3)
-            self.update()
+            cleaner = self.get_chunk_cleaner()
+            output_encoding = self.enc_var.get() if self.enc_var.get() != "auto-detect" else "utf-8"
+            workers = self.get_workers()
             
-            # Aplicar limpeza em todas as colunas
-            total_cols = len(df.columns)
-            for i, col in enumerate(df.columns):
-                df[col] = df[col].apply(self.clean_text)
-                progress = 0.3 + (0.5 * (i + 1) / total_cols)
-                self.progress_bar.set(progress)
+            if workers > 1:
+                # Chunks limpos em um pool de processos e gravados em ordem
+                self.status_label.configure(text=f"Limpando em paralelo com {workers} processos...")
                 self.update()
-            
-            # Substituição customizada
-            if self.custom_replace_var.get():
-                find_text = self.find_entry.get()
-                replace_text = self.replace_entry.get()
+                total_rows = max(1, estimate_row_count(input_file))
                 
-                if find_text:
-                    self.status_label.configure(text="Aplicando substituição customizada...")
+                def on_chunk(rows_read):
+                    self.progress_bar.set(0.1 + 0.8 * min(1.0, rows_read / total_rows))
                     self.update()
-                    
-                    if self.regex_var.get():
-                        df = df.replace(find_text, replace_text, regex=True)
-                    else:
-                        df = df.replace(find_text, replace_text)
-            
-            # Remover linhas vazias
-            if self.remove_empty_rows_var.get():
-                df = df.dropna(how='all')
-            
-            self.status_label.configure(text="Salvando arquivo...")
-            self.progress_bar.set(0.9)
-            self.update()
-            
-            # Salvar resultado
-            df.to_csv(
-                output_file,
-                sep=sep,
-                index=False,
-                encoding=self.enc_var.get() if self.enc_var.get() != "auto-detect" else "utf-8"
-            )
+                
+                _, rows = stream_rewrite(
+                    input_file, output_file, cleaner, sep=sep, encoding=encoding,
+                    output_encoding=output_encoding, on_chunk=on_chunk, workers=workers
+                )
+            else:
+                # Ler arquivo
+                df = read_csv_file(
+                    input_file,
+                    sep,
+                    encoding,
+                    dtype=str  # Manter tudo como string para limpeza
+                )
+                
+                self.status_label.configure(text="Aplicando limpeza...")
+                self.progress_bar.set(0.3)
+                self.update()
+                
+                # Aplicar limpeza em todas as colunas (colunas com poucos valores distintos
+                # são limpas uma vez por valor único), substituição customizada e linhas vazias
+                def on_column(done, total_cols):
+                    self.progress_bar.set(0.3 + (0.5 * done / total_cols))
+                    self.update()
+                
+                df = cleaner(df, on_column)
+                
+                self.status_label.configure(text="Salvando arquivo...")
+                self.progress_bar.set(0.9)
+                self.update()
+                
+                # Salvar resultado
+                df.to_csv(output_file, sep=sep, index=False, encoding=output_encoding)
+                rows = len(df)
             
             self.progress_bar.set(1.0)
-            self.status_label.configure(text=f"Concluído! {len(df)} linhas processadas.")
+            self.status_label.configure(text=f"Concluído! {rows} linhas processadas.")
+            
+            memo = cleaner.memo
+            memo_info = ""
+            if memo.saved:
+                memo_info = f"Valores únicos: {memo.computed:,} limpezas para {memo.cells:,} células\n"
             
             messagebox.showinfo(
                 "Sucesso",
                 f"Limpeza concluída!\n\n"
-                f"Linhas processadas: {len(df)}\n"
+                f"Linhas processadas: {rows}\n"
+                f"{memo_info}"
                 f"Arquivo: {output_file}"
             )
             
@@ -431,7 +474,9 @@ class CSVCleanerTool(ctk.CTkFrame):
             "custom_replace": self.custom_replace_var.get(),
             "find_text": self.find_entry.get(),
             "replace_text": self.replace_entry.get(),
-            "use_regex": self.regex_var.get()
+            "use_regex": self.regex_var.get(),
+            "replace_table": self.replace_table_entry.get(),
+            "workers": self.workers_var.get()
         }
         
     def load_settings(self, settings):
@@ -462,6 +507,11 @@ class CSVCleanerTool(ctk.CTkFrame):
             self.replace_entry.insert(0, settings["replace_text"])
         if "use_regex" in settings:
             self.regex_var.set(settings["use_regex"])
+        if "replace_table" in settings:
+            self.replace_table_entry.delete(0, "end")
+            self.replace_table_entry.insert(0, settings["replace_table"])
+        if "workers" in settings:
+            self.workers_var.set(settings["workers"])
             
     def save_current_profile(self):
         """Salva as configurações atuais como perfil"""
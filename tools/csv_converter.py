@@ -9,6 +9,8 @@ import chardet
 import json
 import xml.etree.ElementTree as ET
 
+from engine import open_input, read_csv_file, resolve_input, split_member, strip_compression
+
 
 class CSVConverterTool(ctk.CTkFrame):
     """Ferramenta para converter entre formatos CSV, XLSX, JSON, XML, TXT"""
@@ -284,8 +286,8 @@ class CSVConverterTool(ctk.CTkFrame):
         file = filedialog.askopenfilename(
             title="Selecionar arquivo",
             filetypes=[
-                ("All supported", "*.csv;*.xlsx;*.xls;*.json;*.xml;*.txt"),
-                ("CSV files", "*.csv"),
+                ("All supported", "*.csv;*.xlsx;*.xls;*.json;*.xml;*.txt;*.gz;*.bz2;*.xz;*.zip"),
+                ("CSV files", "*.csv;*.csv.gz;*.csv.bz2;*.csv.xz;*.zip"),
                 ("Excel files", "*.xlsx;*.xls"),
                 ("JSON files", "*.json"),
                 ("XML files", "*.xml"),
@@ -295,11 +297,18 @@ class CSVConverterTool(ctk.CTkFrame):
         )
         
         if file:
+            # .zip com um único arquivo vira "arquivo.zip::membro.csv"
+            try:
+                file = resolve_input(file)
+            except ValueError as e:
+                messagebox.showerror("Erro", str(e))
+                return
+            
             self.input_entry.delete(0, "end")
             self.input_entry.insert(0, file)
             
             # Detectar formato
-            ext = os.path.splitext(file)[1].lower()
+            ext = self.input_extension(file)
             format_map = {
                 '.csv': 'CSV',
                 '.xlsx': 'Excel',
@@ -311,7 +320,7 @@ class CSVConverterTool(ctk.CTkFrame):
             self.input_format_label.configure(text=f"Formato: {format_map.get(ext, 'Desconhecido')}")
             
             # Sugerir nome de saída
-            base = os.path.splitext(file)[0]
+            base = os.path.splitext(strip_compression(split_member(file)[0]))[0]
             self.output_entry.delete(0, "end")
             self.output_entry.insert(0, f"{base}.{self.format_var.get()}")
             
@@ -321,7 +330,7 @@ class CSVConverterTool(ctk.CTkFrame):
         filetypes = [("All files", "*.*")]
         
         if format_type == "csv":
-            filetypes = [("CSV files", "*.csv")]
+            filetypes = [("CSV files", "*.csv"), ("CSV compactado", "*.csv.gz *.csv.bz2 *.csv.xz")]
             default_ext = ".csv"
         elif format_type == "xlsx":
             filetypes = [("Excel files", "*.xlsx")]
@@ -346,9 +355,14 @@ class CSVConverterTool(ctk.CTkFrame):
             self.output_entry.delete(0, "end")
             self.output_entry.insert(0, file)
             
+    def input_extension(self, filepath):
+        """Extensão do formato de entrada, sem a compressão (dados.csv.gz -> .csv)"""
+        archive, member = split_member(filepath)
+        return os.path.splitext(strip_compression(member or archive))[1].lower()
+    
     def detect_encoding(self, filepath):
-        """Detecta o encoding de um arquivo"""
-        with open(filepath, 'rb') as f:
+        """Detecta o encoding de um arquivo (já descompactado)"""
+        with open_input(filepath) as f:
             raw = f.read(10000)
             result = chardet.detect(raw)
             return result['encoding']
@@ -364,7 +378,7 @@ class CSVConverterTool(ctk.CTkFrame):
     
     def read_input_file(self, filepath):
         """Lê o arquivo de entrada em um DataFrame"""
-        ext = os.path.splitext(filepath)[1].lower()
+        ext = self.input_extension(filepath)
         
         # Encoding
         if self.enc_in_var.get() == "auto-detect":
@@ -375,17 +389,21 @@ class CSVConverterTool(ctk.CTkFrame):
         if ext in ['.csv', '.txt']:
             sep = self.get_separator(self.sep_in_var)
             header = 0 if self.has_header_var.get() else None
-            return pd.read_csv(filepath, sep=sep, encoding=encoding, header=header, low_memory=False)
+            return read_csv_file(filepath, sep, encoding, header=header)
         
+        # Demais formatos também lidos descompactados, direto do .gz/.zip
         elif ext in ['.xlsx', '.xls']:
             header = 0 if self.has_header_var.get() else None
-            return pd.read_excel(filepath, header=header)
+            with open_input(filepath) as f:
+                return pd.read_excel(f, header=header)
         
         elif ext == '.json':
-            return pd.read_json(filepath, encoding=encoding)
+            with open_input(filepath) as f:
+                return pd.read_json(f, encoding=encoding)
         
         elif ext == '.xml':
-            return pd.read_xml(filepath, encoding=encoding)
+            with open_input(filepath) as f:
+                return pd.read_xml(f, encoding=encoding)
         
         else:
             raise ValueError(f"Formato não suportado: {ext}")
@@ -5,7 +5,22 @@ from tkinter import filedialog, messagebox
 import pandas as pd
 import os
 from pathlib import Path
-import chardet
+import queue
+import threading
+
+from engine import (
+    stream_merge, iter_csv_files, scan_headers, union_columns, schema_drift,
+    ExternalDeduplicator, incremental_merge, load_manifest, classify_inputs,
+    estimate_row_count, add_source_column, open_output, expand_inputs,
+    input_size, source_path
+)
+
+
+# Linhas desenhadas na lista de arquivos (as demais são virtualizadas)
+VISIBLE_ROWS = 8
+
+# Arquivos aceitos na varredura de pastas (.zip entra como um arquivo por membro CSV)
+INPUT_EXTENSIONS = ('.csv', '.csv.gz', '.csv.bz2', '.csv.xz', '.zip')
 
 
 class CSVMergerTool(ctk.CTkFrame):
@@ -15,6 +30,18 @@ class CSVMergerTool(ctk.CTkFrame):
         super().__init__(parent)
         self.profile_manager = profile_manager
         self.selected_files = []
+        self.selected_set = set()
+        
+        # Estado da lista virtualizada e das tarefas em segundo plano
+        self.list_offset = 0
+        self.file_info = {}
+        self.info_requested = set()
+        self.info_requests = queue.Queue()
+        self.info_results = queue.Queue()
+        self.info_polling = False
+        self.scan_queue = None
+        
+        threading.Thread(target=self._info_worker, daemon=True).start()
         
         self.create_widgets()
         
@@ -97,6 +124,44 @@ class CSVMergerTool(ctk.CTkFrame):
         )
         dedup_check.grid(row=1, column=2, columnspan=2, padx=20, pady=10, sticky="w")
         
+        # Modo streaming (memória limitada)
+        self.streaming_var = ctk.BooleanVar(value=False)
+        streaming_check = ctk.CTkCheckBox(
+            config_frame,
+            text="Modo streaming (baixo uso de memória)",
+            variable=self.streaming_var
+        )
+        streaming_check.grid(row=2, column=0, columnspan=2, padx=20, pady=10, sticky="w")
+        
+        # Processos de leitura paralela
+        workers_label = ctk.CTkLabel(config_frame, text="Processos:", font=ctk.CTkFont(size=14))
+        workers_label.grid(row=2, column=2, padx=20, pady=10, sticky="w")
+        
+        self.workers_var = ctk.StringVar(value="1")
+        workers_menu = ctk.CTkOptionMenu(
+            config_frame,
+            values=["1", "2", "4", "8", str(os.cpu_count() or 1)],
+            variable=self.workers_var,
+            width=150
+        )
+        workers_menu.grid(row=2, column=3, padx=20, pady=10, sticky="w")
+        
+        # Modo incremental (manifesto ao lado da saída)
+        self.incremental_var = ctk.BooleanVar(value=False)
+        incremental_check = ctk.CTkCheckBox(
+            config_frame,
+            text="Incremental (só arquivos novos/alterados)",
+            variable=self.incremental_var
+        )
+        incremental_check.grid(row=3, column=0, columnspan=2, padx=20, pady=10, sticky="w")
+        
+        # Coluna com o arquivo de origem de cada linha (vazio = não adicionar)
+        source_label = ctk.CTkLabel(config_frame, text="Coluna de origem:", font=ctk.CTkFont(size=14))
+        source_label.grid(row=3, column=2, padx=20, pady=10, sticky="w")
+        
+        self.source_col_entry = ctk.CTkEntry(config_frame, width=150, placeholder_text="ex: ARQUIVO")
+        self.source_col_entry.grid(row=3, column=3, padx=20, pady=10, sticky="w")
+        
         # === Frame de Seleção de Arquivos ===
         files_frame = ctk.CTkFrame(self.scroll_container)
         files_frame.pack(fill="both", expand=True, padx=20, pady=10)
@@ -144,10 +209,55 @@ class CSVMergerTool(ctk.CTkFrame):
         )
         btn_clear.pack(side="left", padx=5)
         
-        # Lista de arquivos
-        self.files_list = ctk.CTkScrollableFrame(files_frame, height=200)
+        # Lista de arquivos (virtualizada: só as linhas visíveis existem como widgets)
+        self.files_list = ctk.CTkFrame(files_frame)
         self.files_list.pack(fill="both", expand=True, padx=10, pady=10)
         
+        self.list_scrollbar = ctk.CTkScrollbar(self.files_list, command=self.on_list_scroll)
+        self.list_scrollbar.pack(side="right", fill="y")
+        
+        rows_frame = ctk.CTkFrame(self.files_list, fg_color="transparent")
+        rows_frame.pack(side="left", fill="both", expand=True)
+        
+        self.row_widgets = []
+        for slot in range(VISIBLE_ROWS):
+            file_frame = ctk.CTkFrame(rows_frame)
+            
+            # Nome do arquivo
+            name_label = ctk.CTkLabel(file_frame, text="", anchor="w")
+            name_label.pack(side="left", padx=10, pady=5)
+            
+            # Caminho
+            path_label = ctk.CTkLabel(file_frame, text="", text_color="gray50", anchor="w")
+            path_label.pack(side="left", padx=10, pady=5)
+            
+            # Botão remover
+            btn_remove = ctk.CTkButton(
+                file_frame,
+                text="✖",
+                width=30,
+                height=25,
+                fg_color="red",
+                hover_color="darkred",
+                command=lambda s=slot: self.remove_file(self.list_offset + s)
+            )
+            btn_remove.pack(side="right", padx=10, pady=5)
+            
+            # Tamanho e linhas estimadas (preenchidos em segundo plano)
+            info_label = ctk.CTkLabel(file_frame, text="", text_color="gray50", anchor="e")
+            info_label.pack(side="right", padx=10, pady=5)
+            
+            for widget in (file_frame, name_label, path_label, info_label):
+                widget.bind("<MouseWheel>", self.on_list_wheel)
+                widget.bind("<Button-4>", self.on_list_wheel)
+                widget.bind("<Button-5>", self.on_list_wheel)
+            
+            self.row_widgets.append((file_frame, name_label, path_label, info_label))
+        
+        rows_frame.bind("<MouseWheel>", self.on_list_wheel)
+        rows_frame.bind("<Button-4>", self.on_list_wheel)
+        rows_frame.bind("<Button-5>", self.on_list_wheel)
+        
         self.files_count_label = ctk.CTkLabel(
             files_frame,
             text="0 arquivos selecionados",
@@ -208,78 +318,199 @@ class CSVMergerTool(ctk.CTkFrame):
         """Adiciona arquivos CSV à lista"""
         files = filedialog.askopenfilenames(
             title="Selecionar arquivos CSV",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[
+                ("CSV files", "*.csv *.csv.gz *.csv.bz2 *.csv.xz *.zip"),
+                ("All files", "*.*")
+            ]
         )
         
-        for f in files:
-            if f not in self.selected_files:
-                self.selected_files.append(f)
-        
+        self.add_paths(expand_inputs(files))
         self.update_files_list()
         
+    def add_paths(self, paths):
+        """Acrescenta caminhos à seleção, ignorando repetidos"""
+        for f in paths:
+            if f not in self.selected_set:
+                self.selected_set.add(f)
+                self.selected_files.append(f)
+        
     def add_folder(self):
-        """Adiciona todos os CSVs de uma pasta"""
+        """Adiciona todos os CSVs de uma pasta (e subpastas) em segundo plano"""
         folder = filedialog.askdirectory(title="Selecionar pasta")
         
-        if folder:
-            for f in Path(folder).glob("*.csv"):
-                if str(f) not in self.selected_files:
-                    self.selected_files.append(str(f))
+        if not folder:
+            return
+        
+        self.scan_queue = queue.Queue()
+        threading.Thread(target=self._scan_folder, args=(folder, self.scan_queue), daemon=True).start()
+        
+        self.status_label.configure(text="Procurando arquivos CSV...")
+        self.after(100, self._poll_scan, self.scan_queue)
+        
+    def _scan_folder(self, folder, out_queue):
+        """Percorre a pasta recursivamente (thread) e envia os caminhos em lotes"""
+        batch = []
+        for f in Path(folder).rglob("*"):
+            if not f.name.lower().endswith(INPUT_EXTENSIONS) or not f.is_file():
+                continue
+            try:
+                batch.extend(expand_inputs([str(f)]))
+            except Exception:
+                # .zip corrompido: ignora e segue a varredura
+                continue
+            if len(batch) >= 500:
+                out_queue.put(batch)
+                batch = []
+        out_queue.put(batch)
+        out_queue.put(None)
+        
+    def _poll_scan(self, scan_queue):
+        """Recebe os lotes da varredura na thread da interface"""
+        if scan_queue is not self.scan_queue:
+            return
+        
+        done = False
+        while True:
+            try:
+                batch = scan_queue.get_nowait()
+            except queue.Empty:
+                break
+            if batch is None:
+                done = True
+                break
+            self.add_paths(batch)
         
         self.update_files_list()
         
+        if not done:
+            self.status_label.configure(text=f"Procurando arquivos CSV... {len(self.selected_files)} encontrados")
+            self.after(100, self._poll_scan, scan_queue)
+            return
+        
+        self.scan_queue = None
+        self.status_label.configure(text="Pronto para processar")
+        
+        # No modo incremental, indicar quanto já foi consolidado
+        output_file = self.output_entry.get()
+        if self.incremental_var.get() and output_file:
+            manifest = load_manifest(output_file)
+            if manifest:
+                statuses = classify_inputs(self.selected_files, manifest)
+                pending = sum(1 for _, status, _ in statuses if status != "unchanged")
+                self.status_label.configure(
+                    text=f"{pending} arquivos novos/alterados, "
+                         f"{len(statuses) - pending} já consolidados"
+                )
+        
     def clear_files(self):
         """Limpa a lista de arquivos"""
+        self.scan_queue = None
         self.selected_files = []
+        self.selected_set = set()
+        self.list_offset = 0
         self.update_files_list()
         
     def update_files_list(self):
-        """Atualiza a exibição da lista de arquivos"""
-        # Limpar lista atual
-        for widget in self.files_list.winfo_children():
-            widget.destroy()
-        
-        # Adicionar arquivos
-        for i, f in enumerate(self.selected_files):
-            file_frame = ctk.CTkFrame(self.files_list)
-            file_frame.pack(fill="x", pady=2)
+        """Atualiza a exibição da lista de arquivos (apenas as linhas visíveis)"""
+        total = len(self.selected_files)
+        self.list_offset = max(0, min(self.list_offset, total - VISIBLE_ROWS))
+        
+        for slot, (file_frame, name_label, path_label, info_label) in enumerate(self.row_widgets):
+            index = self.list_offset + slot
+            if index >= total:
+                file_frame.pack_forget()
+                continue
             
-            # Nome do arquivo
-            name_label = ctk.CTkLabel(
-                file_frame,
-                text=os.path.basename(f),
-                anchor="w"
-            )
-            name_label.pack(side="left", padx=10, pady=5)
-            
-            # Caminho
-            path_label = ctk.CTkLabel(
-                file_frame,
-                text=os.path.dirname(f),
-                text_color="gray50",
-                anchor="w"
-            )
-            path_label.pack(side="left", padx=10, pady=5)
+            f = self.selected_files[index]
+            name_label.configure(text=os.path.basename(f))
+            path_label.configure(text=os.path.dirname(f))
+            info_label.configure(text=self.format_file_info(f))
+            file_frame.pack(fill="x", pady=2)
             
-            # Botão remover
-            btn_remove = ctk.CTkButton(
-                file_frame,
-                text="✖",
-                width=30,
-                height=25,
-                fg_color="red",
-                hover_color="darkred",
-                command=lambda idx=i: self.remove_file(idx)
-            )
-            btn_remove.pack(side="right", padx=10, pady=5)
+            self.request_file_info(f)
+        
+        # Barra de rolagem proporcional à parte visível
+        if total > VISIBLE_ROWS:
+            self.list_scrollbar.set(self.list_offset / total, (self.list_offset + VISIBLE_ROWS) / total)
+        else:
+            self.list_scrollbar.set(0, 1)
         
         # Atualizar contador
-        self.files_count_label.configure(text=f"{len(self.selected_files)} arquivos selecionados")
+        self.files_count_label.configure(text=f"{total} arquivos selecionados")
+        
+    def on_list_scroll(self, *args):
+        """Rolagem da lista pela barra"""
+        total = len(self.selected_files)
+        if args[0] == "moveto":
+            self.list_offset = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = int(args[1]) * (VISIBLE_ROWS if args[2] == "pages" else 1)
+            self.list_offset += step
+        self.update_files_list()
+        
+    def on_list_wheel(self, event):
+        """Rolagem da lista pela roda do mouse"""
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.list_offset -= 3
+        else:
+            self.list_offset += 3
+        self.update_files_list()
+        
+    def format_file_info(self, filepath):
+        """Texto de tamanho e linhas estimadas de um arquivo"""
+        info = self.file_info.get(filepath)
+        if info is None:
+            return "..."
+        size, rows = info
+        if size is None:
+            return "indisponível"
+        return f"{size / (1024 * 1024):,.1f} MB · ~{rows:,} linhas"
+        
+    def request_file_info(self, filepath):
+        """Agenda o cálculo de tamanho e linhas de um arquivo visível"""
+        if filepath in self.file_info or filepath in self.info_requested:
+            return
+        if not self.info_polling:
+            self.info_polling = True
+            self.after(200, self._poll_info)
+        self.info_requested.add(filepath)
+        self.info_requests.put(filepath)
+        
+    def _info_worker(self):
+        """Calcula tamanho e linhas estimadas em segundo plano (thread)"""
+        while True:
+            filepath = self.info_requests.get()
+            try:
+                size = input_size(filepath) or os.path.getsize(source_path(filepath))
+                info = (size, estimate_row_count(filepath))
+            except Exception:
+                # gzip truncado (EOFError), zlib.error, zip inválido...: a thread não pode morrer
+                info = (None, None)
+            self.info_results.put((filepath, info))
+        
+    def _poll_info(self):
+        """Aplica os resultados do cálculo em segundo plano na interface"""
+        changed = False
+        while True:
+            try:
+                filepath, info = self.info_results.get_nowait()
+            except queue.Empty:
+                break
+            self.file_info[filepath] = info
+            self.info_requested.discard(filepath)
+            changed = True
+        
+        if changed:
+            self.update_files_list()
+        if self.info_requested:
+            self.after(200, self._poll_info)
+        else:
+            self.info_polling = False
         
     def remove_file(self, index):
         """Remove um arquivo da lista"""
         if 0 <= index < len(self.selected_files):
-            self.selected_files.pop(index)
+            self.selected_set.discard(self.selected_files.pop(index))
             self.update_files_list()
             
     def browse_output(self):
@@ -287,20 +518,13 @@ class CSVMergerTool(ctk.CTkFrame):
         file = filedialog.asksaveasfilename(
             title="Salvar como",
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"), ("CSV compactado", "*.csv.gz *.csv.bz2 *.csv.xz"), ("All files", "*.*")]
         )
         
         if file:
             self.output_entry.delete(0, "end")
             self.output_entry.insert(0, file)
             
-    def detect_encoding(self, filepath):
-        """Detecta o encoding de um arquivo"""
-        with open(filepath, 'rb') as f:
-            raw = f.read(10000)
-            result = chardet.detect(raw)
-            return result['encoding']
-            
     def get_separator(self):
         """Retorna o separador selecionado"""
         sep = self.sep_var.get()
@@ -308,6 +532,13 @@ class CSVMergerTool(ctk.CTkFrame):
             return "\t"
         return sep
         
+    def get_workers(self):
+        """Retorna o número de processos de leitura"""
+        try:
+            return max(1, int(self.workers_var.get()))
+        except ValueError:
+            return 1
+        
     def execute(self):
         """Executa a consolidação dos CSVs"""
         if not self.selected_files:
@@ -319,30 +550,42 @@ class CSVMergerTool(ctk.CTkFrame):
             messagebox.showwarning("Aviso", "Selecione um arquivo de saída!")
             return
         
+        # O manifesto incremental não guarda as linhas já vistas: não há como deduplicar entre execuções
+        if self.incremental_var.get() and self.dedup_var.get():
+            messagebox.showwarning(
+                "Aviso",
+                "O modo incremental não pode ser usado com \"Remover linhas duplicadas\".\n"
+                "Desmarque uma das opções."
+            )
+            return
+        
         try:
             self.btn_execute.configure(state="disabled")
             self.status_label.configure(text="Processando...")
             self.progress_bar.set(0)
             self.update()
             
-            dfs = []
             total = len(self.selected_files)
             sep = self.get_separator()
             
-            for i, filepath in enumerate(self.selected_files):
-                # Encoding
-                if self.enc_var.get() == "auto-detect":
-                    encoding = self.detect_encoding(filepath)
-                else:
-                    encoding = self.enc_var.get()
-                
-                # Ler arquivo
-                df = pd.read_csv(
-                    filepath,
-                    sep=sep,
-                    encoding=encoding,
-                    low_memory=False
-                )
+            if self.incremental_var.get():
+                self.execute_incremental(output_file, sep)
+                return
+            
+            if self.streaming_var.get():
+                self.execute_streaming(output_file, sep)
+                return
+            
+            dfs = []
+            source_column = self.source_col_entry.get().strip()
+            sources = list(dict.fromkeys(self.selected_files))
+            
+            # Ler arquivos (em paralelo se houver mais de um processo)
+            for i, filepath, df in iter_csv_files(
+                self.selected_files, sep, self.enc_var.get(), workers=self.get_workers()
+            ):
+                if source_column:
+                    df = add_source_column(df, source_column, filepath, sources)
                 dfs.append(df)
                 
                 # Atualizar progresso
@@ -356,22 +599,24 @@ class CSVMergerTool(ctk.CTkFrame):
             self.update()
             
             result = pd.concat(dfs, ignore_index=True)
+            if source_column:
+                # Com colunas divergentes o concat intercala as novas: origem sempre por último
+                result = result[[col for col in result.columns if col != source_column] + [source_column]]
             
             # Remover duplicatas se solicitado
             if self.dedup_var.get():
-                result = result.drop_duplicates()
+                subset = [col for col in result.columns if col != source_column]
+                result = result.drop_duplicates(subset=subset)
             
             # Salvar resultado
             self.status_label.configure(text="Salvando arquivo...")
             self.progress_bar.set(0.9)
             self.update()
             
-            result.to_csv(
-                output_file,
-                sep=sep,
-                index=False,
-                encoding=self.enc_var.get() if self.enc_var.get() != "auto-detect" else "utf-8"
-            )
+            # .gz/.bz2/.xz na extensão: saída compactada (gzip em blocos paralelos)
+            output_encoding = self.enc_var.get() if self.enc_var.get() != "auto-detect" else "utf-8"
+            with open_output(output_file, 'w', output_encoding, workers=self.get_workers()) as out:
+                result.to_csv(out, sep=sep, index=False)
             
             self.progress_bar.set(1.0)
             self.status_label.configure(text=f"Concluído! {len(result)} linhas salvas.")
@@ -390,13 +635,99 @@ class CSVMergerTool(ctk.CTkFrame):
         finally:
             self.btn_execute.configure(state="normal")
             
+    def execute_streaming(self, output_file, sep):
+        """Consolida os CSVs chunk a chunk, sem carregar tudo em memória"""
+        total = len(self.selected_files)
+        
+        def on_file(i, filepath):
+            self.progress_bar.set(i / total)
+            self.status_label.configure(text=f"Consolidando arquivo {i+1}/{total}...")
+            self.update()
+        
+        # Pré-leitura dos cabeçalhos para alinhar colunas divergentes
+        self.status_label.configure(text="Lendo cabeçalhos...")
+        self.update()
+        schemas = scan_headers(self.selected_files, sep, self.enc_var.get())
+        drift = schema_drift(self.selected_files, schemas, union_columns(schemas))
+        
+        with ExternalDeduplicator() as dedup:
+            rows = stream_merge(
+                self.selected_files,
+                output_file,
+                sep=sep,
+                encoding=self.enc_var.get(),
+                output_encoding=self.enc_var.get() if self.enc_var.get() != "auto-detect" else "utf-8",
+                workers=self.get_workers(),
+                schemas=schemas,
+                dedup=dedup if self.dedup_var.get() else None,
+                source_column=self.source_col_entry.get().strip() or None,
+                on_file=on_file,
+                compress_workers=self.get_workers()
+            )
+        
+        self.progress_bar.set(1.0)
+        self.status_label.configure(text=f"Concluído! {rows} linhas salvas.")
+        
+        messagebox.showinfo(
+            "Sucesso",
+            f"Consolidação concluída!\n\n"
+            f"Arquivos processados: {total}\n"
+            f"Total de linhas: {rows}\n"
+            f"Duplicatas removidas: {dedup.dropped}\n"
+            f"Arquivos com colunas divergentes: {len(drift)}\n"
+            f"Arquivo: {output_file}"
+        )
+            
+    def execute_incremental(self, output_file, sep):
+        """Acrescenta à saída só os arquivos novos ou alterados desde a última execução"""
+        total = len(self.selected_files)
+        
+        def on_file(i, filepath):
+            self.progress_bar.set(i / total)
+            self.status_label.configure(text=f"Consolidando {os.path.basename(filepath)}...")
+            self.update()
+        
+        summary = incremental_merge(
+            self.selected_files,
+            output_file,
+            sep=sep,
+            encoding=self.enc_var.get(),
+            output_encoding=self.enc_var.get() if self.enc_var.get() != "auto-detect" else "utf-8",
+            source_column=self.source_col_entry.get().strip() or None,
+            on_file=on_file,
+            compress_workers=self.get_workers()
+        )
+        
+        self.progress_bar.set(1.0)
+        self.status_label.configure(text=f"Concluído! {summary['rows']} linhas acrescentadas.")
+        
+        if summary["mode"] == "rebuild":
+            detail = "Saída reconstruída (sem manifesto válido ou entradas alteradas)"
+        else:
+            detail = (
+                f"Novos: {summary['new']} | Com novas linhas: {summary['grown']} | "
+                f"Sem alteração: {summary['unchanged']}"
+            )
+        
+        messagebox.showinfo(
+            "Sucesso",
+            f"Consolidação incremental concluída!\n\n"
+            f"{detail}\n"
+            f"Linhas gravadas: {summary['rows']}\n"
+            f"Arquivo: {output_file}"
+        )
+            
     def get_settings(self):
         """Retorna as configurações atuais"""
         return {
             "separator": self.sep_var.get(),
             "encoding": self.enc_var.get(),
             "include_header": self.header_var.get(),
-            "remove_duplicates": self.dedup_var.get()
+            "remove_duplicates": self.dedup_var.get(),
+            "streaming": self.streaming_var.get(),
+            "workers": self.workers_var.get(),
+            "incremental": self.incremental_var.get(),
+            "source_column": self.source_col_entry.get()
         }
         
     def load_settings(self, settings):
@@ -409,6 +740,15 @@ class CSVMergerTool(ctk.CTkFrame):
             self.header_var.set(settings["include_header"])
         if "remove_duplicates" in settings:
             self.dedup_var.set(settings["remove_duplicates"])
+        if "streaming" in settings:
+            self.streaming_var.set(settings["streaming"])
+        if "workers" in settings:
+            self.workers_var.set(settings["workers"])
+        if "incremental" in settings:
+            self.incremental_var.set(settings["incremental"])
+        if "source_column" in settings:
+            self.source_col_entry.delete(0, "end")
+            self.source_col_entry.insert(0, settings["source_column"])
             
     def save_current_profile(self):
         """Salva as configurações atuais como perfil"""
@@ -2,10 +2,17 @@
 
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-import pandas as pd
 import os
 from pathlib import Path
 import chardet
+import csv
+import queue
+import threading
+
+from engine import (
+    split_rows, split_bytes, split_by_column, estimate_row_count, count_rows, DataFormatConverter,
+    compressed_path, open_input, resolve_input, source_path, split_member, strip_compression, input_size
+)
 
 
 class CSVSplitterTool(ctk.CTkFrame):
@@ -16,6 +23,10 @@ class CSVSplitterTool(ctk.CTkFrame):
         self.profile_manager = profile_manager
         self.input_file = None
         
+        # Contagem de linhas em segundo plano
+        self.count_results = queue.Queue()
+        self.count_token = 0
+        
         self.create_widgets()
         
     def create_widgets(self):
@@ -149,6 +160,49 @@ class CSVSplitterTool(ctk.CTkFrame):
             )
             btn.pack(side="left", padx=2)
         
+        # Tamanho máximo por arquivo (divide por bytes em vez de linhas)
+        max_size_label = ctk.CTkLabel(split_frame, text="Ou tamanho máx. (MB):", font=ctk.CTkFont(size=13))
+        max_size_label.grid(row=2, column=0, padx=20, pady=10, sticky="w")
+        
+        self.max_size_entry = ctk.CTkEntry(split_frame, width=150, placeholder_text="vazio = por registros")
+        self.max_size_entry.grid(row=2, column=1, padx=10, pady=10, sticky="w")
+        
+        max_size_hint = ctk.CTkLabel(
+            split_frame,
+            text="Cópia direta dos bytes: mantém charset, separador e formato de origem",
+            text_color="gray50",
+            font=ctk.CTkFont(size=11)
+        )
+        max_size_hint.grid(row=2, column=2, columnspan=2, padx=(30, 5), pady=10, sticky="w")
+        
+        # Processos de gravação paralela das partes
+        workers_label = ctk.CTkLabel(split_frame, text="Processos de gravação:", font=ctk.CTkFont(size=13))
+        workers_label.grid(row=3, column=0, padx=20, pady=10, sticky="w")
+        
+        self.workers_var = ctk.StringVar(value="1")
+        workers_menu = ctk.CTkOptionMenu(
+            split_frame,
+            values=["1", "2", "4", "8", str(os.cpu_count() or 1)],
+            variable=self.workers_var,
+            width=150
+        )
+        workers_menu.grid(row=3, column=1, padx=10, pady=10, sticky="w")
+        
+        # Divisão por valor de coluna (um arquivo por valor distinto)
+        by_column_label = ctk.CTkLabel(split_frame, text="Ou dividir pela coluna:", font=ctk.CTkFont(size=13))
+        by_column_label.grid(row=4, column=0, padx=20, pady=10, sticky="w")
+        
+        self.by_column_entry = ctk.CTkEntry(split_frame, width=150, placeholder_text="vazio = por registros")
+        self.by_column_entry.grid(row=4, column=1, padx=10, pady=10, sticky="w")
+        
+        by_column_hint = ctk.CTkLabel(
+            split_frame,
+            text="Resultado: prefixo_VALOR.csv para cada valor distinto",
+            text_color="gray50",
+            font=ctk.CTkFont(size=11)
+        )
+        by_column_hint.grid(row=4, column=2, columnspan=2, padx=(30, 5), pady=10, sticky="w")
+        
         # === Frame de Configurações de Destino ===
         dest_frame = ctk.CTkFrame(self.scroll_container)
         dest_frame.pack(fill="x", padx=20, pady=10)
@@ -186,6 +240,19 @@ class CSVSplitterTool(ctk.CTkFrame):
         )
         dest_sep_menu.grid(row=1, column=3, padx=10, pady=10, sticky="w")
         
+        # Compressão das partes
+        compress_label = ctk.CTkLabel(dest_frame, text="Compressão:", font=ctk.CTkFont(size=13))
+        compress_label.grid(row=2, column=0, padx=20, pady=10, sticky="w")
+        
+        self.compress_var = ctk.StringVar(value="Nenhuma")
+        compress_menu = ctk.CTkOptionMenu(
+            dest_frame,
+            values=["Nenhuma", "gzip", "bz2", "xz"],
+            variable=self.compress_var,
+            width=140
+        )
+        compress_menu.grid(row=2, column=1, padx=10, pady=10, sticky="w")
+        
         # === Frame de Formato de Dados ===
         format_frame = ctk.CTkFrame(self.scroll_container)
         format_frame.pack(fill="x", padx=20, pady=10)
@@ -268,7 +335,7 @@ class CSVSplitterTool(ctk.CTkFrame):
         
         prefix_hint = ctk.CTkLabel(
             output_frame,
-            text="Resultado: prefixo_1.csv, prefixo_2.csv, ...",
+            text="Resultado: prefixo_1.csv, prefixo_2.csv, ... (.gz/.bz2/.xz se compactado)",
             text_color="gray50",
             font=ctk.CTkFont(size=11)
         )
@@ -335,10 +402,20 @@ class CSVSplitterTool(ctk.CTkFrame):
         """Seleciona o arquivo de entrada"""
         file = filedialog.askopenfilename(
             title="Selecionar arquivo CSV",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[
+                ("CSV files", "*.csv *.csv.gz *.csv.bz2 *.csv.xz *.zip"),
+                ("All files", "*.*")
+            ]
         )
         
         if file:
+            # .zip com um único CSV vira "arquivo.zip::membro.csv"
+            try:
+                file = resolve_input(file)
+            except ValueError as e:
+                messagebox.showerror("Erro", str(e))
+                return
+            
             self.input_entry.delete(0, "end")
             self.input_entry.insert(0, file)
             
@@ -346,8 +423,8 @@ class CSVSplitterTool(ctk.CTkFrame):
             self.detect_file_config(file)
             
             # Sugerir pasta e prefixo
-            file_dir = os.path.dirname(file)
-            file_name = os.path.splitext(os.path.basename(file))[0]
+            file_dir = os.path.dirname(source_path(file))
+            file_name = Path(strip_compression(split_member(file)[1] or file)).stem
             
             self.output_entry.delete(0, "end")
             self.output_entry.insert(0, file_dir)
@@ -360,7 +437,7 @@ class CSVSplitterTool(ctk.CTkFrame):
         try:
             # Detectar charset
             if self.charset_var.get() == "auto":
-                with open(filepath, 'rb') as f:
+                with open_input(filepath) as f:
                     result = chardet.detect(f.read(100000))
                     detected_charset = result['encoding']
                     self.charset_var.set(detected_charset or "utf-8")
@@ -368,8 +445,8 @@ class CSVSplitterTool(ctk.CTkFrame):
             # Detectar separador
             if self.sep_var.get() == "auto":
                 encoding = self.charset_var.get()
-                with open(filepath, 'r', encoding=encoding) as f:
-                    first_line = f.readline()
+                with open_input(filepath) as f:
+                    first_line = f.readline().decode(encoding, errors='replace')
                 
                 separators = [',', ';', '\t', '|']
                 detected_sep = max(separators, key=first_line.count)
@@ -379,15 +456,41 @@ class CSVSplitterTool(ctk.CTkFrame):
                 else:
                     self.sep_var.set(detected_sep)
             
-            # Contar linhas
-            with open(filepath, 'r', encoding=self.charset_var.get()) as f:
-                line_count = sum(1 for _ in f) - 1  # -1 para cabeçalho
-            
-            self.file_info_label.configure(text=f"~{line_count:,} linhas")
+            # Estimativa imediata; contagem exata em segundo plano
+            estimated = estimate_row_count(filepath)
+            self.file_info_label.configure(text=f"~{estimated:,} linhas (estimativa)")
+            self.start_row_count(filepath)
             
         except Exception as e:
             self.log_text.insert("end", f"Erro na detecção: {str(e)}\n")
             
+    def start_row_count(self, filepath):
+        """Conta as linhas exatas em uma thread e atualiza o rótulo ao terminar"""
+        self.count_token += 1
+        token = self.count_token
+        
+        def worker():
+            try:
+                result = count_rows(filepath)
+            except Exception:
+                # Qualquer falha (zip corrompido, gzip truncado...) precisa liberar o polling
+                result = None
+            self.count_results.put((token, result))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.after(200, self._poll_row_count)
+        
+    def _poll_row_count(self):
+        """Aplica o resultado da contagem, se ainda for do arquivo selecionado"""
+        try:
+            token, result = self.count_results.get_nowait()
+        except queue.Empty:
+            self.after(200, self._poll_row_count)
+            return
+        
+        if token == self.count_token and result is not None:
+            self.file_info_label.configure(text=f"{result:,} linhas")
+            
     def browse_output(self):
         """Seleciona a pasta de saída"""
         folder = filedialog.askdirectory(title="Selecionar pasta de saída")
@@ -405,35 +508,32 @@ class CSVSplitterTool(ctk.CTkFrame):
             return ";"
         return sep
     
-    def convert_data_format(self, df, target_format):
-        """Converte dados para o formato alvo"""
+    def get_part_extension(self):
+        """Extensão das partes conforme a compressão escolhida"""
+        compress = self.compress_var.get()
+        return compressed_path(".csv", None if compress == "Nenhuma" else compress)
+    
+    def get_workers(self):
+        """Retorna o número de processos de gravação"""
+        try:
+            return max(1, int(self.workers_var.get()))
+        except ValueError:
+            return 1
+    
+    def convert_data_format(self, df, target_format, converter=None):
+        """
+        Converte dados para o formato alvo.
+        
+        O tipo de cada coluna (data com formato concreto, número com seu
+        separador decimal ou texto) é inferido uma vez e guardado no
+        conversor; passe o mesmo conversor para todos os chunks do arquivo.
+        """
         if target_format == "Manter Original":
             return df
         
-        for col in df.columns:
-            try:
-                # Tentar converter datas
-                if any(x in col.lower() for x in ['date', 'data', 'dt_', 'dat']):
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-                    
-                    if target_format == "BR":
-                        df[col] = df[col].dt.strftime('%d/%m/%Y')
-                    elif target_format == "EUA":
-                        df[col] = df[col].dt.strftime('%m/%d/%Y')
-                    elif target_format == "EU":
-                        df[col] = df[col].dt.strftime('%Y-%m-%d')
-                    elif target_format == "UK":
-                        df[col] = df[col].dt.strftime('%d-%m-%Y')
-                else:
-                    # Conversão de decimais
-                    if target_format in ["BR", "EU"]:
-                        df[col] = df[col].astype(str).str.replace(".", ",", regex=False)
-                    elif target_format in ["EUA", "UK"]:
-                        df[col] = df[col].astype(str).str.replace(",", ".", regex=False)
-            except Exception:
-                pass
-        
-        return df
+        if converter is None:
+            converter = DataFormatConverter(target_format)
+        return converter.convert(df)
             
     def execute(self):
         """Executa a divisão do CSV"""
@@ -458,6 +558,14 @@ class CSVSplitterTool(ctk.CTkFrame):
             messagebox.showerror("Erro", "Número máximo de registros inválido!")
             return
         
+        max_bytes = None
+        if self.max_size_entry.get().strip():
+            try:
+                max_bytes = int(float(self.max_size_entry.get().replace(",", ".")) * 1024 * 1024)
+            except ValueError:
+                messagebox.showerror("Erro", "Tamanho máximo por arquivo inválido!")
+                return
+        
         try:
             self.btn_execute.configure(state="disabled")
             self.log_text.delete("1.0", "end")
@@ -474,57 +582,72 @@ class CSVSplitterTool(ctk.CTkFrame):
             self.log_text.insert("end", f"Lendo arquivo com charset={charset}, sep='{sep}'\n")
             self.update()
             
-            df = pd.read_csv(input_file, sep=sep, encoding=charset, dtype=str, low_memory=False)
+            by_column = self.by_column_entry.get().strip()
+            if by_column:
+                self.execute_by_column(input_file, output_dir, prefix, by_column, sep, charset)
+                return
+            
+            if max_bytes:
+                self.execute_by_size(input_file, output_dir, prefix, max_bytes)
+                return
             
-            total_rows = len(df)
-            self.log_text.insert("end", f"Total de linhas: {total_rows:,}\n")
+            # Estimativa para a barra de progresso (o arquivo é lido em streaming)
+            estimated_rows = estimate_row_count(input_file)
+            estimated_chunks = max(1, -(-estimated_rows // max_rows))
+            self.log_text.insert("end", f"Total de linhas: ~{estimated_rows:,} (estimativa)\n")
             
-            # Aplicar formato de dados
+            # Aplicar formato de dados em cada chunk
             format_option = self.format_var.get()
+            transform = None
             if format_option != "Manter Original":
                 self.log_text.insert("end", f"Convertendo formato para: {format_option}\n")
-                df = self.convert_data_format(df, format_option)
+                converter = DataFormatConverter(format_option)
+                transform = lambda chunk: self.convert_data_format(chunk, format_option, converter)
             
-            # Calcular número de arquivos
-            total_chunks = (total_rows // max_rows) + (1 if total_rows % max_rows != 0 else 0)
-            self.log_text.insert("end", f"Arquivos a gerar: {total_chunks}\n\n")
+            self.log_text.insert("end", f"Arquivos a gerar: ~{estimated_chunks}\n")
+            if self.get_workers() > 1:
+                self.log_text.insert("end", f"Gravando partes em paralelo com {self.get_workers()} processos\n")
+            self.log_text.insert("end", "\n")
             
             # Configurações de saída
+            ext = self.get_part_extension()
             dest_sep = self.get_separator(self.dest_sep_var)
             dest_charset = self.dest_charset_var.get()
-            quoting = 1 if self.quote_all_var.get() else 0  # csv.QUOTE_ALL ou csv.QUOTE_MINIMAL
+            quoting = csv.QUOTE_ALL if self.quote_all_var.get() else csv.QUOTE_MINIMAL
             
-            # Dividir e salvar
-            file_count = 1
-            for i in range(0, total_rows, max_rows):
-                chunk = df.iloc[i:i + max_rows]
-                
-                output_file = os.path.join(output_dir, f"{prefix}_{file_count}.csv")
-                
-                chunk.to_csv(
-                    output_file,
-                    sep=dest_sep,
-                    encoding=dest_charset,
-                    index=False,
-                    header=self.keep_header_var.get(),
-                    quoting=quoting
-                )
-                
-                self.log_text.insert("end", f"✓ Salvo: {os.path.basename(output_file)} ({len(chunk):,} linhas)\n")
+            def on_part(file_count, output_file, rows):
+                self.log_text.insert("end", f"✓ Salvo: {os.path.basename(output_file)} ({rows:,} linhas)\n")
                 self.log_text.see("end")
                 
-                progress = file_count / total_chunks
+                progress = min(file_count / estimated_chunks, 0.99)
                 self.progress_bar.set(progress)
-                self.status_label.configure(text=f"Processando arquivo {file_count}/{total_chunks}...")
+                self.status_label.configure(text=f"Processando arquivo {file_count}/~{estimated_chunks}...")
                 self.update()
-                
-                file_count += 1
+            
+            # Dividir e salvar
+            parts = split_rows(
+                input_file,
+                max_rows,
+                lambda n: os.path.join(output_dir, f"{prefix}_{n}{ext}"),
+                sep=sep,
+                encoding=charset,
+                output_sep=dest_sep,
+                output_encoding=dest_charset,
+                header=self.keep_header_var.get(),
+                quoting=quoting,
+                transform=transform,
+                on_part=on_part,
+                workers=self.get_workers(),
+                compress_workers=self.get_workers()
+            )
+            total_chunks = len(parts)
+            total_rows = sum(rows for _, rows in parts)
             
             self.progress_bar.set(1.0)
             self.status_label.configure(text=f"Concluído! {total_chunks} arquivos gerados.")
             
             self.log_text.insert("end", f"\n✅ Divisão concluída!\n")
-            self.log_text.insert("end", f"Total: {total_chunks} arquivos em {output_dir}\n")
+            self.log_text.insert("end", f"Total: {total_chunks} arquivos, {total_rows:,} linhas em {output_dir}\n")
             
             messagebox.showinfo(
                 "Sucesso",
@@ -541,14 +664,114 @@ class CSVSplitterTool(ctk.CTkFrame):
         finally:
             self.btn_execute.configure(state="normal")
             
+    def execute_by_column(self, input_file, output_dir, prefix, column, sep, charset):
+        """Gera um arquivo por valor distinto da coluna, lendo a entrada uma única vez"""
+        estimated_rows = max(estimate_row_count(input_file), 1)
+        
+        self.log_text.insert("end", f"Dividindo pela coluna '{column}': um arquivo por valor\n")
+        self.log_text.insert("end", f"Total de linhas: ~{estimated_rows:,} (estimativa)\n\n")
+        self.update()
+        
+        format_option = self.format_var.get()
+        transform = None
+        if format_option != "Manter Original":
+            converter = DataFormatConverter(format_option)
+            transform = lambda chunk: self.convert_data_format(chunk, format_option, converter)
+        
+        def on_chunk(rows_read):
+            self.progress_bar.set(min(rows_read / estimated_rows, 0.99))
+            self.status_label.configure(text=f"Processando linha {rows_read:,}/~{estimated_rows:,}...")
+            self.update()
+        
+        def on_part(file_count, output_file, rows):
+            self.log_text.insert("end", f"✓ Salvo: {os.path.basename(output_file)} ({rows:,} linhas)\n")
+        
+        parts = split_by_column(
+            input_file,
+            column,
+            lambda name: os.path.join(output_dir, f"{prefix}_{name}{self.get_part_extension()}"),
+            sep=sep,
+            encoding=charset,
+            output_sep=self.get_separator(self.dest_sep_var),
+            output_encoding=self.dest_charset_var.get(),
+            header=self.keep_header_var.get(),
+            quoting=csv.QUOTE_ALL if self.quote_all_var.get() else csv.QUOTE_MINIMAL,
+            transform=transform,
+            on_chunk=on_chunk,
+            on_part=on_part
+        )
+        total_chunks = len(parts)
+        total_rows = sum(rows for _, rows in parts)
+        
+        self.log_text.see("end")
+        self.progress_bar.set(1.0)
+        self.status_label.configure(text=f"Concluído! {total_chunks} arquivos gerados.")
+        
+        self.log_text.insert("end", f"\n✅ Divisão concluída!\n")
+        self.log_text.insert("end", f"Total: {total_chunks} arquivos, {total_rows:,} linhas em {output_dir}\n")
+        
+        messagebox.showinfo(
+            "Sucesso",
+            f"CSV dividido com sucesso!\n\n"
+            f"Arquivos gerados: {total_chunks} (um por valor de '{column}')\n"
+            f"Pasta: {output_dir}"
+        )
+    
+    def execute_by_size(self, input_file, output_dir, prefix, max_bytes):
+        """Divide pelo tamanho em bytes, copiando os registros sem parsing"""
+        # gz/bz2/xz não informam o tamanho descompactado: estimativa pelo compactado
+        total_size = max(input_size(input_file) or os.path.getsize(source_path(input_file)), 1)
+        estimated_chunks = max(1, -(-total_size // max_bytes))
+        
+        self.log_text.insert("end", f"Dividindo por tamanho: até {max_bytes / (1024 * 1024):.1f} MB por arquivo\n")
+        self.log_text.insert("end", "Cópia direta dos bytes: opções de destino e formato não se aplicam\n")
+        self.log_text.insert("end", f"Arquivos a gerar: ~{estimated_chunks}\n\n")
+        self.update()
+        
+        def on_part(file_count, output_file, rows):
+            self.log_text.insert("end", f"✓ Salvo: {os.path.basename(output_file)} ({rows:,} linhas)\n")
+            self.log_text.see("end")
+            
+            self.progress_bar.set(min(file_count / estimated_chunks, 0.99))
+            self.status_label.configure(text=f"Processando arquivo {file_count}/~{estimated_chunks}...")
+            self.update()
+        
+        parts = split_bytes(
+            input_file,
+            max_bytes,
+            lambda n: os.path.join(output_dir, f"{prefix}_{n}{self.get_part_extension()}"),
+            on_part=on_part,
+            compress_workers=self.get_workers()
+        )
+        total_chunks = len(parts)
+        total_rows = sum(rows for _, rows in parts)
+        
+        self.progress_bar.set(1.0)
+        self.status_label.configure(text=f"Concluído! {total_chunks} arquivos gerados.")
+        
+        self.log_text.insert("end", f"\n✅ Divisão concluída!\n")
+        self.log_text.insert("end", f"Total: {total_chunks} arquivos, {total_rows:,} linhas em {output_dir}\n")
+        
+        messagebox.showinfo(
+            "Sucesso",
+            f"CSV dividido com sucesso!\n\n"
+            f"Arquivos gerados: {total_chunks}\n"
+            f"Tamanho por arquivo: até {max_bytes / (1024 * 1024):.1f} MB\n"
+            f"Pasta: {output_dir}"
+        )
+            
     def get_settings(self):
         """Retorna as configurações atuais"""
         return {
             "source_charset": self.charset_var.get(),
             "source_separator": self.sep_var.get(),
             "max_rows": self.max_rows_entry.get(),
+            "max_size_mb": self.max_size_entry.get(),
+            "workers": self.workers_var.get(),
+            "split_by_column": self.by_column_entry.get(),
             "dest_charset": self.dest_charset_var.get(),
             "dest_separator": self.dest_sep_var.get(),
+            "compression": self.compress_var.get(),
             "data_format": self.format_var.get(),
             "quote_all": self.quote_all_var.get(),
             "keep_header": self.keep_header_var.get()
@@ -563,10 +786,22 @@ class CSVSplitterTool(ctk.CTkFrame):
         if "max_rows" in settings:
             self.max_rows_entry.delete(0, "end")
             self.max_rows_entry.insert(0, settings["max_rows"])
+        if "max_size_mb" in settings:
+            self.max_size_entry.delete(0, "end")
+            if settings["max_size_mb"]:
+                self.max_size_entry.insert(0, settings["max_size_mb"])
+        if "workers" in settings:
+            self.workers_var.set(settings["workers"])
+        if "split_by_column" in settings:
+            self.by_column_entry.delete(0, "end")
+            if settings["split_by_column"]:
+                self.by_column_entry.insert(0, settings["split_by_column"])
         if "dest_charset" in settings:
             self.dest_charset_var.set(settings["dest_charset"])
         if "dest_separator" in settings:
             self.dest_sep_var.set(settings["dest_separator"])
+        if "compression" in settings:
+            self.compress_var.set(settings["compression"])
         if "data_format" in settings:
             self.format_var.set(settings["data_format"])
             self.on_format_change(settings["data_format"])
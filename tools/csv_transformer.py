@@ -7,6 +7,8 @@ import os
 from pathlib import Path
 import chardet
 
+from engine import open_input, read_csv_file, fold_accents_series
+
 
 class CSVTransformerTool(ctk.CTkFrame):
     """Ferramenta para transformar dados CSV - substituição de valores, filtros, etc."""
@@ -407,11 +409,11 @@ class CSVTransformerTool(ctk.CTkFrame):
             
             enc = self.enc_var.get()
             if enc == "auto":
-                with open(filepath, 'rb') as f:
+                with open_input(filepath) as f:
                     result = chardet.detect(f.read(10000))
                     enc = result['encoding']
             
-            self.df = pd.read_csv(filepath, sep=sep, encoding=enc, low_memory=False, dtype=str)
+            self.df = read_csv_file(filepath, sep, enc, dtype=str)
             
             # Atualizar menus de colunas
             columns = list(self.df.columns)
@@ -502,24 +504,13 @@ class CSVTransformerTool(ctk.CTkFrame):
         file = filedialog.asksaveasfilename(
             title="Salvar como",
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"), ("CSV compactado", "*.csv.gz *.csv.bz2 *.csv.xz"), ("All files", "*.*")]
         )
         
         if file:
             self.output_entry.delete(0, "end")
             self.output_entry.insert(0, file)
             
-    def remove_accents(self, text):
-        """Remove acentos de um texto"""
-        import unicodedata
-        if pd.isna(text):
-            return text
-        text = str(text)
-        return ''.join(
-            c for c in unicodedata.normalize('NFD', text)
-            if unicodedata.category(c) != 'Mn'
-        )
-            
     def execute(self):
         """Executa as transformações"""
         if self.df is None:
@@ -587,7 +578,7 @@ class CSVTransformerTool(ctk.CTkFrame):
                         result_df[col] = result_df[col].astype(str).str.strip()
                     
                     if self.remove_accents_var.get():
-                        result_df[col] = result_df[col].apply(self.remove_accents)
+                        result_df[col] = fold_accents_series(result_df[col])
                     
                     prefix = self.prefix_entry.get()
                     if prefix:
@@ -405,7 +405,7 @@ class ExcelToCSVTool(ctk.CTkFrame):
         file = filedialog.asksaveasfilename(
             title="Salvar como",
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"), ("CSV compactado", "*.csv.gz *.csv.bz2 *.csv.xz"), ("All files", "*.*")]
         )
         
         if file: